@@ -0,0 +1,175 @@
+"""
+Structured logging for X_Agent.
+
+Log calls name a message key from the locale catalog (locales/*.json) plus its fields:
+
+    log.info("comment_sent_success", target_tweet_id=tweet_id)
+
+Nothing is translated or formatted at the call site. A disabled level costs one level check;
+an enabled record carries the key and fields and is only rendered by the handler that emits
+it. Console output stays plain text, as before. The optional file sink runs behind a queue:
+records are handed to a background thread that renders them as JSON lines into a rotating
+file, so the calling thread never waits on disk I/O.
+"""
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+
+
+class CatalogMessage:
+    """A log message rendered from the catalog only when str() is called on it."""
+    __slots__ = ("key", "fields", "translate")
+
+    def __init__(self, key, fields, translate):
+        self.key, self.fields, self.translate = key, fields, translate
+
+    def __str__(self):
+        try:
+            return self.translate(self.key, **self.fields)
+        except (KeyError, IndexError, ValueError):
+            # A catalog entry that does not match its fields must not take the agent down.
+            return f"{self.key} {self.fields}"
+
+
+class AgentLogger:
+    """Level methods taking a catalog key and its fields; the record is only built when the level is enabled."""
+    def __init__(self, logger, translate):
+        self._logger = logger
+        self._translate = translate
+
+    def _log(self, level, key, fields, exc_info=False):
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, CatalogMessage(key, fields, self._translate), exc_info=exc_info, extra={"catalog_key": key, "fields": fields}, stacklevel=3)
+
+    def debug(self, key, **fields):
+        self._log(logging.DEBUG, key, fields)
+
+    def info(self, key, **fields):
+        self._log(logging.INFO, key, fields)
+
+    def warning(self, key, **fields):
+        self._log(logging.WARNING, key, fields)
+
+    def error(self, key, **fields):
+        self._log(logging.ERROR, key, fields)
+
+    def exception(self, key, **fields):
+        self._log(logging.ERROR, key, fields, exc_info=True)
+
+    def is_enabled(self, level):
+        return self._logger.isEnabledFor(level)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Plain message text; debug records get the catalog's debug_message prefix."""
+    def __init__(self, translate):
+        super().__init__()
+        self._translate = translate
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.levelno == logging.DEBUG:
+            message = self._translate("debug_message", message=message)
+        if record.exc_info:
+            message = f"{message}\n{self.formatException(record.exc_info)}"
+        return message
+
+
+class StdoutHandler(logging.StreamHandler):
+    """Writes to whatever sys.stdout is at emit time, so contextlib.redirect_stdout still captures agent output."""
+    def __init__(self):
+        super().__init__(sys.stdout)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """One JSON object per record: time, level, thread, agent action, catalog key, fields and the rendered text."""
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "thread": record.threadName,
+            "action": getattr(record, "action", None),
+            "key": getattr(record, "catalog_key", None),
+            "fields": getattr(record, "fields", None),
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues records as they are. The stock QueueHandler renders the message on the calling
+    thread before queueing; here that is left to the listener thread.
+    """
+    def __init__(self, record_queue, context=None):
+        super().__init__(record_queue)
+        self._context = context
+
+    def prepare(self, record):
+        # Context such as the running action has to be captured now, on the calling thread.
+        if self._context is not None:
+            for name, value in self._context().items():
+                setattr(record, name, value)
+        return record
+
+
+class FileSink:
+    """Background JSON lines sink: a queue handler on the logger and a listener thread writing a rotating file."""
+    def __init__(self, logger, path, level, max_bytes, backup_count, context=None):
+        self._logger = logger
+        self._queue = queue.SimpleQueue()
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8", delay=True)
+        file_handler.setFormatter(JsonLinesFormatter())
+        self.handler = DeferredQueueHandler(self._queue, context)
+        self.handler.setLevel(level)
+        self._listener = logging.handlers.QueueListener(self._queue, file_handler, respect_handler_level=False)
+        self._listener.start()
+        logger.addHandler(self.handler)
+
+    def close(self):
+        """Writes out everything queued so far and stops the listener thread."""
+        self._logger.removeHandler(self.handler)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+
+
+def create_logger(name, translate, console_level):
+    """Returns (AgentLogger, logging.Logger) with a console handler on stdout at console_level."""
+    logger = logging.getLogger(name)
+    logger.propagate = False
+    logger.handlers.clear()
+    console = StdoutHandler()
+    console.setFormatter(ConsoleFormatter(translate))
+    console.setLevel(console_level)
+    logger.addHandler(console)
+    logger.setLevel(console_level)
+    return AgentLogger(logger, translate), logger
+
+
+def start_file_sink(logger, path, level, max_bytes, backup_count, context=None):
+    """
+    Adds the background JSON lines sink to logger and lowers the logger's level to the sink's
+    if needed, so records the console ignores still reach the file. Returns the FileSink.
+    """
+    sink = FileSink(logger, path, level, max_bytes, backup_count, context)
+    logger.setLevel(min(logger.level, level))
+    return sink
+
+
+def parse_level(name, default=logging.INFO):
+    """Maps a level name such as "debug" or "WARNING" to its logging constant."""
+    level = logging.getLevelName(str(name or "").strip().upper())
+    return level if isinstance(level, int) else default
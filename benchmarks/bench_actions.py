@@ -0,0 +1,194 @@
+"""
+End-to-end benchmark of the agent's action functions against offline X page fixtures.
+
+Starts the fixture server, points x_agent at it through X_BASE_URL, runs the selected
+actions in a headless browser and reports each action's wall time split into navigation
+(page loads and waits), DOM extraction, LLM and DB time. DB time covers the cursor, the
+connection and the memory caches, plus a flush of the write-behind queue (db_writer) at
+the end of each action, so the writes an action queued are committed and counted within
+it. Nothing touches the network: the OpenAI client is replaced with a zero-latency replay
+stand-in, and all agent state lives in a throwaway working directory.
+
+Usage:
+    python benchmarks/bench_actions.py [--repeat 3] [--actions browse mentions ...]
+                                       [--keep-delays] [--headful] [--json results.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from collections import defaultdict
+
+from bench_common import BENCH_HANDLE, cleanup_workdir, import_agent, prepare_workdir
+from fixture_server import serve_fixtures
+from llm_backends import ReplayLLMClient
+
+PHASES = ["navigation", "dom", "llm", "db"]
+ACTIONS = ["login", "browse", "mentions", "monitor", "discover", "reflect", "post"]
+
+
+class PhaseClock:
+    """Accumulates time per phase. Nested timed calls count towards the outermost phase only."""
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self._active = None
+
+    def reset(self):
+        self.totals = defaultdict(float)
+
+    def timed(self, phase, func):
+        def wrapper(*args, **kwargs):
+            if self._active:
+                return func(*args, **kwargs)
+            self._active = phase
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.totals[phase] += time.perf_counter() - start
+                self._active = None
+        return wrapper
+
+
+class TimedProxy:
+    """Wraps an object so that every method reached through it is timed under one phase."""
+    def __init__(self, target, clock, phase):
+        self._target, self._clock, self._phase = target, clock, phase
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if callable(attr):
+            return self._clock.timed(self._phase, attr)
+        if isinstance(attr, (str, int, float, bool, type(None), list, dict, tuple)):
+            return attr
+        return TimedProxy(attr, self._clock, self._phase)
+
+
+def make_driver(agent, headful):
+    agent.load_browser_modules()
+    options = agent.webdriver.ChromeOptions()
+    if not headful:
+        options.add_argument("--headless=new")
+    options.add_argument("--window-size=1280,1600")
+    return agent.webdriver.Chrome(options=options)
+
+
+def instrument(agent, driver, clock, keep_delays):
+    driver.get = clock.timed("navigation", driver.get)
+
+    class TimedWait(agent.WebDriverWait):
+        def until(self, *args, **kwargs):
+            return clock.timed("navigation", super().until)(*args, **kwargs)
+
+    agent.WebDriverWait = TimedWait
+    agent.extract_tweets = clock.timed("dom", agent.extract_tweets)
+    offline_llm = ReplayLLMClient(
+        default_text="Liquidity tends to move before the narrative does; watch the flows, not the headlines.",
+        default_json='{"best_index": 0, "reason": "Offline benchmark choice."}',
+    )
+    agent.client_openai = TimedProxy(offline_llm, clock, "llm")
+    agent.cursor = TimedProxy(agent.cursor, clock, "db")
+    agent.conn = TimedProxy(agent.conn, clock, "db")
+    agent.vector_memory = TimedProxy(agent.vector_memory, clock, "db")
+    agent.embedding_cache = TimedProxy(agent.embedding_cache, clock, "db")
+    # The fixture pages have no clipboard to paste from; type straight into the box instead.
+    agent.type_via_clipboard = lambda d, element, text: (agent.robust_click(d, element), element.send_keys(text))
+    if not keep_delays:
+        agent.random_delay = lambda min_sec=0, max_sec=0: None
+
+
+def seed_state(agent):
+    """Resets the state the actions read, so every repetition sees the same candidates."""
+    agent.db_writer.flush()
+    agent.cursor.execute("DELETE FROM engagements")
+    agent.cursor.execute("DELETE FROM observations")
+    agent.cursor.execute("DELETE FROM seen_tweets")
+    # Three posts appear on the fixture profile timeline, the last one without any likes; the
+    # third seeded post is only reachable through its status page.
+    tweet_ids = ["1830000000000000001", "1830000000000000002", "1700000000000000003", "1830000000000000004"]
+    rows = [(f"2024-01-0{i}T12:00:00", tweet_id, "Market Sentiment", f"Seeded post {i}", "published", None) for i, tweet_id in enumerate(tweet_ids, 1)]
+    agent.cursor.executemany("INSERT INTO observations (timestamp, tweet_id, subject, content, status, likes) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    agent.conn.commit()
+    agent.identity_index = agent.IdentityIndex(agent.cursor)
+    agent.seen_tweets = agent.SeenTweets(agent.cursor, agent.SEEN_TWEET_TTL_HOURS * 3600)
+
+
+def action_runners(agent):
+    return {
+        "login": lambda d: agent.login_to_twitter(d),
+        "browse": lambda d: agent.browse_following_feed_and_engage(d),
+        "mentions": lambda d: agent.scan_and_reply_to_mentions(d),
+        "monitor": lambda d: agent.monitor_core_subjects(d, target_override="@fixture_core"),
+        "discover": lambda d: agent.curiosity_driven_discovery(d),
+        "reflect": lambda d: agent.perform_self_reflection(d),
+        "post": lambda d: agent.post_tweet(d, *agent.generate_tweet_content("Offline benchmark market context.", subject_override="Market Sentiment")),
+    }
+
+
+def summarize(samples):
+    rows = []
+    for action, runs in samples.items():
+        count = len(runs)
+        row = {"action": action, "runs": count}
+        for key in ["wall"] + PHASES:
+            row[key] = sum(run[key] for run in runs) / count
+        row["other"] = max(row["wall"] - sum(row[p] for p in PHASES), 0.0)
+        rows.append(row)
+    return rows
+
+
+def print_table(rows):
+    header = f"{'action':<10} {'runs':>4} {'wall ms':>9} {'nav ms':>9} {'dom ms':>9} {'llm ms':>9} {'db ms':>9} {'other ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        print(f"{row['action']:<10} {row['runs']:>4} " + " ".join(f"{row[k] * 1000:>9.1f}" for k in ["wall"] + PHASES + ["other"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark X_Agent actions against offline page fixtures.")
+    parser.add_argument("--actions", nargs="+", choices=ACTIONS, default=ACTIONS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--keep-delays", action="store_true", help="Keep the agent's human-like random delays.")
+    parser.add_argument("--headful", action="store_true", help="Show the browser window.")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent's own console output.")
+    parser.add_argument("--json", help="Also write the summary to this file.")
+    bench_args = parser.parse_args()
+    json_path = os.path.abspath(bench_args.json) if bench_args.json else None
+
+    server, base_url = serve_fixtures(BENCH_HANDLE)
+    workdir = prepare_workdir()
+    agent = import_agent(X_BASE_URL=base_url, X_PROFILE_URL=f"{base_url}/{BENCH_HANDLE}", LLM_BACKEND="replay")
+    clock = PhaseClock()
+    driver = make_driver(agent, bench_args.headful)
+    try:
+        instrument(agent, driver, clock, bench_args.keep_delays)
+        runners = action_runners(agent)
+        flush_writes = clock.timed("db", agent.db_writer.flush)
+        samples = defaultdict(list)
+        for action in bench_args.actions:
+            for _ in range(bench_args.repeat):
+                seed_state(agent)
+                clock.reset()
+                output = contextlib.nullcontext() if bench_args.verbose else contextlib.redirect_stdout(io.StringIO())
+                start = time.perf_counter()
+                with output:
+                    runners[action](driver)
+                    flush_writes()
+                wall = time.perf_counter() - start
+                samples[action].append({"wall": wall, **{phase: clock.totals[phase] for phase in PHASES}})
+        rows = summarize(samples)
+        print_table(rows)
+        if json_path:
+            with open(json_path, "w") as f:
+                json.dump(rows, f, indent=2)
+    finally:
+        driver.quit()
+        server.shutdown()
+        cleanup_workdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
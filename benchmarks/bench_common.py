@@ -0,0 +1,55 @@
+"""
+Shared setup for the benchmark scripts: an isolated working directory and an x_agent
+import configured entirely from benchmark defaults, so no run touches real agent state.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+BENCH_HANDLE = "benchbot"
+
+AGENT_DEFAULTS = {
+    "OPENAI_API_KEY": "sk-offline-benchmark",
+    "X_PROFILE_URL": f"https://twitter.com/{BENCH_HANDLE}",
+    "CORE_TOPICS": '["@fixture_core"]',
+    "RESEARCH_CATEGORIES": '{"Market Sentiment": 1.2, "DeFi": 1.0}',
+    "SESSION_RESET_HOURS": "1",
+    "SELF_REFLECTION_HOURS": "12",
+    "MIN_SLEEP_DURATION": "1",
+    "MAX_SLEEP_DURATION": "2",
+    "PROMPT_TEMPLATE": "You are a benchmark persona. Write about {observed_subject}. Context: {successful_examples}",
+}
+
+
+def prepare_workdir():
+    """Creates and enters a throwaway working directory so benchmark runs never touch real agent state."""
+    workdir = tempfile.mkdtemp(prefix="xagent_bench_")
+    shutil.copytree(os.path.join(REPO_ROOT, "locales"), os.path.join(workdir, "locales"))
+    os.chdir(workdir)
+    return workdir
+
+
+def cleanup_workdir(workdir):
+    os.chdir(REPO_ROOT)
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+def import_agent(**overrides):
+    """
+    Imports x_agent with benchmark defaults for any setting that is not already in the
+    environment. Keyword overrides always win. The agent's lazily created backends are set
+    up right away, so their first-use cost never lands in a measurement.
+    """
+    for key, value in AGENT_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+    os.environ.update(overrides)
+    sys.argv = [sys.argv[0]]
+    import x_agent
+    for backend in (x_agent.conn, x_agent.cursor, x_agent.db_writer, x_agent.identity_index, x_agent.insight_digests, x_agent.seen_tweets, x_agent.vector_memory, x_agent.embedding_cache, x_agent.market_summary_cache):
+        backend.resolve()
+    return x_agent
@@ -0,0 +1,103 @@
+"""
+Check of the length-guaranteed generation pipeline against the local LLM stand-in.
+
+Feeds generate_within_limit a set of model answers (short, long with sentence breaks, one
+long sentence, one behind an abbreviation, CJK, emoji and URL heavy) through
+llm_backends.ReplayLLMClient, either in-process or behind the HTTP stand-in
+(benchmarks/llm_standin.py). The stand-in applies max_tokens the way the API does. For each case it reports the weighted length before and
+after, how the text was brought within the limit and the model calls it took. It exits
+non-zero if any result is over the limit, or if a sentence trim keeps only a fragment such
+as "Mr." (see REFUSED_TRIMS).
+
+Usage:
+    python benchmarks/bench_length.py [--transport inprocess|http] [--limit 280]
+"""
+import argparse
+import contextlib
+import io
+import sys
+
+from bench_common import cleanup_workdir, import_agent, prepare_workdir
+from llm_backends import ReplayLLMClient
+from llm_standin import serve_standin
+
+CASES = {
+    "short": "Liquidity tends to move before the narrative does; watch the flows, not the headlines.",
+    "sentences": " ".join([
+        "Stablecoin supply keeps climbing while spot volume stays flat.",
+        "That gap is dry powder, not indifference.",
+        "When funding flips negative with supply this high, the squeeze writes itself.",
+        "Most will call it a surprise.",
+        "The chain already told us.",
+        "Watch the mint and burn data, not the timeline.",
+    ]),
+    "one_sentence": "Liquidity " + " ".join(["rotates quietly between chains"] * 15) + " and nobody notices until it is gone.",
+    "cjk": "流动性总是先于叙事移动。" * 20,
+    "emoji": "Funding flipped 🔥📉 and the crowd is still long 🐂🐂. " * 8,
+    # One overlong sentence behind an abbreviation: a naive sentence trim would post just "Mr.".
+    "abbreviation": "Mr. Market " + " ".join(["keeps rotating liquidity between chains"] * 10) + " until nobody is left holding the bid.",
+    "urls": "Read the flows: https://example.com/research/stablecoin-supply-and-spot-volume-divergence. " * 6,
+}
+
+
+# Sentence trims that must be refused (None), because they would leave only a fragment.
+REFUSED_TRIMS = [
+    ("Mr. Smith went to Washington and did a lot of stuff there.", 20),
+    ("1. " + "Liquidity rotates quietly between chains " * 10, 280),
+]
+
+
+def check_refused_trims():
+    """Returns the number of REFUSED_TRIMS that trim_to_sentences still accepts."""
+    from tweet_length import trim_to_sentences
+    failures = 0
+    for text, limit in REFUSED_TRIMS:
+        trimmed = trim_to_sentences(text, limit)
+        if trimmed is not None:
+            print(f"trim_to_sentences({text[:30]!r}..., {limit}) returned {trimmed!r}, expected None.")
+            failures += 1
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the length-guaranteed generation pipeline offline.")
+    parser.add_argument("--transport", choices=["inprocess", "http"], default="inprocess")
+    parser.add_argument("--limit", type=int, default=280)
+    bench_args = parser.parse_args()
+
+    replay = ReplayLLMClient(default_text="")
+    workdir = prepare_workdir()
+    server = None
+    failures = check_refused_trims()
+    try:
+        if bench_args.transport == "http":
+            server, base_url = serve_standin(replay)
+            agent = import_agent(LLM_BACKEND="local", LLM_BASE_URL=base_url)
+        else:
+            agent = import_agent(LLM_BACKEND="replay")
+            agent.client_openai = replay
+        header = f"{'case':<14} {'answer':>7} {'result':>7} {'outcome':<10} {'chat calls':>10}"
+        print(header)
+        print("-" * len(header))
+        for name, answer in CASES.items():
+            replay.default_text = answer
+            before_calls = replay.stats["chat_calls"]
+            before = dict(agent.length_outcomes)
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = agent.generate_within_limit("post", "Write a post.", bench_args.limit)
+            outcome = next((key for key, count in agent.length_outcomes.items() if count != before.get(key, 0)), "?")
+            length = agent.weighted_length(result)
+            failures += length > bench_args.limit or (name == "abbreviation" and length < bench_args.limit // 2)
+            print(f"{name:<14} {agent.weighted_length(answer):>7} {length:>7} {outcome:<10} {replay.stats['chat_calls'] - before_calls:>10}")
+        print(f"\nOutcomes: {dict(agent.length_outcomes)}")
+    finally:
+        if server:
+            server.shutdown()
+        cleanup_workdir(workdir)
+    if failures:
+        print(f"{failures} check(s) failed.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Benchmark of the agent's LLM prompt pipelines against a replayed OpenAI stand-in.
+
+Drives generate_tweet_content, prepare_reply, analyze_market_context_for_prompt,
+perform_self_reflection, choose_candidate and the JSON scoring prompts through
+llm_backends.ReplayLLMClient, either in-process or behind the local HTTP stand-in
+(benchmarks/llm_standin.py). For each pipeline it reports wall time, model calls per run,
+the overhead beyond the simulated model latency and the speed-up from running several
+pipelines concurrently. No tokens are spent.
+
+Usage:
+    python benchmarks/bench_llm.py [--latency-ms 400] [--embedding-latency-ms 80]
+                                   [--transport inprocess|http] [--recordings llm_recordings.jsonl]
+                                   [--repeat 5] [--concurrency 4]
+"""
+import argparse
+import contextlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_common import cleanup_workdir, import_agent, prepare_workdir
+from llm_backends import ReplayLLMClient
+from llm_standin import serve_standin
+
+SAMPLE_CANDIDATES = [
+    {"index": 0, "id": "1830000000000000010", "text": "Stablecoin supply on Solana just hit a new high while DEX volume lags. Liquidity is waiting for a narrative."},
+    {"index": 1, "id": "1830000000000000011", "text": "Restaking yields are compressing fast; the marginal depositor is now pricing in slashing risk."},
+    {"index": 4, "id": "1830000000000000014", "text": "Fear & Greed at 27 and funding still positive. Someone is wrong, and it is usually the leveraged side."},
+]
+RAW_MARKET_DATA = "BTC Dominance: 54.12%, Fear & Greed: 27 (Fear), BTC 24h Change: -2.31%, SOL Price: $142.50, SOL 24h Change: -4.80%"
+MARKET_STATE = {"btc_dominance": 54.12, "fear_greed_value": 27, "fear_greed_text": "Fear", "btc_change": -2.31, "sol_price": 142.5, "sol_change": -4.8}
+# Pipelines that share the agent's SQLite connection can only run on the main thread.
+SERIAL_ONLY = {"self_reflection"}
+
+
+def pipelines(agent):
+    return {
+        "generate_tweet": lambda: agent.generate_tweet_content("Offline benchmark market context.", subject_override="Market Sentiment"),
+        "market_analysis": lambda: agent.analyze_market_context_for_prompt(RAW_MARKET_DATA, MARKET_STATE),
+        "self_reflection": lambda: agent.perform_self_reflection(None),
+        "feed_scoring": lambda: agent.ask_for_json_decision(agent.build_feed_scoring_prompt(SAMPLE_CANDIDATES)),
+        "discovery_scoring": lambda: agent.ask_for_json_decision(agent.build_discovery_scoring_prompt("DeFi", SAMPLE_CANDIDATES)),
+        "candidate_choice": lambda: agent.choose_candidate(SAMPLE_CANDIDATES, agent.build_feed_scoring_prompt),
+        "generate_reply": lambda: agent.prepare_reply(SAMPLE_CANDIDATES[0], "following_feed_reply"),
+    }
+
+
+def seed_reflection_state(agent):
+    """Recent posts with known like counts, so reflection never needs the browser."""
+    agent.cursor.execute("DELETE FROM observations")
+    rows = [(f"2024-01-{i:02d}T12:00:00", f"17000000000000000{i:02d}", "Market Sentiment", f"Seeded post {i}", "reviewed", i * 3) for i in range(1, 11)]
+    agent.cursor.executemany("INSERT INTO observations (timestamp, tweet_id, subject, content, status, likes) VALUES (?, ?, ?, ?, ?, ?)", rows)
+    agent.conn.commit()
+
+
+def measure(replay, run, repeat, latency_ms, embedding_latency_ms):
+    before = dict(replay.stats)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            run()
+    wall = (time.perf_counter() - start) / repeat
+    chat_calls = (replay.stats["chat_calls"] - before["chat_calls"]) / repeat
+    embedding_calls = (replay.stats["embedding_calls"] - before["embedding_calls"]) / repeat
+    simulated = (chat_calls * latency_ms + embedding_calls * embedding_latency_ms) / 1000.0
+    return {"wall": wall, "chat_calls": chat_calls, "embedding_calls": embedding_calls, "overhead": max(wall - simulated, 0.0)}
+
+
+def measure_concurrency(run, concurrency):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()), ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(run) for _ in range(concurrency)]:
+            future.result()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark X_Agent LLM pipelines against a replayed OpenAI stand-in.")
+    parser.add_argument("--latency-ms", type=float, default=400.0, help="Simulated latency of each chat completion.")
+    parser.add_argument("--embedding-latency-ms", type=float, default=80.0, help="Simulated latency of each embeddings request.")
+    parser.add_argument("--transport", choices=["inprocess", "http"], default="inprocess", help="Call the replay client directly or through the local HTTP stand-in.")
+    parser.add_argument("--recordings", help="JSONL file recorded with LLM_RECORD=True.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=4)
+    bench_args = parser.parse_args()
+
+    replay = ReplayLLMClient(
+        bench_args.recordings, latency_ms=bench_args.latency_ms, embedding_latency_ms=bench_args.embedding_latency_ms,
+        default_text="Liquidity tends to move before the narrative does; watch the flows, not the headlines.",
+        default_json='{"best_index": 0, "reason": "Offline benchmark choice."}',
+    )
+    workdir = prepare_workdir()
+    server = None
+    try:
+        if bench_args.transport == "http":
+            server, base_url = serve_standin(replay)
+            agent = import_agent(LLM_BACKEND="local", LLM_BASE_URL=base_url)
+        else:
+            agent = import_agent(LLM_BACKEND="replay")
+            agent.client_openai = replay
+        seed_reflection_state(agent)
+
+        header = f"{'pipeline':<18} {'wall ms':>9} {'chat/run':>9} {'emb/run':>8} {'overhead ms':>12} {'x' + str(bench_args.concurrency) + ' speed-up':>14}"
+        print(header)
+        print("-" * len(header))
+        for name, run in pipelines(agent).items():
+            result = measure(replay, run, bench_args.repeat, bench_args.latency_ms, bench_args.embedding_latency_ms)
+            if name in SERIAL_ONLY or bench_args.concurrency < 2:
+                speedup = "n/a"
+            else:
+                concurrent_wall = measure_concurrency(run, bench_args.concurrency)
+                speedup = f"{result['wall'] * bench_args.concurrency / concurrent_wall:.2f}x"
+            print(f"{name:<18} {result['wall'] * 1000:>9.1f} {result['chat_calls']:>9.1f} {result['embedding_calls']:>8.1f} {result['overhead'] * 1000:>12.1f} {speedup:>14}")
+        print(f"\nReplay stats: {replay.stats}")
+    finally:
+        if server:
+            server.shutdown()
+        cleanup_workdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
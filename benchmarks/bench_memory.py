@@ -0,0 +1,145 @@
+"""
+Benchmark of the vector memory backends: chromadb against numpy_memory.NumpyVectorStore.
+
+Builds a synthetic memory of the agent's shape (unit-length embeddings split into
+self_posted and insight entries) in both backends inside a throwaway directory, then
+measures each backend in a fresh subprocess, so import cost and peak memory are not
+shared between them: time to import and open the store, first query, steady-state query
+latency for the agent's type-filtered top-k queries, add latency and peak RSS. It also
+checks that both backends return the same top results.
+
+Usage:
+    python benchmarks/bench_memory.py [--entries 2500] [--dimensions 1536] [--queries 200]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from bench_common import REPO_ROOT, cleanup_workdir, prepare_workdir
+
+BACKENDS = ["chroma", "numpy"]
+QUERY_SHAPES = [({"type": "insight"}, 2), ({"type": "self_posted"}, 2), ({"type": {"$in": ["self_posted", "insight"]}}, 6)]
+
+
+def synthetic_memory(entries, dimensions, seed=0):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(entries, dimensions)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    now = time.time()
+    ids = [f"memory_{i}" for i in range(entries)]
+    documents = [f"Synthetic memory {i} about liquidity, narratives and on-chain flows." for i in range(entries)]
+    metadatas = [{"type": "insight" if i % 5 == 0 else "self_posted", "subject": "Market Sentiment", "likes": i % 40, "created_at": now - i * 600} for i in range(entries)]
+    return ids, vectors, documents, metadatas
+
+
+def open_backend(backend, path):
+    if backend == "chroma":
+        import chromadb
+        return chromadb.PersistentClient(path=path).get_or_create_collection(name="agent_memory", embedding_function=None)
+    from numpy_memory import NumpyVectorStore
+    return NumpyVectorStore(path)
+
+
+def build(entries, dimensions):
+    ids, vectors, documents, metadatas = synthetic_memory(entries, dimensions)
+    for backend in BACKENDS:
+        store = open_backend(backend, backend)
+        for offset in range(0, entries, 500):
+            end = offset + 500
+            store.add(ids=ids[offset:end], embeddings=vectors[offset:end].tolist(), documents=documents[offset:end], metadatas=metadatas[offset:end])
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process. ru_maxrss would include the parent's peak, which survives exec."""
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure_child(backend, queries, dimensions):
+    """Runs in the subprocess: opens the store, queries and adds, and prints the results as JSON."""
+    import numpy as np
+    start = time.perf_counter()
+    store = open_backend(backend, backend)
+    open_ms = (time.perf_counter() - start) * 1000
+    rng = np.random.default_rng(1)
+    probes = rng.normal(size=(queries, dimensions)).astype(np.float32)
+    probes /= np.linalg.norm(probes, axis=1, keepdims=True)
+    start = time.perf_counter()
+    store.query(query_embeddings=[probes[0].tolist()], n_results=2, where={"type": "insight"})
+    first_query_ms = (time.perf_counter() - start) * 1000
+    durations, top_ids = [], []
+    for i, probe in enumerate(probes):
+        where, n_results = QUERY_SHAPES[i % len(QUERY_SHAPES)]
+        start = time.perf_counter()
+        result = store.query(query_embeddings=[probe.tolist()], n_results=n_results, where=where)
+        durations.append((time.perf_counter() - start) * 1000)
+        top_ids.append(result["ids"][0])
+    add_durations = []
+    for i in range(20):
+        vector = rng.normal(size=dimensions)
+        start = time.perf_counter()
+        store.add(ids=[f"bench_add_{i}"], embeddings=[(vector / np.linalg.norm(vector)).tolist()], documents=["Benchmark post."], metadatas=[{"type": "self_posted", "created_at": time.time()}])
+        add_durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    add_durations.sort()
+    print(json.dumps({
+        "open_ms": open_ms,
+        "first_query_ms": first_query_ms,
+        "query_p50_ms": durations[len(durations) // 2],
+        "query_p95_ms": durations[int(len(durations) * 0.95)],
+        "add_p50_ms": add_durations[len(add_durations) // 2],
+        "peak_rss_mb": peak_rss_mb(),
+        "top_ids": top_ids,
+    }))
+
+
+def run_child(backend, queries, dimensions):
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", backend, "--queries", str(queries), "--dimensions", str(dimensions)],
+        capture_output=True, text=True, check=True, env={**os.environ, "PYTHONPATH": REPO_ROOT},
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["process_ms"] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the chromadb and NumPy vector memory backends.")
+    parser.add_argument("--entries", type=int, default=2500, help="Memories in the synthetic store (the default retention caps allow 2500).")
+    parser.add_argument("--dimensions", type=int, default=1536, help="Embedding size (text-embedding-3-small has 1536).")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--child", choices=BACKENDS, help=argparse.SUPPRESS)
+    bench_args = parser.parse_args()
+    if bench_args.child:
+        return measure_child(bench_args.child, bench_args.queries, bench_args.dimensions)
+
+    workdir = prepare_workdir()
+    try:
+        build(bench_args.entries, bench_args.dimensions)
+        results = {backend: run_child(backend, bench_args.queries, bench_args.dimensions) for backend in BACKENDS}
+        header = f"{'backend':<8} {'process ms':>11} {'open ms':>9} {'1st query ms':>13} {'query p50 us':>13} {'query p95 us':>13} {'add p50 ms':>11} {'peak RSS MB':>12}"
+        print(f"{bench_args.entries} memories, {bench_args.dimensions} dimensions, {bench_args.queries} queries\n")
+        print(header)
+        print("-" * len(header))
+        for backend, result in results.items():
+            print(
+                f"{backend:<8} {result['process_ms']:>11.1f} {result['open_ms']:>9.1f} {result['first_query_ms']:>13.2f} "
+                f"{result['query_p50_ms'] * 1000:>13.1f} {result['query_p95_ms'] * 1000:>13.1f} {result['add_p50_ms']:>11.2f} {result['peak_rss_mb']:>12.1f}"
+            )
+        agreeing = sum(a == b for a, b in zip(results["chroma"]["top_ids"], results["numpy"]["top_ids"]))
+        print(f"\nSame top results for {agreeing} of {bench_args.queries} queries (Chroma's HNSW index is approximate, NumPy is exact).")
+    finally:
+        cleanup_workdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
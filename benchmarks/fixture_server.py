@@ -0,0 +1,98 @@
+"""
+Offline stand-in for the X web pages the agent visits.
+
+Serves the saved HTML snapshots in benchmarks/fixtures/ for the home, mentions, search,
+profile and status pages. Timestamps, handles and tweet IDs in the snapshots are filled in
+per request, so the agent's freshness filters behave the same on every run.
+
+Run it on its own with:
+    python benchmarks/fixture_server.py --port 8765 --handle benchbot
+and point the agent at it with X_BASE_URL=http://127.0.0.1:8765.
+"""
+import argparse
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Ordered (pattern, fixture) routes; the first match wins.
+ROUTES = [
+    (re.compile(r"^/home$"), "home.html"),
+    (re.compile(r"^/notifications/mentions$"), "mentions.html"),
+    (re.compile(r"^/search$"), "search.html"),
+    (re.compile(r"^/i/web/status/(?P<tweet_id>\d+)$"), "status.html"),
+    (re.compile(r"^/(?P<profile>\w+)/status/(?P<tweet_id>\d+)$"), "status.html"),
+    (re.compile(r"^/(?P<profile>\w+)$"), "profile.html"),
+]
+
+
+def render_fixture(name, handle, profile="someone", tweet_id="1800000000000000000"):
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        html = f.read()
+    now = datetime.now(timezone.utc)
+    replacements = {
+        "__RECENT__": (now - timedelta(minutes=10)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "__OLD__": (now - timedelta(days=3)).strftime("%Y-%m-%dT%H:%M:%S.000Z"),
+        "__HANDLE__": handle,
+        "__PROFILE__": profile,
+        "__TWEET_ID__": tweet_id,
+    }
+    for placeholder, value in replacements.items():
+        html = html.replace(placeholder, value)
+    return html
+
+
+def make_handler(handle):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = urlsplit(self.path).path.rstrip("/") or "/home"
+            if path == "/static/x.js":
+                with open(os.path.join(FIXTURES_DIR, "x.js"), "rb") as f:
+                    return self._send(200, f.read(), "application/javascript")
+            for pattern, fixture in ROUTES:
+                match = pattern.match(path)
+                if match:
+                    params = {k: v for k, v in match.groupdict().items() if v}
+                    body = render_fixture(fixture, handle, **params).encode("utf-8")
+                    return self._send(200, body, "text/html; charset=utf-8")
+            self._send(404, b"Not found", "text/plain")
+
+        def _send(self, status, body, content_type):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def serve_fixtures(handle, host="127.0.0.1", port=0):
+    """
+    Starts the fixture server in a daemon thread.
+    Returns (server, base_url); call server.shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(handle))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve offline X page fixtures.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--handle", default="benchbot", help="Handle of the agent's own account.")
+    cli_args = parser.parse_args()
+    server = ThreadingHTTPServer((cli_args.host, cli_args.port), make_handler(cli_args.handle))
+    print(f"Serving X fixtures on http://{cli_args.host}:{cli_args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,22 @@
+// Minimal behaviour for the offline X page fixtures: liking, the Following tab and
+// posting (which answers with the same toast the live site shows).
+document.addEventListener('click', function (event) {
+    const button = event.target.closest('button, a');
+    if (!button) return;
+    const testId = button.getAttribute('data-testid');
+    if (testId === 'like' || testId === 'unlike') {
+        button.setAttribute('data-testid', testId === 'like' ? 'unlike' : 'like');
+        return;
+    }
+    if (button.hasAttribute('data-fixture-tab')) {
+        event.preventDefault();
+        return;
+    }
+    if (testId === 'tweetButton' || testId === 'tweetButtonInline') {
+        const toast = document.createElement('div');
+        toast.setAttribute('data-testid', 'toast');
+        const postedId = String(1900000000000000000 + Math.floor(Math.random() * 1000000));
+        toast.innerHTML = 'Your post was sent. <a href="/' + document.body.dataset.handle + '/status/' + postedId + '">View</a>';
+        document.body.appendChild(toast);
+    }
+});
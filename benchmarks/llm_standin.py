@@ -0,0 +1,94 @@
+"""
+Local OpenAI-compatible stand-in server.
+
+Answers /v1/chat/completions and /v1/embeddings from a recordings file (see
+llm_backends.RecordingLLMClient) with configurable latency, so the agent can run with
+LLM_BACKEND=local and LLM_BASE_URL pointing here, without tokens or network access.
+
+Run it with:
+    python benchmarks/llm_standin.py --port 8766 --recordings llm_recordings.jsonl --latency-ms 400
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import threading
+import time
+from array import array
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_backends import ReplayLLMClient
+
+
+def make_handler(replay):
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if self.path.endswith("/chat/completions"):
+                return self._send(200, self._chat(body))
+            if self.path.endswith("/embeddings"):
+                return self._send(200, self._embeddings(body))
+            self._send(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+        def _chat(self, body):
+            response = replay.chat.completions.create(model=body["model"], messages=body["messages"], response_format=body.get("response_format"), max_tokens=body.get("max_tokens"))
+            return {
+                "id": f"chatcmpl-standin-{int(time.time() * 1000)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": response.choices[0].message.content}, "finish_reason": response.choices[0].finish_reason}],
+                "usage": vars(response.usage),
+            }
+
+        def _embeddings(self, body):
+            response = replay.embeddings.create(input=body["input"], model=body["model"])
+            as_base64 = body.get("encoding_format") == "base64"
+            data = []
+            for item in response.data:
+                embedding = base64.b64encode(array("f", item.embedding).tobytes()).decode("ascii") if as_base64 else item.embedding
+                data.append({"object": "embedding", "index": item.index, "embedding": embedding})
+            return {"object": "list", "data": data, "model": body["model"], "usage": vars(response.usage)}
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+def serve_standin(replay, host="127.0.0.1", port=0):
+    """
+    Starts the stand-in server in a daemon thread.
+    Returns (server, base_url) where base_url is suitable for LLM_BASE_URL.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(replay))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded OpenAI responses from a local OpenAI-compatible endpoint.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--recordings", default="llm_recordings.jsonl")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--embedding-latency-ms", type=float, default=None)
+    cli_args = parser.parse_args()
+    replay = ReplayLLMClient(cli_args.recordings, latency_ms=cli_args.latency_ms, embedding_latency_ms=cli_args.embedding_latency_ms)
+    server = ThreadingHTTPServer((cli_args.host, cli_args.port), make_handler(replay))
+    print(f"OpenAI stand-in listening on http://{cli_args.host}:{cli_args.port}/v1 (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,66 @@
+"""
+Local stub of the CoinGecko and alternative.me endpoints used by conduct_market_research.
+
+Run it and point the agent at it with:
+    python benchmarks/market_stub.py --port 8767 --latency-ms 300
+    COINGECKO_API_URL=http://127.0.0.1:8767/api/v3 FEAR_GREED_API_URL=http://127.0.0.1:8767/fng/
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+RESPONSES = {
+    "/api/v3/simple/price": {"bitcoin": {"usd": 67250.0, "usd_24h_change": -2.31}, "solana": {"usd": 142.5, "usd_24h_change": -4.8}},
+    "/api/v3/global": {"data": {"market_cap_percentage": {"btc": 54.12, "eth": 16.4}}},
+    "/fng": {"data": [{"value": "27", "value_classification": "Fear"}]},
+}
+
+
+def make_handler(latency_ms, failing):
+    class MarketStubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = urlsplit(self.path).path.rstrip("/")
+            time.sleep(latency_ms / 1000.0)
+            if path not in RESPONSES or path in failing:
+                self.send_response(503 if path in failing else 404)
+                self.end_headers()
+                return
+            body = json.dumps(RESPONSES[path]).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MarketStubHandler
+
+
+def serve_market_stub(latency_ms=0.0, failing=(), host="127.0.0.1", port=0):
+    """
+    Starts the stub in a daemon thread. Paths listed in failing answer with HTTP 503.
+    Returns (server, coingecko_api_url, fear_greed_api_url).
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(latency_ms, set(failing)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://{host}:{server.server_address[1]}"
+    return server, f"{base}/api/v3", f"{base}/fng/"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve stub market data endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    cli_args = parser.parse_args()
+    server = ThreadingHTTPServer((cli_args.host, cli_args.port), make_handler(cli_args.latency_ms, set()))
+    print(f"Market data stub on http://{cli_args.host}:{cli_args.port} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,63 @@
+"""
+Local pre-ranking of engagement candidates.
+
+The feed and discovery actions used to hand every candidate tweet to the LLM to pick one.
+Here candidates are scored instead by the cosine similarity of their embeddings to the
+agent's interest profile: its own recent posts, its best scoring insights and its research
+categories. Each part of the profile is a group of reference vectors with a weight per
+vector. A candidate's score for a group is its best weighted similarity in that group, and
+its final score is the weighted mean over the non-empty groups.
+
+shortlist() then says whether the best candidate wins clearly. If it does not, only the
+closest few need to go to the LLM to break the tie.
+"""
+
+
+def normalize(vectors):
+    """Rows of vectors scaled to unit length, as a float32 matrix."""
+    import numpy as np
+    matrix = np.asarray(vectors, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[None, :]
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def group_scores(candidates, references, weights=None):
+    """For each candidate row, the best similarity to a reference row times that reference's weight."""
+    similarities = candidates @ references.T
+    if weights is not None:
+        similarities = similarities * weights[None, :]
+    return similarities.max(axis=1)
+
+
+def interest_scores(candidate_vectors, groups):
+    """
+    Scores candidates against groups, a list of (reference_vectors, weights, group_weight).
+    weights may be None for equally weighted references. Empty groups are skipped.
+    Returns a float array with one score per candidate.
+    """
+    import numpy as np
+    candidates = normalize(candidate_vectors)
+    total = np.zeros(len(candidates), dtype=np.float32)
+    weight_sum = 0.0
+    for references, weights, group_weight in groups:
+        if references is None or len(references) == 0 or group_weight <= 0:
+            continue
+        weights = None if weights is None else np.asarray(weights, dtype=np.float32)
+        total += group_weight * group_scores(candidates, normalize(references), weights)
+        weight_sum += group_weight
+    return total / weight_sum if weight_sum else total
+
+
+def shortlist(scores, size, margin, min_score=None):
+    """
+    Indices of the best `size` candidates, best first, and whether the first one wins
+    outright: it is the only candidate left, or it leads the runner-up by at least margin.
+    Candidates scoring below min_score are dropped first; the list can end up empty.
+    """
+    order = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+    if min_score is not None:
+        order = [i for i in order if scores[i] >= min_score]
+    order = order[:max(1, size)]
+    decided = len(order) == 1 or (len(order) > 1 and scores[order[0]] - scores[order[1]] >= margin)
+    return order, decided
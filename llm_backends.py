@@ -0,0 +1,170 @@
+"""
+Alternative LLM backends for X_Agent.
+
+Both clients expose the same `chat.completions.create` and `embeddings.create` calls as
+the OpenAI client, so the agent can use them in its place:
+
+* RecordingLLMClient wraps a real client and appends every response to a JSONL file.
+* ReplayLLMClient answers in-process from such a file, with configurable latency.
+
+Requests that have no recording get a deterministic fallback answer, so replayed runs
+always produce the same output without any network access.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+EMBEDDING_DIMENSIONS = 1536
+
+
+def chat_request_key(model, messages, response_format=None):
+    payload = json.dumps({"model": model, "messages": messages, "response_format": response_format}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def embedding_request_key(model, text):
+    return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) for when no usage was recorded."""
+    return max(1, len(text) // 4)
+
+
+def fallback_embedding(text, dimensions=EMBEDDING_DIMENSIONS):
+    """A deterministic unit vector derived from the text, used when no embedding was recorded."""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimensions)]
+    norm = sum(v * v for v in vector) ** 0.5
+    return [v / norm for v in vector]
+
+
+def _chat_response(model, content, usage, finish_reason="stop"):
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(
+        model=model,
+        choices=[SimpleNamespace(index=0, message=message, finish_reason=finish_reason)],
+        usage=SimpleNamespace(**usage),
+    )
+
+
+def _embedding_response(model, vectors, prompt_tokens):
+    data = [SimpleNamespace(index=i, embedding=vector) for i, vector in enumerate(vectors)]
+    return SimpleNamespace(model=model, data=data, usage=SimpleNamespace(prompt_tokens=prompt_tokens, total_tokens=prompt_tokens))
+
+
+class ReplayLLMClient:
+    """
+    In-process stand-in for the OpenAI client that replays recorded responses.
+    Each call sleeps for latency_ms (embedding_latency_ms for embeddings) before answering,
+    which lets benchmarks model network round-trips. Calls are thread-safe.
+    """
+    def __init__(self, recordings_file=None, latency_ms=0.0, embedding_latency_ms=None, default_text="Noted.", default_json="{}"):
+        self.latency_ms = latency_ms
+        self.embedding_latency_ms = latency_ms if embedding_latency_ms is None else embedding_latency_ms
+        self.default_text = default_text
+        self.default_json = default_json
+        self.chat_responses = {}
+        self.embeddings_by_key = {}
+        self.stats = {"chat_calls": 0, "embedding_calls": 0, "embedded_texts": 0, "misses": 0}
+        self._lock = threading.Lock()
+        if recordings_file and os.path.exists(recordings_file):
+            self.load(recordings_file)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+
+    def load(self, recordings_file):
+        with open(recordings_file, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["kind"] == "chat":
+                    self.chat_responses[record["key"]] = record["response"]
+                elif record["kind"] == "embedding":
+                    self.embeddings_by_key[record["key"]] = record["embedding"]
+
+    def _create_chat(self, model, messages, response_format=None, max_tokens=None, **kwargs):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+        recorded = self.chat_responses.get(chat_request_key(model, messages, response_format))
+        with self._lock:
+            self.stats["chat_calls"] += 1
+            if recorded is None:
+                self.stats["misses"] += 1
+        if recorded is None:
+            wants_json = (response_format or {}).get("type") == "json_object"
+            recorded = {"content": self.default_json if wants_json else self.default_text, "usage": None}
+        content, finish_reason = recorded["content"], "stop"
+        if max_tokens and estimate_tokens(content) > max_tokens:
+            # Cut like a real completion that runs into max_tokens, at about four characters per token.
+            content, finish_reason = content[:max_tokens * 4], "length"
+        usage = recorded.get("usage") if finish_reason == "stop" else None
+        if not usage:
+            prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+            completion_tokens = estimate_tokens(content)
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens}
+        return _chat_response(model, content, usage, finish_reason)
+
+    def _create_embeddings(self, input, model, **kwargs):
+        texts = [input] if isinstance(input, str) else list(input)
+        if self.embedding_latency_ms:
+            time.sleep(self.embedding_latency_ms / 1000.0)
+        vectors, misses = [], 0
+        for text in texts:
+            vector = self.embeddings_by_key.get(embedding_request_key(model, text))
+            if vector is None:
+                misses += 1
+                vector = fallback_embedding(text)
+            vectors.append(vector)
+        with self._lock:
+            self.stats["embedding_calls"] += 1
+            self.stats["embedded_texts"] += len(texts)
+            self.stats["misses"] += misses
+        return _embedding_response(model, vectors, sum(estimate_tokens(t) for t in texts))
+
+
+class RecordingLLMClient:
+    """Wraps a real OpenAI client and appends every chat and embedding response to a JSONL file."""
+    def __init__(self, client, recordings_file):
+        self._client = client
+        self._recordings_file = recordings_file
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+
+    def _append(self, records):
+        with self._lock, open(self._recordings_file, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _create_chat(self, model, messages, **kwargs):
+        response = self._client.chat.completions.create(model=model, messages=messages, **kwargs)
+        usage = getattr(response, "usage", None)
+        self._append([{
+            "kind": "chat",
+            "key": chat_request_key(model, messages, kwargs.get("response_format")),
+            "model": model,
+            "response": {
+                "content": response.choices[0].message.content,
+                "usage": {
+                    "prompt_tokens": usage.prompt_tokens,
+                    "completion_tokens": usage.completion_tokens,
+                    "total_tokens": usage.total_tokens,
+                } if usage else None,
+            },
+        }])
+        return response
+
+    def _create_embeddings(self, input, model, **kwargs):
+        response = self._client.embeddings.create(input=input, model=model, **kwargs)
+        texts = [input] if isinstance(input, str) else list(input)
+        self._append([
+            {"kind": "embedding", "key": embedding_request_key(model, text), "model": model, "embedding": item.embedding}
+            for text, item in zip(texts, response.data)
+        ])
+        return response
@@ -0,0 +1,139 @@
+"""
+Market data for X_Agent's market research step.
+
+MarketDataFetcher fetches the CoinGecko and Fear & Greed endpoints concurrently over one
+pooled requests.Session and keeps the last payload of each in SQLite, serving fresh ones
+from the cache and stale ones while they refresh in the background.
+benchmarks/market_stub.py serves stand-ins for the endpoints. MarketSummaryCache
+memoizes the analyst summaries written for a given market state.
+
+Like storage.py, the classes take the agent's logger and connection class as arguments.
+"""
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MarketDataFetcher:
+    """
+    Fetches the market data endpoints concurrently over a pooled HTTP session and keeps the
+    last payload of each endpoint in agent_state.db. Fresh payloads (younger than ttl) are
+    served from the cache. Stale ones (younger than max_stale) are served immediately while a
+    background refresh runs. Older or missing payloads are fetched before returning, and if
+    that fails, any cached payload is used as a fallback.
+    """
+    def __init__(self, path, endpoints, ttl, max_stale, timeout, log, connection_factory=sqlite3.Connection):
+        self.endpoints = endpoints
+        self.log = log
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.timeout = timeout
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(endpoints), pool_maxsize=len(endpoints))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix="market-data")
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._conn = sqlite3.connect(path, check_same_thread=False, factory=connection_factory)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS market_snapshots (endpoint TEXT PRIMARY KEY, fetched_at REAL, payload TEXT)''')
+        self._conn.commit()
+        self._cache = {endpoint: (fetched_at, json.loads(payload)) for endpoint, fetched_at, payload in self._conn.execute("SELECT endpoint, fetched_at, payload FROM market_snapshots")}
+
+    def _fetch(self, endpoint):
+        url, params = self.endpoints[endpoint]
+        response = self.session.get(url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        payload = response.json()
+        with self._lock:
+            self._cache[endpoint] = (time.time(), payload)
+            self._conn.execute("INSERT OR REPLACE INTO market_snapshots VALUES (?, ?, ?)", (endpoint, self._cache[endpoint][0], json.dumps(payload)))
+            self._conn.commit()
+        return payload
+
+    def _refresh_in_background(self, endpoint):
+        with self._lock:
+            if endpoint in self._refreshing:
+                return
+            self._refreshing.add(endpoint)
+
+        def refresh():
+            try:
+                self._fetch(endpoint)
+            except Exception as e:
+                self.log.debug("market_data_refresh_failed", endpoint=endpoint, e=e)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(endpoint)
+        self._executor.submit(refresh)
+
+    def get_snapshot(self):
+        """Returns a {endpoint: payload} dict for every configured endpoint."""
+        now = time.time()
+        snapshot, to_fetch = {}, []
+        with self._lock:
+            cached = dict(self._cache)
+        for endpoint in self.endpoints:
+            fetched_at, payload = cached.get(endpoint, (None, None))
+            age = now - fetched_at if fetched_at is not None else None
+            if age is not None and age < self.ttl:
+                snapshot[endpoint] = payload
+            elif age is not None and age < self.max_stale:
+                snapshot[endpoint] = payload
+                self._refresh_in_background(endpoint)
+            else:
+                to_fetch.append(endpoint)
+        futures = {endpoint: self._executor.submit(self._fetch, endpoint) for endpoint in to_fetch}
+        for endpoint, future in futures.items():
+            try:
+                snapshot[endpoint] = future.result()
+            except Exception as e:
+                if endpoint not in cached:
+                    raise
+                self.log.warning("market_data_using_stale", endpoint=endpoint, e=e)
+                snapshot[endpoint] = cached[endpoint][1]
+        self.log.debug("market_data_cache_status", cached=len(self.endpoints) - len(to_fetch), fetched=len(to_fetch))
+        return snapshot
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+        with self._lock:
+            self._conn.close()
+
+
+class MarketSummaryCache:
+    """
+    Persisted memo of market-analyst summaries, keyed on a quantized market-state signature.
+    Entries expire after ttl_seconds; beyond max_entries the oldest entries are evicted.
+    """
+    def __init__(self, path, ttl_seconds, max_entries, connection_factory=sqlite3.Connection):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, factory=connection_factory)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS market_summaries (signature TEXT PRIMARY KEY, summary TEXT, created_at REAL)''')
+        self._conn.commit()
+
+    def get(self, signature):
+        with self._lock:
+            row = self._conn.execute("SELECT summary, created_at FROM market_summaries WHERE signature=?", (signature,)).fetchone()
+        if row and time.time() - row[1] < self.ttl_seconds:
+            return row[0]
+        return None
+
+    def put(self, signature, summary):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO market_summaries VALUES (?, ?, ?)", (signature, summary, now))
+            self._conn.execute("DELETE FROM market_summaries WHERE created_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute("DELETE FROM market_summaries WHERE signature NOT IN (SELECT signature FROM market_summaries ORDER BY created_at DESC LIMIT ?)", (self.max_entries,))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
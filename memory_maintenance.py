@@ -0,0 +1,238 @@
+"""
+Retention and compaction for the agent's vector memory collection.
+
+Every self-reflection cycle adds new insights and every post adds a self_posted document,
+so without maintenance the collection (and its on-disk index) only ever grows. This module
+keeps it bounded:
+
+* near-duplicate insights are merged into the best scoring copy (by embedding similarity),
+* old insights expire unless the post they came from did well,
+* each memory type is capped at a maximum size, dropping the weakest entries first,
+* rebuild_collection() copies the collection into a fresh index offline, and
+  reclaim_disk_space() then removes the old index files, which is the only way to give the
+  space of deleted entries back to the disk.
+
+Only the collection calls get/update/delete/query/count are used, so any store with the
+Chroma collection interface can be maintained.
+"""
+import os
+import random
+import re
+import shutil
+import sqlite3
+import time
+
+# Memory types whose score is the like count of the post they were derived from.
+SCORED_TYPES = {"insight"}
+
+
+def created_at(memory_id, metadata):
+    """
+    Creation time of a memory. Entries from before created_at was stored fall back to the
+    timestamp in their id (insight_<unix time>_<n>); None if neither is available.
+    """
+    if metadata and metadata.get("created_at") is not None:
+        return float(metadata["created_at"])
+    for part in str(memory_id).split("_"):
+        if part.isdigit() and len(part) == 10:
+            return float(part)
+    return None
+
+
+def _rank_key(memory_type, memory_id, metadata):
+    """Higher ranks are kept first: scored types by likes then recency, the rest by recency."""
+    recency = created_at(memory_id, metadata) or 0.0
+    if memory_type in SCORED_TYPES:
+        return ((metadata or {}).get("likes") or 0, recency)
+    return (recency,)
+
+
+def _load(collection, memory_type, include_embeddings=False):
+    include = ["metadatas", "embeddings"] if include_embeddings else ["metadatas"]
+    data = collection.get(where={"type": memory_type}, include=include)
+    entries = list(zip(data["ids"], data["metadatas"] or [{}] * len(data["ids"])))
+    return entries, (data.get("embeddings") if include_embeddings else None)
+
+
+def merge_near_duplicates(collection, memory_type, threshold):
+    """
+    Keeps one entry per group of entries whose embeddings have a cosine similarity of at
+    least threshold. The kept entry is the best ranked one and takes over the highest like
+    count and the number of entries merged into it. Returns the number of entries removed.
+    """
+    import numpy as np
+    entries, embeddings = _load(collection, memory_type, include_embeddings=True)
+    if len(entries) < 2:
+        return 0
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    order = sorted(range(len(entries)), key=lambda i: _rank_key(memory_type, *entries[i]), reverse=True)
+    kept, removed, merged_into = [], [], {}
+    for i in order:
+        if kept:
+            similarities = vectors[kept] @ vectors[i]
+            best = int(np.argmax(similarities))
+            if similarities[best] >= threshold:
+                removed.append(i)
+                merged_into.setdefault(kept[best], []).append(i)
+                continue
+        kept.append(i)
+    if not removed:
+        return 0
+    updated_ids, updated_metadatas = [], []
+    for keeper, duplicates in merged_into.items():
+        metadata = dict(entries[keeper][1] or {})
+        group = [entries[j][1] or {} for j in duplicates] + [metadata]
+        if memory_type in SCORED_TYPES:
+            metadata["likes"] = max((m.get("likes") or 0) for m in group)
+        metadata["merged"] = sum(m.get("merged", 1) for m in group)
+        updated_ids.append(entries[keeper][0])
+        updated_metadatas.append(metadata)
+    collection.update(ids=updated_ids, metadatas=updated_metadatas)
+    collection.delete(ids=[entries[i][0] for i in removed])
+    return len(removed)
+
+
+def expire_old(collection, memory_type, max_age_days, keep_min_likes=None, now=None):
+    """
+    Deletes entries older than max_age_days; entries of unknown age are kept. With
+    keep_min_likes, scored entries with at least that many likes are kept regardless of age.
+    Returns the number of entries removed.
+    """
+    if not max_age_days or max_age_days <= 0:
+        return 0
+    cutoff = (now or time.time()) - max_age_days * 86400
+    entries, _embeddings = _load(collection, memory_type)
+    expired = []
+    for memory_id, metadata in entries:
+        created = created_at(memory_id, metadata)
+        if created is None or created >= cutoff:
+            continue
+        if keep_min_likes is not None and memory_type in SCORED_TYPES and ((metadata or {}).get("likes") or 0) >= keep_min_likes:
+            continue
+        expired.append(memory_id)
+    if expired:
+        collection.delete(ids=expired)
+    return len(expired)
+
+
+def cap_type(collection, memory_type, max_entries):
+    """Deletes the lowest ranked entries beyond max_entries. Returns the number of entries removed."""
+    entries, _embeddings = _load(collection, memory_type)
+    if max_entries is None or len(entries) <= max_entries:
+        return 0
+    entries.sort(key=lambda entry: _rank_key(memory_type, *entry), reverse=True)
+    dropped = [memory_id for memory_id, _metadata in entries[max_entries:]]
+    collection.delete(ids=dropped)
+    return len(dropped)
+
+
+def maintain_collection(collection, dedup_similarity, max_age_days, keep_min_likes, max_per_type):
+    """
+    Applies the retention policy: merges near-duplicate insights, expires old insights and
+    caps every type in max_per_type ({type: max_entries}).
+    Returns {"merged": n, "expired": n, "capped": n}.
+    """
+    summary = {"merged": 0, "expired": 0, "capped": 0}
+    if dedup_similarity:
+        summary["merged"] = merge_near_duplicates(collection, "insight", dedup_similarity)
+    summary["expired"] = expire_old(collection, "insight", max_age_days, keep_min_likes)
+    for memory_type, max_entries in (max_per_type or {}).items():
+        summary["capped"] += cap_type(collection, memory_type, max_entries)
+    return summary
+
+
+def directory_size(path):
+    """Total size in bytes of all files below path."""
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def measure_query_latency(collection, samples=20, n_results=2, seed=0):
+    """
+    Times `samples` queries that use stored embeddings as query vectors.
+    Returns (median_ms, max_ms), or (None, None) for an empty collection.
+    """
+    data = collection.get(include=["embeddings"])
+    embeddings = data.get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        return None, None
+    rng = random.Random(seed)
+    durations = []
+    for _ in range(samples):
+        vector = embeddings[rng.randrange(len(embeddings))]
+        start = time.perf_counter()
+        collection.query(query_embeddings=[list(vector)], n_results=n_results)
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return durations[len(durations) // 2], durations[-1]
+
+
+def collection_report(collection, path, memory_types):
+    """Entry counts per type, on-disk size and query latency of a collection."""
+    median_ms, max_ms = measure_query_latency(collection)
+    return {
+        "total": collection.count(),
+        "by_type": {memory_type: len(collection.get(where={"type": memory_type}, include=[])["ids"]) for memory_type in memory_types},
+        "disk_bytes": directory_size(path),
+        "query_median_ms": median_ms,
+        "query_max_ms": max_ms,
+    }
+
+
+def rebuild_collection(client, name, batch_size=500):
+    """
+    Copies collection `name` into a freshly built index and swaps it in, which drops the
+    space that deleted entries still take up in the old index. Run it while the agent is
+    stopped. Returns the new collection.
+    """
+    source = client.get_collection(name=name)
+    staging_name = f"{name}_rebuild"
+    try:
+        client.delete_collection(name=staging_name)
+    except Exception:
+        pass
+    staging = client.create_collection(name=staging_name, embedding_function=None, metadata=source.metadata)
+    total = source.count()
+    for offset in range(0, total, batch_size):
+        batch = source.get(limit=batch_size, offset=offset, include=["embeddings", "documents", "metadatas"])
+        if batch["ids"]:
+            staging.add(ids=batch["ids"], embeddings=batch["embeddings"], documents=batch["documents"], metadatas=batch["metadatas"])
+    if staging.count() != total:
+        client.delete_collection(name=staging_name)
+        raise RuntimeError(f"Rebuild copied {staging.count()} of {total} entries; the original collection was left untouched.")
+    client.delete_collection(name=name)
+    staging.modify(name=name)
+    return client.get_collection(name=name)
+
+
+SEGMENT_DIR_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
+
+def reclaim_disk_space(path):
+    """
+    Deletes index directories of a Chroma persist directory that no live segment refers to
+    any more (left behind by deleted collections) and vacuums chroma.sqlite3.
+    Returns the number of bytes freed. Offline use only.
+    """
+    database = os.path.join(path, "chroma.sqlite3")
+    if not os.path.exists(database):
+        return 0
+    size_before = directory_size(path)
+    conn = sqlite3.connect(database)
+    try:
+        live_segments = {row[0] for row in conn.execute("SELECT id FROM segments")}
+        for name in os.listdir(path):
+            if SEGMENT_DIR_PATTERN.match(name) and name not in live_segments and os.path.isdir(os.path.join(path, name)):
+                shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    return size_before - directory_size(path)
+
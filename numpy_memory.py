@@ -0,0 +1,370 @@
+"""
+In-process vector memory backed by NumPy, an alternative to the chromadb collection.
+
+NumpyVectorStore implements the part of the Chroma collection interface the agent uses
+(add, get, update, delete, query, count), so it can stand in for the collection anywhere,
+including memory_maintenance. Entries are grouped by their "type" metadata and each type
+is one contiguous float32 matrix of L2-normalized vectors:
+
+    <path>/store.json          dimensions and the list of types
+    <path>/<type>.<n>.f32      raw float32 rows, memory-mapped read-only
+    <path>/<type>.json         ids, documents and metadatas in row order, and the current .f32 file
+
+Adding entries appends rows to the .f32 file past the end of the mapped rows, so the file
+is never truncated under a mapping, and rewrites the type's small .json file. Deletes and
+embedding updates write the matrix copy-on-write to the next generation's .f32 file and
+switch to it; queries still holding the old mapping keep reading the old file, which is
+removed once nothing maps it (or, where the OS refuses that, the next time the store is
+opened). Opening the store maps the files without reading them, so startup is instant and
+only the pages a query touches are loaded.
+
+Queries are exact: a matrix-vector product per type and np.argpartition for the top-k.
+Distances are cosine distances (1 - cosine similarity), which rank unit-length embeddings
+like OpenAI's exactly as Chroma's default squared L2 distance does.
+"""
+import json
+import os
+import re
+import threading
+
+import numpy as np
+
+STORE_FILE = "store.json"
+UNTYPED = "__untyped__"
+
+
+def _type_key(metadata):
+    value = (metadata or {}).get("type")
+    return UNTYPED if value is None else str(value)
+
+
+def _file_stem(memory_type):
+    return re.sub(r"[^A-Za-z0-9_-]", "_", memory_type)
+
+
+def _write_json_atomic(path, payload):
+    temporary = f"{path}.tmp"
+    # json.dumps uses the C encoder; json.dump would stream through the much slower Python one.
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(json.dumps(payload, ensure_ascii=False))
+    os.replace(temporary, path)
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.ascontiguousarray(vectors / np.maximum(norms, 1e-12), dtype=np.float32)
+
+
+def _matches(metadata, where):
+    """Evaluates the subset of Chroma's where syntax the agent uses: equality, $eq, $ne, $in, $nin and $and/$or."""
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, operand in condition.items():
+            if operator == "$eq" and value != operand:
+                return False
+            if operator == "$ne" and value == operand:
+                return False
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$nin" and value in operand:
+                return False
+            if operator not in ("$eq", "$ne", "$in", "$nin"):
+                raise ValueError(f"Unsupported where operator: {operator}")
+    return True
+
+
+def _types_of(where):
+    """The memory types a where filter can match, or None when it does not restrict the type."""
+    if not where or "type" not in where:
+        return None
+    condition = where["type"]
+    if not isinstance(condition, dict):
+        return {str(condition)}
+    if "$eq" in condition:
+        return {str(condition["$eq"])}
+    if "$in" in condition:
+        return {str(value) for value in condition["$in"]}
+    return None
+
+
+class _Segment:
+    """All entries of one memory type: a float32 matrix plus ids, documents and metadatas in row order."""
+    def __init__(self, path, memory_type, dimensions):
+        self.stem = _file_stem(memory_type)
+        self.path = path
+        self.memory_type = memory_type
+        self.records_path = os.path.join(path, f"{self.stem}.json")
+        self.dimensions = dimensions
+        self.ids, self.documents, self.metadatas = [], [], []
+        # Stores written before generations were introduced have a single <type>.f32 file.
+        self.vectors_file = f"{self.stem}.f32"
+        if os.path.exists(self.records_path):
+            with open(self.records_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            self.ids, self.documents, self.metadatas = records["ids"], records["documents"], records["metadatas"]
+            self.vectors_file = records.get("vectors", self.vectors_file)
+        self.rows = {memory_id: row for row, memory_id in enumerate(self.ids)}
+        self.vectors = self._map()
+        self._remove_stale_files()
+
+    @property
+    def vectors_path(self):
+        return os.path.join(self.path, self.vectors_file)
+
+    def _map(self):
+        if not self.ids:
+            return np.empty((0, self.dimensions), dtype=np.float32)
+        # Rows beyond len(ids) are left over from an interrupted add and are ignored.
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.ids), self.dimensions))
+
+    def _save_records(self):
+        _write_json_atomic(self.records_path, {"ids": self.ids, "documents": self.documents, "metadatas": self.metadatas, "vectors": self.vectors_file})
+
+    def _next_vectors_file(self):
+        match = re.fullmatch(rf"{re.escape(self.stem)}\.(\d+)\.f32", self.vectors_file)
+        return f"{self.stem}.{int(match.group(1)) + 1 if match else 1}.f32"
+
+    def _remove_stale_files(self):
+        """Deletes this type's old .f32 generations; files still mapped elsewhere (Windows) are left for later."""
+        pattern = re.compile(rf"{re.escape(self.stem)}(?:\.\d+)?\.f32(?:\.tmp)?")
+        for name in os.listdir(self.path):
+            if name != self.vectors_file and pattern.fullmatch(name):
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    def append(self, ids, vectors, documents, metadatas):
+        # Write after the mapped rows without truncating: rows left by an interrupted add are
+        # overwritten in place, and the region any mapping covers is never touched.
+        mode = "r+b" if os.path.exists(self.vectors_path) else "wb"
+        with open(self.vectors_path, mode) as f:
+            f.seek(len(self.ids) * self.dimensions * 4)
+            f.write(vectors.tobytes())
+        # New lists rather than in-place appends, so snapshots taken by running queries stay valid.
+        self.ids = self.ids + ids
+        self.documents = self.documents + documents
+        self.metadatas = self.metadatas + metadatas
+        self.rows.update((memory_id, row) for row, memory_id in enumerate(ids, len(self.rows)))
+        self._save_records()
+        self.vectors = self._map()
+
+    def rewrite(self, keep_rows, replaced_vectors=None):
+        """Keeps only keep_rows (in order), optionally with new vectors for some of them ({row: vector})."""
+        vectors = np.array(self.vectors[keep_rows], dtype=np.float32) if len(keep_rows) else np.empty((0, self.dimensions), dtype=np.float32)
+        for position, row in enumerate(keep_rows):
+            if replaced_vectors and row in replaced_vectors:
+                vectors[position] = replaced_vectors[row]
+        # Copy-on-write: the new matrix goes to a new file, so the old one is never replaced
+        # or truncated while query snapshots may still have it mapped.
+        self.vectors_file = self._next_vectors_file()
+        with open(self.vectors_path, "wb") as f:
+            f.write(vectors.tobytes())
+        self.ids = [self.ids[row] for row in keep_rows]
+        self.documents = [self.documents[row] for row in keep_rows]
+        self.metadatas = [self.metadatas[row] for row in keep_rows]
+        self.rows = {memory_id: row for row, memory_id in enumerate(self.ids)}
+        self._save_records()
+        self.vectors = self._map()
+        self._remove_stale_files()
+
+
+class NumpyVectorStore:
+    """
+    Persistent vector store with the Chroma collection calls used by the agent.
+    Thread-safe; readers work on a consistent snapshot of each type's matrix.
+    """
+    def __init__(self, path, name="agent_memory"):
+        self.path = path
+        self.name = name
+        self.metadata = None
+        self._lock = threading.RLock()
+        os.makedirs(path, exist_ok=True)
+        self.dimensions = None
+        self._segments = {}
+        store_file = os.path.join(path, STORE_FILE)
+        if os.path.exists(store_file):
+            with open(store_file, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            self.dimensions = manifest["dimensions"]
+            for memory_type in manifest["types"]:
+                self._segments[memory_type] = _Segment(path, memory_type, self.dimensions)
+
+    def _save_manifest(self):
+        _write_json_atomic(os.path.join(self.path, STORE_FILE), {"name": self.name, "dimensions": self.dimensions, "types": sorted(self._segments)})
+
+    def _segment(self, memory_type):
+        if memory_type not in self._segments:
+            self._segments[memory_type] = _Segment(self.path, memory_type, self.dimensions)
+            self._save_manifest()
+        return self._segments[memory_type]
+
+    def _locate(self, memory_id):
+        for segment in self._segments.values():
+            row = segment.rows.get(memory_id)
+            if row is not None:
+                return segment, row
+        return None, None
+
+    def _selected_segments(self, where):
+        types = _types_of(where)
+        return [segment for memory_type, segment in self._segments.items() if types is None or memory_type in types]
+
+    def count(self):
+        with self._lock:
+            return sum(len(segment.ids) for segment in self._segments.values())
+
+    def add(self, ids, embeddings, documents=None, metadatas=None):
+        """Adds new entries. Ids that already exist are skipped, as Chroma does."""
+        documents = documents or [None] * len(ids)
+        metadatas = metadatas or [None] * len(ids)
+        vectors = _normalize(embeddings)
+        with self._lock:
+            if self.dimensions is None:
+                self.dimensions = int(vectors.shape[1])
+                self._save_manifest()
+            if vectors.shape[1] != self.dimensions:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match the store's dimension {self.dimensions}.")
+            by_type, seen = {}, set()
+            for i, memory_id in enumerate(ids):
+                if memory_id in seen or self._locate(memory_id)[0] is not None:
+                    continue
+                seen.add(memory_id)
+                by_type.setdefault(_type_key(metadatas[i]), []).append(i)
+            for memory_type, positions in by_type.items():
+                self._segment(memory_type).append(
+                    [ids[i] for i in positions], vectors[positions],
+                    [documents[i] for i in positions], [metadatas[i] for i in positions],
+                )
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=("metadatas", "documents")):
+        with self._lock:
+            if ids is not None:
+                located = [self._locate(memory_id) for memory_id in ids]
+                rows = [(segment, row) for segment, row in located if segment is not None]
+            else:
+                rows = [(segment, row) for segment in self._selected_segments(where) for row in range(len(segment.ids))]
+            if where:
+                rows = [(segment, row) for segment, row in rows if _matches(segment.metadatas[row], where)]
+            rows = rows[offset or 0:]
+            if limit is not None:
+                rows = rows[:limit]
+            result = {"ids": [segment.ids[row] for segment, row in rows], "embeddings": None, "documents": None, "metadatas": None, "included": list(include)}
+            if "embeddings" in include:
+                result["embeddings"] = np.array([segment.vectors[row] for segment, row in rows], dtype=np.float32).reshape(len(rows), self.dimensions or 0)
+            if "documents" in include:
+                result["documents"] = [segment.documents[row] for segment, row in rows]
+            if "metadatas" in include:
+                result["metadatas"] = [segment.metadatas[row] for segment, row in rows]
+            return result
+
+    def update(self, ids, embeddings=None, documents=None, metadatas=None):
+        """Replaces the given fields of existing entries; unknown ids are ignored."""
+        with self._lock:
+            vectors = _normalize(embeddings) if embeddings is not None else None
+            moved, replaced, touched = [], {}, set()
+            for i, memory_id in enumerate(ids):
+                segment, row = self._locate(memory_id)
+                if segment is None:
+                    continue
+                if metadatas is not None and _type_key(metadatas[i]) != segment.memory_type:
+                    moved.append((memory_id, i))
+                    continue
+                touched.add(segment)
+                if documents is not None:
+                    segment.documents[row] = documents[i]
+                if metadatas is not None:
+                    segment.metadatas[row] = metadatas[i]
+                if vectors is not None:
+                    replaced.setdefault(segment, {})[row] = vectors[i]
+            for segment in touched:
+                if segment in replaced:
+                    segment.rewrite(list(range(len(segment.ids))), replaced[segment])
+                else:
+                    segment._save_records()
+            # Entries whose type changed move to the matrix of their new type.
+            for memory_id, i in moved:
+                current = self.get(ids=[memory_id], include=["embeddings", "documents"])
+                self.delete(ids=[memory_id])
+                self.add(
+                    ids=[memory_id],
+                    embeddings=vectors[i:i + 1] if vectors is not None else current["embeddings"],
+                    documents=[documents[i] if documents is not None else current["documents"][0]],
+                    metadatas=[metadatas[i]],
+                )
+
+    def delete(self, ids=None, where=None):
+        with self._lock:
+            doomed = set(self.get(ids=ids, where=where, include=[])["ids"])
+            for segment in self._segments.values():
+                if doomed.intersection(segment.rows):
+                    segment.rewrite([row for row, memory_id in enumerate(segment.ids) if memory_id not in doomed])
+
+    def query(self, query_embeddings, n_results=10, where=None, include=("metadatas", "documents", "distances")):
+        """Exact top-n_results by cosine similarity for each query vector, in Chroma's result layout."""
+        queries = _normalize(query_embeddings)
+        with self._lock:
+            snapshot = [(segment.vectors, segment.ids, segment.documents, segment.metadatas) for segment in self._selected_segments(where)]
+        candidates = [[] for _ in range(len(queries))]
+        for vectors, segment_ids, segment_documents, segment_metadatas in snapshot:
+            if not segment_ids:
+                continue
+            mask = None
+            if where and set(where) != {"type"}:
+                mask = np.array([_matches(metadata, where) for metadata in segment_metadatas], dtype=bool)
+                if not mask.any():
+                    continue
+            similarities = (vectors @ queries.T).T
+            if mask is not None:
+                similarities[:, ~mask] = -np.inf
+            k = min(n_results, similarities.shape[1])
+            for q, row_similarities in enumerate(similarities):
+                if k < len(row_similarities):
+                    top = np.argpartition(-row_similarities, k - 1)[:k]
+                else:
+                    top = np.arange(len(row_similarities))
+                candidates[q].extend(
+                    (float(row_similarities[row]), segment_ids[row], segment_documents[row], segment_metadatas[row])
+                    for row in top if row_similarities[row] > -np.inf
+                )
+        result = {key: [] for key in ("ids", "documents", "metadatas", "distances")}
+        result.update({"embeddings": None, "included": list(include)})
+        for found in candidates:
+            found.sort(key=lambda candidate: candidate[0], reverse=True)
+            found = found[:n_results]
+            result["ids"].append([candidate[1] for candidate in found])
+            result["documents"].append([candidate[2] for candidate in found])
+            result["metadatas"].append([candidate[3] for candidate in found])
+            result["distances"].append([1.0 - candidate[0] for candidate in found])
+        for key in ("documents", "metadatas", "distances"):
+            if key not in include:
+                result[key] = None
+        return result
+
+
+def migrate_collection(source, target, batch_size=500):
+    """
+    Copies every entry of a Chroma collection (or any store with the same get call) into
+    target, batch by batch. Entries already in target are skipped. Returns the number of
+    entries in target afterwards.
+    """
+    total = source.count()
+    for offset in range(0, total, batch_size):
+        batch = source.get(limit=batch_size, offset=offset, include=["embeddings", "documents", "metadatas"])
+        if batch["ids"]:
+            target.add(ids=batch["ids"], embeddings=batch["embeddings"], documents=batch["documents"], metadatas=batch["metadatas"])
+    return target.count()
@@ -0,0 +1,300 @@
+"""
+SQLite persistence for X_Agent's state and caches.
+
+agent_state.db runs in WAL mode with indexes on the columns the agent looks up by. Writes
+from the hot paths (action log, engagements, token usage, observations) go through
+WriteBehindQueue, which commits them in batched transactions on its own thread.
+EmbeddingCache keeps embedding vectors in a separate SQLite file, and RecallCache answers
+repeated vector memory queries in memory until the memory types they cover change.
+
+The classes take the agent's logger and connection class as arguments, so the agent can
+pass its catalog logger and traced connections in.
+"""
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict, defaultdict
+
+
+def configure_db_connection(conn):
+    # WAL lets the background writer commit while the main thread keeps reading.
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+
+
+def create_schema(conn):
+    cursor = conn.cursor()
+    cursor.execute('''CREATE TABLE IF NOT EXISTS observations (timestamp TEXT, tweet_id TEXT PRIMARY KEY, subject TEXT, content TEXT, status TEXT, likes INTEGER DEFAULT 0, retweets INTEGER DEFAULT 0)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS engagements (timestamp TEXT, engagement_type TEXT, target_tweet_id TEXT, content TEXT, status TEXT)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS potential_partners (screen_name TEXT PRIMARY KEY, discovery_date TEXT, status TEXT)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS action_log (timestamp TEXT, action_name TEXT, target TEXT, status TEXT)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS token_usage (timestamp TEXT, action_name TEXT, purpose TEXT, model TEXT, prompt_chars INTEGER, prompt_tokens INTEGER, completion_tokens INTEGER, total_tokens INTEGER)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS insight_digests (subject TEXT PRIMARY KEY, insights TEXT, updated_at TEXT)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS seen_tweets (tweet_id TEXT PRIMARY KEY, outcome TEXT, score REAL, model TEXT, embedding BLOB, seen_at REAL)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_engagements_target_tweet_id ON engagements (target_tweet_id)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_observations_timestamp ON observations (timestamp)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_action_log_timestamp_action ON action_log (timestamp, action_name)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_token_usage_timestamp ON token_usage (timestamp)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS idx_seen_tweets_seen_at ON seen_tweets (seen_at)''')
+    conn.commit()
+
+
+class WriteBehindQueue:
+    """
+    Queues INSERT/UPDATE statements from the agent's hot paths and commits them in batched
+    transactions on a background thread with its own connection. A batch is written once it
+    reaches batch_size statements or flush_seconds after its first statement, whichever
+    comes first. flush() blocks until everything queued so far is committed.
+    """
+    _FLUSH = object()
+    _CLOSE = object()
+
+    def __init__(self, path, batch_size, flush_seconds, log, connection_factory=sqlite3.Connection):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.log = log
+        self.connection_factory = connection_factory
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def execute(self, sql, params=()):
+        self._queue.put((sql, params))
+
+    def flush(self):
+        done = threading.Event()
+        self._queue.put((self._FLUSH, done))
+        done.wait()
+
+    def close(self):
+        self._queue.put((self._CLOSE, None))
+        self._thread.join()
+
+    def _commit(self, conn, pending):
+        if not pending:
+            return
+        try:
+            # Consecutive statements with the same SQL are sent as one executemany.
+            start = 0
+            while start < len(pending):
+                end = start
+                while end < len(pending) and pending[end][0] == pending[start][0]:
+                    end += 1
+                conn.executemany(pending[start][0], [params for _sql, params in pending[start:end]])
+                start = end
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            self.log.warning("db_write_error", count=len(pending), e=e)
+        pending.clear()
+
+    def _run(self):
+        conn = sqlite3.connect(self.path, factory=self.connection_factory)
+        configure_db_connection(conn)
+        # The writer may run before the main connection is opened on a fresh database.
+        create_schema(conn)
+        pending, deadline = [], None
+        while True:
+            try:
+                timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+                sql, params = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._commit(conn, pending)
+                deadline = None
+                continue
+            if sql is self._FLUSH or sql is self._CLOSE:
+                self._commit(conn, pending)
+                deadline = None
+                if sql is self._CLOSE:
+                    conn.close()
+                    return
+                params.set()
+                continue
+            pending.append((sql, params))
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_seconds
+            if len(pending) >= self.batch_size:
+                self._commit(conn, pending)
+                deadline = None
+
+
+class RecallCache:
+    """
+    Wraps the vector memory collection and answers repeated queries from memory.
+    Results are keyed by the query embeddings, where filter, n_results and include. Each
+    memory type has a generation counter that every add, update or delete touching it
+    increments; a cached result is only served while the generations of the types its filter
+    covers are unchanged, so between reflection cycles insight recalls never reach the index.
+    """
+    ALL_TYPES = "*"
+
+    def __init__(self, collection, max_entries):
+        self._collection = collection
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _types(where):
+        """The memory types a where filter covers; ALL_TYPES when it does not filter by type."""
+        condition = (where or {}).get("type")
+        if isinstance(condition, str):
+            return [condition]
+        if isinstance(condition, dict) and isinstance(condition.get("$in"), list):
+            return sorted(condition["$in"])
+        if isinstance(condition, dict) and "$eq" in condition:
+            return [condition["$eq"]]
+        return [RecallCache.ALL_TYPES]
+
+    def _generation_snapshot(self, types):
+        if types == [self.ALL_TYPES]:
+            return tuple(sorted(self._generations.items()))
+        return tuple(self._generations[memory_type] for memory_type in types) + (self._generations[self.ALL_TYPES],)
+
+    def _bump(self, metadatas=None):
+        """Invalidates the given types, or every type when they are unknown (deletes by id)."""
+        with self._lock:
+            types = {(metadata or {}).get("type") for metadata in metadatas} if metadatas else {self.ALL_TYPES}
+            for memory_type in types:
+                self._generations[memory_type] += 1
+
+    def query(self, query_embeddings, n_results=10, where=None, **kwargs):
+        if "embeddings" in (kwargs.get("include") or ()):
+            return self._collection.query(query_embeddings=query_embeddings, n_results=n_results, where=where, **kwargs)
+        digest = hashlib.sha256()
+        for embedding in query_embeddings:
+            digest.update(array('f', embedding).tobytes())
+        key = (digest.hexdigest(), json.dumps(where, sort_keys=True), n_results, json.dumps(kwargs, sort_keys=True))
+        types = self._types(where)
+        with self._lock:
+            generation = self._generation_snapshot(types)
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == generation:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return json.loads(cached[1])
+            self.misses += 1
+        result = self._collection.query(query_embeddings=query_embeddings, n_results=n_results, where=where, **kwargs)
+        # Stored serialized, so callers can modify the result they get without touching the cache.
+        frozen = json.dumps({name: value for name, value in result.items() if name in ("ids", "documents", "metadatas", "distances")}, default=float)
+        with self._lock:
+            self._entries[key] = (generation, frozen)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return json.loads(frozen)
+
+    def add(self, **kwargs):
+        try:
+            return self._collection.add(**kwargs)
+        finally:
+            self._bump(kwargs.get("metadatas"))
+
+    def update(self, **kwargs):
+        try:
+            return self._collection.update(**kwargs)
+        finally:
+            # The old type of an updated entry is unknown here, so every type is invalidated.
+            self._bump()
+
+    def delete(self, **kwargs):
+        try:
+            return self._collection.delete(**kwargs)
+        finally:
+            self._bump()
+
+    def generation(self, where=None):
+        """A value that changes whenever a memory type covered by where is written to."""
+        with self._lock:
+            return self._generation_snapshot(self._types(where))
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, on-disk cache for embedding vectors.
+    Entries are keyed by a hash of the model name and the exact input text. Once the cache
+    grows past max_entries, the least recently used vectors are evicted. Cache hits only note
+    their last_used time in memory; the times are written with the next put_many or on close,
+    so reads never wait for a commit.
+    """
+    def __init__(self, path, max_entries, connection_factory=sqlite3.Connection):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._last_used = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False, factory=connection_factory)
+        configure_db_connection(self._conn)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model TEXT, vector BLOB, last_used REAL)''')
+        self._conn.execute('''CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)''')
+        self._conn.commit()
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @staticmethod
+    def make_key(model, text):
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, model, texts):
+        """Returns a {text: vector} dict for every text that is already cached."""
+        keys = {self.make_key(model, text): text for text in texts}
+        if not keys:
+            return {}
+        with self._lock:
+            placeholders = ",".join("?" * len(keys))
+            rows = self._conn.execute(f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", list(keys)).fetchall()
+            now = time.time()
+            self._last_used.update((key, now) for key, _vector in rows)
+            found = {keys[key]: array('f', vector).tolist() for key, vector in rows}
+            hits = sum(1 for text in texts if text in found)
+            self.hits += hits
+            self.misses += len(texts) - hits
+        return found
+
+    def _write_last_used(self):
+        if self._last_used:
+            self._conn.executemany("UPDATE embeddings SET last_used=? WHERE key=?", [(now, key) for key, now in self._last_used.items()])
+            self._last_used.clear()
+
+    def put_many(self, model, vectors):
+        """Stores a {text: vector} dict and evicts the least recently used entries if needed."""
+        if not vectors:
+            return
+        now = time.time()
+        rows = [(self.make_key(model, text), model, array('f', vector).tobytes(), now) for text, vector in vectors.items()]
+        with self._lock:
+            # Eviction goes by last_used, so the times noted by get_many are written first.
+            self._write_last_used()
+            placeholders = ",".join("?" * len(rows))
+            existing = self._conn.execute(f"SELECT COUNT(*) FROM embeddings WHERE key IN ({placeholders})", [row[0] for row in rows]).fetchone()[0]
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, model, vector, last_used) VALUES (?, ?, ?, ?)", rows)
+            self._size += len(rows) - existing
+            if self._size > self.max_entries:
+                self._conn.execute("DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)", (self._size - self.max_entries,))
+            self._conn.commit()
+            if self._size > self.max_entries:
+                self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": self._size}
+
+    def close(self):
+        with self._lock:
+            self._write_last_used()
+            self._conn.commit()
+            self._conn.close()
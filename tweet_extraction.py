@@ -0,0 +1,158 @@
+"""
+Reading tweets from X pages in a single WebDriver round-trip.
+
+Every selector used to read tweets lives in TWEET_SELECTORS. extract_tweets() and
+read_post_metrics() run one execute_script each and return plain records, so scanning a
+page costs one round-trip instead of several find_element calls per tweet. The feed,
+mentions, discovery and monitor actions and the metrics harvest all read pages this way.
+"""
+import re
+from datetime import datetime
+
+
+TWEET_SELECTORS = {
+    "article": 'article[data-testid="tweet"]',
+    "status_link": 'a[href*="/status/"]',
+    "user_name": 'div[data-testid="User-Name"]',
+    "time": 'time',
+    "text": 'div[data-testid="tweetText"]',
+    "like_button": 'button[data-testid="like"]',
+    "unlike_button": 'button[data-testid="unlike"]',
+    "retweet_button": 'button[data-testid="retweet"]',
+    "unretweet_button": 'button[data-testid="unretweet"]',
+    "likes_link": 'a[href*="/likes"]',
+    "retweets_link": 'a[href*="/retweets"]',
+    "action_bar": 'div[role="group"]',
+    "count": 'span[data-testid="app-text-transition-container"]',
+}
+
+
+EXTRACT_TWEETS_JS = """
+const sel = arguments[0];
+const limit = arguments[1];
+let articles = Array.from(document.querySelectorAll(sel.article));
+if (limit > 0) articles = articles.slice(0, limit);
+return articles.map((article, index) => {
+    const time = article.querySelector(sel.time);
+    let link = time ? time.closest('a') : null;
+    if (!link || !link.href.includes('/status/')) link = article.querySelector(sel.status_link);
+    const url = link ? link.href : null;
+    const idMatch = url ? url.match(/\\/status\\/(\\d+)/) : null;
+    let author = null;
+    const nameBox = article.querySelector(sel.user_name);
+    if (nameBox) {
+        for (const span of nameBox.querySelectorAll('span')) {
+            const handle = span.textContent.trim();
+            if (handle.startsWith('@')) { author = handle.toLowerCase(); break; }
+        }
+    }
+    const textElement = article.querySelector(sel.text);
+    const text = textElement ? textElement.innerText : null;
+    const mentions = text ? Array.from(new Set((text.match(/@(\\w+)/g) || []).map(h => h.slice(1)))) : [];
+    return {
+        index: index,
+        id: idMatch ? idMatch[1] : null,
+        url: url,
+        author: author,
+        timestamp: time ? time.getAttribute('datetime') : null,
+        text: text,
+        liked: article.querySelector(sel.unlike_button) !== null,
+        mentions: mentions,
+        element: article,
+        like_button: article.querySelector(sel.like_button)
+    };
+});
+"""
+
+
+def extract_tweets(driver, limit=None):
+    """
+    Reads every tweet on the current page with a single execute_script round-trip.
+    Returns a list of dicts with the keys: index, id, url, author (lowercase '@handle'),
+    timestamp (ISO string), text, liked, mentions (handles without '@'), element and
+    like_button (WebElements, the latter None if the tweet can't be liked).
+    Fields that could not be found on the page are None.
+    """
+    return driver.execute_script(EXTRACT_TWEETS_JS, TWEET_SELECTORS, limit or 0) or []
+
+
+def parse_tweet_timestamp(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+HARVEST_METRICS_JS = """
+const sel = arguments[0];
+const scroll = arguments[1];
+const countText = (article, selectors) => {
+    for (const selector of selectors) {
+        const element = article.querySelector(selector);
+        const span = element ? (element.matches(sel.count) ? element : element.querySelector(sel.count)) : null;
+        if (span && span.textContent.trim()) return span.textContent.trim();
+    }
+    return null;
+};
+const metrics = Array.from(document.querySelectorAll(sel.article)).map(article => {
+    const time = article.querySelector(sel.time);
+    let link = time ? time.closest('a') : null;
+    if (!link || !link.href.includes('/status/')) link = article.querySelector(sel.status_link);
+    const idMatch = link ? link.href.match(/\\/status\\/(\\d+)/) : null;
+    const actionBar = article.querySelector(sel.action_bar);
+    return {
+        id: idMatch ? idMatch[1] : null,
+        timestamp: time ? time.getAttribute('datetime') : null,
+        label: actionBar ? actionBar.getAttribute('aria-label') : null,
+        action_bar: actionBar !== null,
+        likes: countText(article, [sel.like_button, sel.unlike_button, sel.likes_link]),
+        retweets: countText(article, [sel.retweet_button, sel.unretweet_button, sel.retweets_link])
+    };
+});
+if (scroll) window.scrollBy(0, window.innerHeight);
+return metrics;
+"""
+
+
+def read_post_metrics(driver, scroll=False):
+    """
+    Reads the id, timestamp, action bar label and like/retweet counter text of every tweet
+    on the current page in one execute_script round-trip, optionally scrolling down a
+    screen afterwards. See engagement_from_record for turning a record into counts.
+    """
+    return driver.execute_script(HARVEST_METRICS_JS, TWEET_SELECTORS, scroll) or []
+
+
+# The action bar's aria-label carries exact counts, e.g. "3 replies, 41 reposts, 1204 likes".
+ENGAGEMENT_LABEL_PATTERN = re.compile(r"([\d.,]+[KkMm]?)\s+(likes?|reposts?|retweets?)\b", re.IGNORECASE)
+
+
+def parse_engagement_count(text):
+    """Parses a count as X displays it ("873", "1,204", "1.2K", "3M"). Returns None if unreadable."""
+    text = (text or "").strip().replace(",", "")
+    if not text:
+        return None
+    multiplier = {"K": 1_000, "M": 1_000_000}.get(text[-1].upper(), 1)
+    if multiplier > 1:
+        text = text[:-1]
+    try:
+        return int(float(text) * multiplier)
+    except ValueError:
+        return None
+
+
+def engagement_from_record(record):
+    """
+    (likes, retweets) of a harvested tweet. X leaves zero counts out of the action bar's
+    aria-label and shows an empty counter, so once the action bar was found, a missing count is 0.
+    """
+    likes = retweets = None
+    for number, kind in ENGAGEMENT_LABEL_PATTERN.findall(record.get('label') or ""):
+        if kind.lower().startswith("like"):
+            likes = parse_engagement_count(number)
+        else:
+            retweets = parse_engagement_count(number)
+    if likes is None:
+        likes = parse_engagement_count(record.get('likes'))
+    if retweets is None:
+        retweets = parse_engagement_count(record.get('retweets'))
+    if record.get('action_bar'):
+        likes, retweets = likes or 0, retweets or 0
+    return likes, retweets
@@ -0,0 +1,99 @@
+"""
+X's weighted character counting and length-aware trimming for generated posts and replies.
+
+X does not count characters one by one. Following its twitter-text v3 rules, text is NFC
+normalized, then:
+
+* every URL counts as 23 characters, whatever its real length,
+* every emoji counts as 2, including ZWJ sequences, flags, keycaps and skin-tone variants,
+* code points in Latin, Greek, Cyrillic and other light ranges and most general punctuation
+  count as 1, everything else (CJK, Hangul, Thai, ...) as 2.
+
+URL and emoji detection are simplified here: URLs need an http(s):// or www. prefix, and
+emoji are recognised by code point block rather than from the full Unicode emoji list.
+"""
+import re
+import unicodedata
+
+# Code point ranges that count as one character; everything else counts as two.
+LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+URL_LENGTH = 23
+EMOJI_LENGTH = 2
+ELLIPSIS = "\u2026"
+# A sentence trim has to keep at least this fraction of the limit to be used.
+MIN_SENTENCE_TRIM_FRACTION = 0.5
+
+_EMOJI_BASE = "[\U0001F000-\U0001FAFF\u2300-\u23ff\u2600-\u27bf\u2b00-\u2bff]"
+_EMOJI_MODIFIERS = "(?:\ufe0f|[\U0001F3FB-\U0001F3FF])*"
+_EMOJI = (
+    "(?:[\U0001F1E6-\U0001F1FF]{2}"  # Flags: a pair of regional indicators
+    "|[#*0-9]\ufe0f?\u20e3"  # Keycaps
+    f"|{_EMOJI_BASE}{_EMOJI_MODIFIERS}(?:\u200d{_EMOJI_BASE}{_EMOJI_MODIFIERS})*[\U000E0020-\U000E007F]*"
+    "|.\ufe0f)"  # Any other character in emoji presentation
+)
+# Trailing punctuation is not part of a URL ("see https://x.com/foo.").
+_URL = r"(?:https?://|www\.)\S+?(?=[.,;:!?)\]'\"]*(?:\s|$))"
+_SPECIAL = re.compile(f"(?P<url>{_URL})|(?P<emoji>{_EMOJI})", re.IGNORECASE)
+# A sentence ends at ., !, ? or an ellipsis followed by whitespace (with optional closing quotes or
+# brackets), or at CJK full-width sentence punctuation.
+_SENTENCE_END = re.compile(r"(?:[.!?\u2026]+[\"')\]\u201d\u2019]*(?=\s|$)|[\u3002\uff01\uff1f]+)")
+
+
+def _char_weight(char):
+    code = ord(char)
+    return 1 if any(start <= code <= end for start, end in LIGHT_RANGES) else 2
+
+
+def weighted_length(text):
+    """The length of text as X counts it against the post limit."""
+    text = unicodedata.normalize("NFC", text)
+    total, position = 0, 0
+    for match in _SPECIAL.finditer(text):
+        total += sum(_char_weight(char) for char in text[position:match.start()])
+        total += URL_LENGTH if match.group("url") else EMOJI_LENGTH
+        position = match.end()
+    return total + sum(_char_weight(char) for char in text[position:])
+
+
+def sentence_ends(text):
+    """Offsets just past the end of each sentence in text; the end of the text is always last."""
+    ends = [match.end() for match in _SENTENCE_END.finditer(text)]
+    if not ends or text[ends[-1]:].strip():
+        ends.append(len(text))
+    return ends
+
+
+def trim_to_sentences(text, limit, min_fraction=MIN_SENTENCE_TRIM_FRACTION):
+    """
+    The longest run of leading whole sentences of text that fits within limit, or None if
+    it would be shorter than min_fraction of limit. The sentence split is naive, so a cut
+    after an abbreviation or a list marker ("Mr.", "1.") leaves a fragment that this
+    minimum rejects.
+    """
+    for end in reversed(sentence_ends(text)):
+        candidate = text[:end].rstrip()
+        length = weighted_length(candidate)
+        if candidate and length <= limit:
+            return candidate if length >= limit * min_fraction else None
+    return None
+
+
+def trim_to_words(text, limit, ellipsis=ELLIPSIS):
+    """
+    Cuts text at the last word boundary that leaves room for ellipsis within limit. Text
+    without usable word boundaries (such as unspaced CJK) is cut between characters.
+    """
+    if weighted_length(text) <= limit:
+        return text
+    budget = limit - weighted_length(ellipsis)
+    cuts = [match.start() for match in re.finditer(r"\s+", text)]
+    for cut in reversed(cuts):
+        candidate = text[:cut].rstrip(" ,;:-\u2013\u2014")
+        if candidate and weighted_length(candidate) <= budget:
+            return candidate + ellipsis
+    used, end = 0, 0
+    for end, char in enumerate(text):
+        used += _char_weight(char)
+        if used > budget:
+            break
+    return text[:end].rstrip() + ellipsis
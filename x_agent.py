@@ -1,26 +1,34 @@
-from openai import OpenAI
-import sqlite3
 import time
+_import_started = time.perf_counter()
+import sqlite3
 import random
+import math
 import os
 import threading
+import asyncio
+import signal
+import logging
+import socket
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import json
 import re
+from contextlib import contextmanager
+from collections import defaultdict
+from types import SimpleNamespace
+from array import array
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
-from selenium_stealth import stealth
-import pyperclip
-import chromadb
-import requests
 import argparse
+from llm_backends import ReplayLLMClient, RecordingLLMClient, estimate_tokens
+from memory_maintenance import maintain_collection, collection_report, rebuild_collection, reclaim_disk_space, created_at
+from candidate_ranking import interest_scores, shortlist
+from tweet_length import weighted_length, trim_to_sentences, trim_to_words
+from agent_logging import create_logger, start_file_sink, parse_level
+from storage import configure_db_connection, create_schema, WriteBehindQueue, RecallCache, EmbeddingCache
+from market_data import MarketDataFetcher, MarketSummaryCache
+from tweet_extraction import TWEET_SELECTORS, extract_tweets, parse_tweet_timestamp, read_post_metrics, parse_engagement_count, engagement_from_record
+# Selenium, selenium-stealth, pyperclip, chromadb, numpy, openai and requests are imported on first
+# use (see load_browser_modules and the LazyBackend factories) to keep startup fast.
 
 # --- Argument Parser for Debugging ---
 parser = argparse.ArgumentParser(description="Run the X_Agent with specific debugging flags.")
@@ -43,7 +51,44 @@ parser.add_argument(
     type=str,
     help="Specify a target for the forced action (e.g., a Twitter handle for 'monitor')."
 )
-args = parser.parse_args()
+parser.add_argument(
+    '--profile',
+    action='store_true',
+    help="Record timing spans for page loads, waits, OpenAI calls, memory queries and DB commits, and print a latency report at shutdown."
+)
+parser.add_argument(
+    '--token-report',
+    action='store_true',
+    help="Print the recorded OpenAI token usage per action and per day, then exit."
+)
+parser.add_argument(
+    '--startup-profile',
+    action='store_true',
+    help="Initialize every backend once, print how long the imports and each initialization took, then exit."
+)
+parser.add_argument(
+    '--maintain-memory',
+    action='store_true',
+    help="Apply the vector memory retention policy, print the before/after size and query latency, then exit."
+)
+parser.add_argument(
+    '--rebuild-memory',
+    action='store_true',
+    help="Like --maintain-memory, and also rebuild the vector index to reclaim disk space. Run it while the agent is stopped."
+)
+parser.add_argument(
+    '--migrate-memory',
+    action='store_true',
+    help="Copy the Chroma vector memory into the NumPy store (NUMPY_MEMORY_PATH), then exit."
+)
+parser.add_argument(
+    '--cprofile',
+    type=str,
+    metavar='FILE',
+    help="Together with --force-action, write a cProfile capture of the forced action to FILE."
+)
+# Defaults until main() parses the real command line, so importing the module never reads argv.
+args = parser.parse_args([])
 
 
 # --- X_Agent v2.1.0 (The Sentient Strategist) Configuration ---
@@ -51,23 +96,82 @@ load_dotenv()
 # --- NEW BROWSER CONFIGURATION ---
 BROWSER_TYPE = os.getenv('BROWSER_TYPE', 'chrome').lower() 
 BROWSER_EXECUTABLE_PATH = os.getenv('BROWSER_EXECUTABLE_PATH') 
+# host:port of a browser started with --remote-debugging-port. When set, the agent attaches to
+# it instead of launching a new one, and a browser it has to launch is left running for next time.
+BROWSER_DEBUGGER_ADDRESS = os.getenv('BROWSER_DEBUGGER_ADDRESS')
 YOUR_PROFILE_URL = os.getenv('X_PROFILE_URL')
+BOT_HANDLE = YOUR_PROFILE_URL.rstrip('/').split('/')[-1]
+# Root of every page the agent navigates to. Point it at a local fixture server for offline runs.
+X_BASE_URL = os.getenv('X_BASE_URL', 'https://twitter.com').rstrip('/')
 LANGUAGE = os.getenv('AGENT_LANGUAGE', 'en')
 PROFILE_PATH = os.getenv('PROFILE_PATH')
 
 # --- Strategic Parameters ---
-DEBUG_MODE = os.getenv('DEBUG_MODE')
+DEBUG_MODE = os.getenv('DEBUG_MODE', 'False').strip().lower() in ('1', 'true', 'yes', 'on')
 CORE_TOPICS = json.loads(os.getenv('CORE_TOPICS'))
+CORE_TOPICS_LOWER = {topic.lower() for topic in CORE_TOPICS}
 RESEARCH_CATEGORIES = json.loads(os.getenv('RESEARCH_CATEGORIES'))
 SESSION_RESET_HOURS = int(os.getenv('SESSION_RESET_HOURS'))
 SELF_REFLECTION_HOURS = int(os.getenv('SELF_REFLECTION_HOURS'))
 LAST_SEEN_FILE = "last_seen.txt"; LAST_REFLECTION_FILE = "last_reflection.txt"; LAST_MENTIONS_CHECK_FILE = "last_mentions_check.txt"
 MIN_SLEEP_DURATION = int(os.getenv('MIN_SLEEP_DURATION'))
 MAX_SLEEP_DURATION = int(os.getenv('MAX_SLEEP_DURATION'))
+SHUTDOWN_GRACE_SECONDS = float(os.getenv('SHUTDOWN_GRACE_SECONDS', '15')) # How long shutdown waits for a running browser step
 
 # --- Model & Chance Configuration ---
 REFLECTIVE_MODEL = "gpt-3.5-turbo"; CREATION_MODEL = "gpt-4-turbo"
+EMBEDDING_MODEL = "text-embedding-3-small"
+AGENT_STATE_DB = "agent_state.db"
+TRACE_FILE = os.getenv('TRACE_FILE', 'agent_trace.jsonl')
+# --- Logging ---
+LOG_LEVEL = parse_level(os.getenv('LOG_LEVEL'), logging.DEBUG if DEBUG_MODE else logging.INFO) # Console level
+LOG_FILE = os.getenv('LOG_FILE', 'agent_log.jsonl') # Rotating JSON lines log; empty disables it
+LOG_FILE_LEVEL = parse_level(os.getenv('LOG_FILE_LEVEL'), logging.INFO)
+LOG_FILE_MAX_BYTES = int(os.getenv('LOG_FILE_MAX_BYTES', str(5 * 1024 * 1024)))
+LOG_FILE_BACKUPS = int(os.getenv('LOG_FILE_BACKUPS', '3'))
+DB_WRITE_BATCH_SIZE = int(os.getenv('DB_WRITE_BATCH_SIZE', '50'))
+DB_WRITE_FLUSH_SECONDS = float(os.getenv('DB_WRITE_FLUSH_SECONDS', '2'))
+EMBEDDING_CACHE_FILE = "embedding_cache.db"
+VECTOR_MEMORY_PATH = "agent_memory_db"; VECTOR_MEMORY_COLLECTION = "agent_memory"
+VECTOR_MEMORY_BACKEND = os.getenv('VECTOR_MEMORY_BACKEND', 'chroma').lower() # "chroma" or "numpy"
+NUMPY_MEMORY_PATH = os.getenv('NUMPY_MEMORY_PATH', 'agent_memory_np')
+# --- Vector Memory Retention ---
+MEMORY_DEDUP_SIMILARITY = float(os.getenv('MEMORY_DEDUP_SIMILARITY', '0.95'))
+MEMORY_INSIGHT_MAX_AGE_DAYS = float(os.getenv('MEMORY_INSIGHT_MAX_AGE_DAYS', '90'))
+MEMORY_INSIGHT_KEEP_LIKES = int(os.getenv('MEMORY_INSIGHT_KEEP_LIKES', '20'))
+MEMORY_MAX_PER_TYPE = json.loads(os.getenv('MEMORY_MAX_PER_TYPE', '{"insight": 500, "self_posted": 2000}'))
+RECALL_CACHE_MAX_ENTRIES = int(os.getenv('RECALL_CACHE_MAX_ENTRIES', '256'))
+SEEN_TWEET_TTL_HOURS = float(os.getenv('SEEN_TWEET_TTL_HOURS', '24')) # How long an evaluated tweet is not evaluated again
+INSIGHT_DIGEST_SIZE = int(os.getenv('INSIGHT_DIGEST_SIZE', '2')) # Insights kept per post subject after each reflection
+# --- Candidate Pre-ranking ---
+CANDIDATE_SHORTLIST_SIZE = int(os.getenv('CANDIDATE_SHORTLIST_SIZE', '3')) # Top candidates the LLM chooses from when the ranking is close
+CANDIDATE_CLEAR_MARGIN = float(os.getenv('CANDIDATE_CLEAR_MARGIN', '0.05')) # Score lead that picks a candidate without the LLM
+CANDIDATE_MIN_SCORE = float(os.getenv('CANDIDATE_MIN_SCORE', '0')) # Candidates below this similarity are left out of the shortlist; 0 disables the floor
+CANDIDATE_PROFILE_SIZE = int(os.getenv('CANDIDATE_PROFILE_SIZE', '50')) # Own posts and insights in the interest profile
+CANDIDATE_PROFILE_WEIGHTS = json.loads(os.getenv('CANDIDATE_PROFILE_WEIGHTS', '{"posts": 1.0, "insights": 1.0, "categories": 1.0}'))
+RECALL_OVERFETCH = 3 # Result window multiplier when several memory types share one query
+PROMPT_MEMORY_TOKEN_BUDGET = int(os.getenv('PROMPT_MEMORY_TOKEN_BUDGET', '400')) # Shared budget for recalled memories in one prompt
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '20000'))
 REPLY_CHANCE = 0.8; LIKE_CHANCE = 0.8
+TWEET_MAX_LENGTH = int(os.getenv('TWEET_MAX_LENGTH', '280')) # X's weighted character limit for posts and replies
+GENERATION_MAX_TOKENS = int(os.getenv('GENERATION_MAX_TOKENS', '160')) # Completion cap for post and reply generation
+REFLECTION_MAX_WORKERS = int(os.getenv('REFLECTION_MAX_WORKERS', '5'))
+METRICS_HARVEST_MAX_SCROLLS = int(os.getenv('METRICS_HARVEST_MAX_SCROLLS', '10'))
+
+# --- Market Data Configuration ---
+COINGECKO_API_URL = os.getenv('COINGECKO_API_URL', 'https://api.coingecko.com/api/v3').rstrip('/')
+FEAR_GREED_API_URL = os.getenv('FEAR_GREED_API_URL', 'https://api.alternative.me/fng/')
+MARKET_DATA_TTL_SECONDS = int(os.getenv('MARKET_DATA_TTL_SECONDS', '300'))
+MARKET_DATA_MAX_STALE_SECONDS = int(os.getenv('MARKET_DATA_MAX_STALE_SECONDS', '3600'))
+MARKET_DATA_TIMEOUT_SECONDS = float(os.getenv('MARKET_DATA_TIMEOUT_SECONDS', '10'))
+MARKET_SUMMARY_TTL_MINUTES = float(os.getenv('MARKET_SUMMARY_TTL_MINUTES', '60'))
+MARKET_SUMMARY_MAX_ENTRIES = int(os.getenv('MARKET_SUMMARY_MAX_ENTRIES', '200'))
+MARKET_CHANGE_BUCKET_PERCENT = float(os.getenv('MARKET_CHANGE_BUCKET_PERCENT', '2'))
+MARKET_ENDPOINTS = {
+    "prices": (f"{COINGECKO_API_URL}/simple/price", {"ids": "bitcoin,solana", "vs_currencies": "usd", "include_24hr_change": "true"}),
+    "fear_greed": (FEAR_GREED_API_URL, {"limit": 1}),
+    "global": (f"{COINGECKO_API_URL}/global", None),
+}
 agent_running = True; CURRENT_GOAL = "INITIALIZING"; action_history = []
 
 # --- Localization ---
@@ -89,12 +193,248 @@ def _(key, **kwargs):
 # Load the selected language
 load_translations(LANGUAGE)
 
+# --- Logging ---
+# Log calls take a catalog key and fields: log.info("terminal_online"). Translation and
+# formatting only happen for records that are actually emitted (see agent_logging.py).
+log, logger = create_logger("x_agent", _, LOG_LEVEL)
+
+
+# --- Tracing ---
+class Tracer:
+    """
+    Records timing spans for the agent's hot paths. Each span carries its kind (e.g.
+    "driver.get"), the action that was running and its duration, and is appended to a JSONL
+    trace file in batches. Disabled tracers make span() a no-op.
+    """
+    def __init__(self, path, enabled, flush_every=200):
+        self.path = path
+        self.enabled = enabled
+        self.flush_every = flush_every
+        self.action = "STARTUP"
+        self._durations = defaultdict(list)
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def set_action(self, action):
+        self.action = action
+
+    @contextmanager
+    def span(self, kind, **tags):
+        if not self.enabled:
+            yield
+            return
+        action, started_at, start = self.action, time.time(), time.perf_counter()
+        try:
+            yield
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            record = {"ts": round(started_at, 3), "kind": kind, "action": action, "ms": round(duration_ms, 3), **tags}
+            with self._lock:
+                self._durations[(action, kind)].append(duration_ms)
+                self._pending.append(record)
+                should_flush = len(self._pending) >= self.flush_every
+            if should_flush:
+                self.flush()
+
+    def wrap(self, kind, func, **tags):
+        """Returns func wrapped so that every call is recorded as a span of the given kind."""
+        def traced(*args, **kwargs):
+            with self.span(kind, **tags):
+                return func(*args, **kwargs)
+        return traced
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in pending)
+        except OSError as e:
+            log.warning("trace_write_error", path=self.path, e=e)
+
+    @staticmethod
+    def _percentile(sorted_values, fraction):
+        return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))]
+
+    def report(self):
+        """Prints p50/p95/max per span kind and per action/kind pair."""
+        with self._lock:
+            by_pair = {key: sorted(values) for key, values in self._durations.items()}
+        by_kind = defaultdict(list)
+        for (action, kind), values in by_pair.items():
+            by_kind[kind].extend(values)
+        header = f"{'count':>7} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}"
+
+        def row(label, values):
+            values = sorted(values)
+            return f"{label:<48} {len(values):>7} {self._percentile(values, 0.5):>10.1f} {self._percentile(values, 0.95):>10.1f} {values[-1]:>10.1f}"
+
+        print(_("profile_report_by_kind", path=self.path))
+        print(f"{'span':<48} {header}")
+        for kind in sorted(by_kind):
+            print(row(kind, by_kind[kind]))
+        print(_("profile_report_by_action"))
+        print(f"{'action / span':<48} {header}")
+        for action, kind in sorted(by_pair):
+            print(row(f"{action} / {kind}", by_pair[(action, kind)]))
+
+tracer = Tracer(TRACE_FILE, enabled=False)
+
+class WebDriverWait:
+    """Selenium's WebDriverWait, with until() calls recorded as "webdriver.wait" spans."""
+    def __init__(self, driver, timeout, **kwargs):
+        from selenium.webdriver.support.ui import WebDriverWait as SeleniumWebDriverWait
+        self._wait = SeleniumWebDriverWait(driver, timeout, **kwargs)
+
+    def until(self, method, message=""):
+        with tracer.span("webdriver.wait"):
+            return self._wait.until(method, message)
+
+class TracedConnection(sqlite3.Connection):
+    """sqlite3 connection class whose commits are recorded as "sqlite.commit" spans."""
+    def commit(self):
+        with tracer.span("sqlite.commit"):
+            super().commit()
+
+class TracedCollection:
+    """Wraps a Chroma collection so that query and add calls are recorded as spans."""
+    def __init__(self, collection):
+        self._collection = collection
+
+    def query(self, **kwargs):
+        with tracer.span("vector_memory.query"):
+            return self._collection.query(**kwargs)
+
+    def add(self, **kwargs):
+        with tracer.span("vector_memory.add"):
+            return self._collection.add(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+class TracedLLMClient:
+    """Wraps an LLM client so that chat and embedding requests are recorded as spans."""
+    def __init__(self, client):
+        self._client = client
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+        self.embeddings = SimpleNamespace(create=self._create_embeddings)
+
+    def _create_chat(self, **kwargs):
+        with tracer.span("openai.chat", model=kwargs.get("model")):
+            return self._client.chat.completions.create(**kwargs)
+
+    def _create_embeddings(self, **kwargs):
+        with tracer.span("openai.embeddings", model=kwargs.get("model")):
+            return self._client.embeddings.create(**kwargs)
+
+# --- Lazy Startup ---
+startup_timings = {}
+
+@contextmanager
+def startup_step(name):
+    """Adds the duration of the block to startup_timings[name] (reported by --startup-profile)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        startup_timings[name] = startup_timings.get(name, 0.0) + time.perf_counter() - start
+
+class LazyBackend:
+    """
+    Creates a backend with factory() on first use and forwards attribute access to it, so
+    module-level names like vector_memory keep working without paying for the setup at
+    import time. resolve() is the explicit accessor; warm_up() starts the creation on a
+    background thread, and callers that arrive meanwhile wait for it to finish.
+    """
+    def __init__(self, name, factory):
+        self._name = name
+        self._factory = factory
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._instance is not None
+
+    def resolve(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    with startup_step(f"init {self._name}"):
+                        self._instance = self._factory()
+        return self._instance
+
+    def warm_up(self):
+        def run():
+            try:
+                self.resolve()
+            except Exception as e:
+                log.warning("backend_warm_up_failed", name=self._name, e=e)
+        threading.Thread(target=run, name=f"warm-up-{self._name}", daemon=True).start()
+
+    def close(self):
+        """Closes the backend if it was ever created."""
+        if self._instance is not None:
+            self._instance.close()
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+# Browser-side modules, bound by load_browser_modules() before the first browser is started.
+webdriver = By = EC = ActionChains = Keys = stealth = pyperclip = None
+NoSuchElementException = TimeoutException = StaleElementReferenceException = None
+
+def load_browser_modules():
+    """Imports Selenium, selenium-stealth and pyperclip into the module namespace."""
+    global webdriver, By, EC, ActionChains, Keys, stealth, pyperclip
+    global NoSuchElementException, TimeoutException, StaleElementReferenceException
+    if webdriver is not None:
+        return
+    with startup_step("import browser modules"):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException
+        from selenium.webdriver.common.action_chains import ActionChains
+        from selenium.webdriver.common.keys import Keys
+        from selenium_stealth import stealth
+        import pyperclip
+        from selenium import webdriver
+
+# --- LLM Backend ---
+# "openai" uses the OpenAI API, "local" an OpenAI-compatible server at LLM_BASE_URL
+# (e.g. benchmarks/llm_standin.py) and "replay" answers in-process from LLM_RECORDINGS_FILE.
+LLM_BACKEND = os.getenv('LLM_BACKEND', 'openai').lower()
+LLM_BASE_URL = os.getenv('LLM_BASE_URL', 'http://127.0.0.1:8766/v1')
+LLM_RECORDINGS_FILE = os.getenv('LLM_RECORDINGS_FILE', 'llm_recordings.jsonl')
+LLM_RECORD = os.getenv('LLM_RECORD', 'False').lower() == 'true'
+LLM_REPLAY_LATENCY_MS = float(os.getenv('LLM_REPLAY_LATENCY_MS', '0'))
+
+def create_llm_client():
+    """
+    Builds the client that every chat and embedding request goes through, based on LLM_BACKEND.
+    With LLM_RECORD enabled, real responses are also appended to LLM_RECORDINGS_FILE for later replay.
+    """
+    if LLM_BACKEND == 'replay':
+        return TracedLLMClient(ReplayLLMClient(LLM_RECORDINGS_FILE, latency_ms=LLM_REPLAY_LATENCY_MS))
+    from openai import OpenAI
+    if LLM_BACKEND == 'local':
+        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY') or 'local', base_url=LLM_BASE_URL)
+    else:
+        client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    if LLM_RECORD:
+        client = RecordingLLMClient(client, LLM_RECORDINGS_FILE)
+    return TracedLLMClient(client)
 
 # --- Initialization ---
-try:
-    client_openai = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-except Exception as e:
-    exit(_("openai_init_error", e=e))
+def _init_llm_client():
+    try:
+        return create_llm_client()
+    except Exception as e:
+        raise RuntimeError(_("openai_init_error", e=e)) from e
+
+client_openai = LazyBackend("llm client", _init_llm_client)
 
 _persona_primer_cache = None
 
@@ -118,44 +458,225 @@ prompt_template = os.getenv('PROMPT_TEMPLATE')
 persona_primer = get_persona_primer(prompt_template)
 
 if not prompt_template:
-    print(_("prompt_template_not_found"))
+    log.warning("prompt_template_not_found")
     exit()
 
 def init_db():
-    conn = sqlite3.connect("agent_state.db")
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS observations (timestamp TEXT, tweet_id TEXT PRIMARY KEY, subject TEXT, content TEXT, status TEXT, likes INTEGER DEFAULT 0, retweets INTEGER DEFAULT 0)''')
-    cursor.execute('''CREATE TABLE IF NOT EXISTS engagements (timestamp TEXT, engagement_type TEXT, target_tweet_id TEXT, content TEXT, status TEXT)''')
-    cursor.execute('''CREATE TABLE IF NOT EXISTS potential_partners (screen_name TEXT PRIMARY KEY, discovery_date TEXT, status TEXT)''')
-    cursor.execute('''CREATE TABLE IF NOT EXISTS action_log (timestamp TEXT, action_name TEXT, target TEXT, status TEXT)''')
-    conn.commit()
-    return conn, cursor
+    conn = sqlite3.connect(AGENT_STATE_DB, factory=TracedConnection)
+    configure_db_connection(conn)
+    create_schema(conn)
+    return conn
+
+def open_chroma_collection():
+    """Returns (client, collection) for the Chroma vector memory."""
+    import chromadb
+    client = chromadb.PersistentClient(path=VECTOR_MEMORY_PATH)
+    return client, client.get_or_create_collection(name=VECTOR_MEMORY_COLLECTION, embedding_function=None)
+
+def open_numpy_store():
+    from numpy_memory import NumpyVectorStore
+    return NumpyVectorStore(NUMPY_MEMORY_PATH, name=VECTOR_MEMORY_COLLECTION)
 
 def init_vector_db():
-    print(_("initializing_vector_memory"))
-    client = chromadb.PersistentClient(path="agent_memory_db")
-    collection = client.get_or_create_collection(name="agent_memory", embedding_function=None)
-    print(_("vector_memory_online"))
-    return collection
+    log.info("initializing_vector_memory")
+    if VECTOR_MEMORY_BACKEND == "numpy":
+        collection = open_numpy_store()
+    else:
+        _client, collection = open_chroma_collection()
+    log.info("vector_memory_online")
+    return RecallCache(TracedCollection(collection), RECALL_CACHE_MAX_ENTRIES)
 
-conn, cursor = init_db()
-vector_memory = init_vector_db()
+class IdentityIndex:
+    """
+    Process-lifetime index of the tweet IDs the agent has engaged with and of the partner
+    handles it already knows. Loaded once from agent_state.db at startup and updated in
+    place on every new engagement or partner, so membership checks never touch the database.
+    Partner handles are compared case-insensitively.
+    """
+    def __init__(self, cursor):
+        self.engaged_ids = set()
+        self.replied_ids = set()
+        cursor.execute("SELECT engagement_type, target_tweet_id FROM engagements")
+        for engagement_type, tweet_id in cursor.fetchall():
+            self.engaged_ids.add(tweet_id)
+            if engagement_type == 'reply':
+                self.replied_ids.add(tweet_id)
+        cursor.execute("SELECT screen_name FROM potential_partners")
+        self.partner_handles = {row[0].lower() for row in cursor.fetchall()}
+
+    def has_engaged(self, tweet_id):
+        return tweet_id in self.engaged_ids
+
+    def has_replied(self, tweet_id):
+        return tweet_id in self.replied_ids
+
+    def is_known_partner(self, screen_name):
+        return screen_name.lower() in self.partner_handles
+
+    def add_engagement(self, engagement_type, tweet_id):
+        self.engaged_ids.add(tweet_id)
+        if engagement_type == 'reply':
+            self.replied_ids.add(tweet_id)
+
+    def add_partner(self, screen_name):
+        self.partner_handles.add(screen_name.lower())
+
+class SeenTweets:
+    """
+    TTL cache of the tweets the feed, discovery, monitor and mentions actions have already
+    evaluated, kept in agent_state.db so it survives restarts. Each entry holds the outcome,
+    the local ranking score and the candidate's embedding. Tweets with a SETTLED outcome are
+    skipped until their entry expires. Tweets that were chosen, passed over or only monitored
+    stay eligible as reply targets, and their stored embedding spares the embedding lookup
+    when they come back. Tweets replied to are left to identity_index, which only learns of a
+    reply once it went through, so a failed reply is retried.
+    """
+    SETTLED = {"rejected"}
+
+    def __init__(self, cursor, ttl_seconds):
+        self.ttl_seconds = ttl_seconds
+        self.skipped = 0
+        cutoff = time.time() - ttl_seconds
+        cursor.execute("SELECT tweet_id, outcome, score, model, embedding, seen_at FROM seen_tweets WHERE seen_at >= ?", (cutoff,))
+        self._entries = {tweet_id: (outcome, score, embedding if model == EMBEDDING_MODEL else None, seen_at) for tweet_id, outcome, score, model, embedding, seen_at in cursor.fetchall()}
+        db_writer.execute("DELETE FROM seen_tweets WHERE seen_at < ?", (cutoff,))
+
+    def _get(self, tweet_id):
+        entry = self._entries.get(tweet_id)
+        if entry is not None and entry[3] < time.time() - self.ttl_seconds:
+            del self._entries[tweet_id]
+            return None
+        return entry
+
+    def is_settled(self, tweet_id):
+        """True if the tweet was already decided on within the TTL, so it should be skipped."""
+        entry = self._get(tweet_id)
+        if entry is not None and entry[0] in self.SETTLED:
+            self.skipped += 1
+            return True
+        return False
 
-# --- Core Helper & Utility Functions ---
-def log_debug(message):
-    if DEBUG_MODE:
-        print(_("debug_message", message=message))
+    def outcome(self, tweet_id):
+        """The stored outcome of a tweet within the TTL, or None."""
+        entry = self._get(tweet_id)
+        return entry[0] if entry else None
+
+    def embedding(self, tweet_id):
+        """The stored embedding of a tweet, or None."""
+        entry = self._get(tweet_id)
+        return array('f', entry[2]).tolist() if entry and entry[2] else None
+
+    def record(self, tweet_id, outcome, score=None, embedding=None):
+        """Stores an evaluation, keeping a previously stored embedding if none is given."""
+        previous = self._get(tweet_id)
+        blob = array('f', embedding).tobytes() if embedding is not None else (previous[2] if previous else None)
+        now = time.time()
+        self._entries[tweet_id] = (outcome, score, blob, now)
+        db_writer.execute("INSERT OR REPLACE INTO seen_tweets (tweet_id, outcome, score, model, embedding, seen_at) VALUES (?, ?, ?, ?, ?, ?)", (tweet_id, outcome, score, EMBEDDING_MODEL, blob, now))
+
+    def stats(self):
+        return {"entries": len(self._entries), "skipped": self.skipped}
 
+class InsightDigests:
+    """
+    The top strategic insights for every post subject, rebuilt at the end of each
+    self-reflection and kept in agent_state.db. Loaded once at startup, so post generation
+    finds its insights with a dictionary lookup instead of an embedding and a vector query.
+    """
+    def __init__(self, cursor):
+        cursor.execute("SELECT subject, insights FROM insight_digests")
+        self.by_subject = {subject: json.loads(insights) for subject, insights in cursor.fetchall()}
+
+    def get(self, subject):
+        """The digest's insights for subject, or None if no digest was built for it."""
+        return self.by_subject.get(subject)
+
+    def replace(self, digests):
+        """Swaps in a new {subject: [insight, ...]} table and persists it through the write-behind queue."""
+        self.by_subject = dict(digests)
+        now = datetime.now().isoformat()
+        db_writer.execute("DELETE FROM insight_digests")
+        for subject, insights in digests.items():
+            db_writer.execute("INSERT INTO insight_digests (subject, insights, updated_at) VALUES (?, ?, ?)", (subject, json.dumps(insights, ensure_ascii=False), now))
+
+# Every backend is created on first use; see LazyBackend.
+conn = LazyBackend("sqlite", init_db)
+cursor = LazyBackend("sqlite cursor", lambda: conn.cursor())
+db_writer = LazyBackend("db writer", lambda: WriteBehindQueue(AGENT_STATE_DB, DB_WRITE_BATCH_SIZE, DB_WRITE_FLUSH_SECONDS, log, TracedConnection))
+identity_index = LazyBackend("identity index", lambda: IdentityIndex(cursor))
+seen_tweets = LazyBackend("seen tweets", lambda: SeenTweets(cursor, SEEN_TWEET_TTL_HOURS * 3600))
+insight_digests = LazyBackend("insight digests", lambda: InsightDigests(cursor))
+vector_memory = LazyBackend("vector memory", init_vector_db)
+embedding_cache = LazyBackend("embedding cache", lambda: EmbeddingCache(EMBEDDING_CACHE_FILE, EMBEDDING_CACHE_MAX_ENTRIES, TracedConnection))
+market_summary_cache = LazyBackend("market summary cache", lambda: MarketSummaryCache(AGENT_STATE_DB, MARKET_SUMMARY_TTL_MINUTES * 60, MARKET_SUMMARY_MAX_ENTRIES, TracedConnection))
+market_data = LazyBackend("market data", lambda: MarketDataFetcher(AGENT_STATE_DB, MARKET_ENDPOINTS, MARKET_DATA_TTL_SECONDS, MARKET_DATA_MAX_STALE_SECONDS, MARKET_DATA_TIMEOUT_SECONDS, log, TracedConnection))
+
+# --- Core Helper & Utility Functions ---
 def log_action(action_name, target, status):
-    cursor.execute("INSERT INTO action_log VALUES (?, ?, ?, ?)", (datetime.now().isoformat(), action_name, target, status)); conn.commit()
+    db_writer.execute("INSERT INTO action_log VALUES (?, ?, ?, ?)", (datetime.now().isoformat(), action_name, target, status))
+
+def record_engagement(engagement_type, tweet_id, content, status):
+    db_writer.execute("INSERT INTO engagements VALUES (datetime('now'), ?, ?, ?, ?)", (engagement_type, tweet_id, content, status))
+    identity_index.add_engagement(engagement_type, tweet_id)
+
+def record_partner(screen_name):
+    db_writer.execute("INSERT OR IGNORE INTO potential_partners (screen_name, discovery_date, status) VALUES (?, ?, ?)", (screen_name, datetime.now().isoformat(), 'discovered'))
+    identity_index.add_partner(screen_name)
+
+def record_token_usage(purpose, model, usage, prompt_text):
+    """
+    Logs the token usage of one OpenAI request against the running action. Backends that
+    report no usage are accounted with an estimate from the prompt length.
+    """
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or estimate_tokens(prompt_text)
+    completion_tokens = getattr(usage, "completion_tokens", None) or 0
+    total_tokens = getattr(usage, "total_tokens", None) or prompt_tokens + completion_tokens
+    db_writer.execute("INSERT INTO token_usage VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (datetime.now().isoformat(), tracer.action, purpose, model, len(prompt_text), prompt_tokens, completion_tokens, total_tokens))
+
+def chat_completion(purpose, model, prompt, **kwargs):
+    """Sends prompt as a single user message, records the token usage under purpose and returns the reply text."""
+    response = client_openai.chat.completions.create(model=model, messages=[{"role": "user", "content": prompt}], **kwargs)
+    record_token_usage(purpose, model, getattr(response, "usage", None), prompt)
+    return response.choices[0].message.content
+
+def print_token_usage_report(days=7):
+    """Prints today's token usage per action and the daily totals of the last few days."""
+    today = datetime.now().date().isoformat()
+    since = (datetime.now() - timedelta(days=days - 1)).date().isoformat()
+    cursor.execute("SELECT action_name, COUNT(*), SUM(prompt_tokens), SUM(completion_tokens), AVG(prompt_tokens) FROM token_usage WHERE timestamp >= ? GROUP BY action_name ORDER BY SUM(total_tokens) DESC", (today,))
+    print(_("token_usage_by_action_header", day=today))
+    print(f"{'action':<28} {'calls':>6} {'prompt':>9} {'completion':>11} {'avg prompt':>11}")
+    for action_name, calls, prompt_tokens, completion_tokens, avg_prompt in cursor.fetchall():
+        print(f"{action_name:<28} {calls:>6} {prompt_tokens:>9} {completion_tokens:>11} {avg_prompt:>11.0f}")
+    cursor.execute("SELECT substr(timestamp, 1, 10), COUNT(*), SUM(prompt_tokens), SUM(completion_tokens), SUM(total_tokens) FROM token_usage WHERE timestamp >= ? GROUP BY 1 ORDER BY 1", (since,))
+    print(_("token_usage_daily_header", days=days))
+    print(f"{'day':<28} {'calls':>6} {'prompt':>9} {'completion':>11} {'total':>11}")
+    for day, calls, prompt_tokens, completion_tokens, total_tokens in cursor.fetchall():
+        print(f"{day:<28} {calls:>6} {prompt_tokens:>9} {completion_tokens:>11} {total_tokens:>11}")
+
+def embed_texts(texts, model=EMBEDDING_MODEL):
+    """
+    Returns one embedding per input text. Texts seen before are served from the on-disk
+    cache, and only the missing ones are sent to OpenAI, in a single batched request.
+    """
+    vectors = embedding_cache.get_many(model, texts)
+    missing = list(dict.fromkeys(text for text in texts if text not in vectors))
+    if missing:
+        response = client_openai.embeddings.create(input=missing, model=model)
+        record_token_usage("embedding", model, getattr(response, "usage", None), "".join(missing))
+        fresh = {text: item.embedding for text, item in zip(missing, response.data)}
+        embedding_cache.put_many(model, fresh)
+        vectors.update(fresh)
+    log.debug("embedding_cache_lookup", cached=len(texts) - len(missing), requested=len(missing))
+    return [vectors[text] for text in texts]
 
 def shutdown_listener():
     global agent_running
     while agent_running:
         try:
             if input().lower() == 'exit':
-                print(_("shutdown_command_received"))
-                agent_running = False
+                log.info("shutdown_command_received")
+                scheduler.request_shutdown()
                 break
         except EOFError:
             time.sleep(1)
@@ -173,13 +694,16 @@ def check_if_time_passed(filename, hours):
         return True
     return datetime.now() - datetime.fromisoformat(last_time_str) > timedelta(hours=hours)
 
+def x_url(path):
+    return f"{X_BASE_URL}{path}"
+
 def random_delay(min_sec=2, max_sec=5):
     time.sleep(random.uniform(min_sec, max_sec))
 
 def robust_click(driver, element):
     try:
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", element)
-        time.sleep(random.uniform(0.5, 1.0))
+        random_delay(0.5, 1.0)
         driver.execute_script("arguments[0].click();", element)
     except Exception:
         ActionChains(driver).move_to_element(element).click().perform()
@@ -192,29 +716,62 @@ def type_via_clipboard(driver, element, text):
 
     _persona_primer_cache = None
 
+def _create_browser_options():
+    """Returns the WebDriver options object for BROWSER_TYPE, or None if the browser is unsupported."""
+    if BROWSER_TYPE in ['chrome', 'brave']:
+        options = webdriver.ChromeOptions()
+    elif BROWSER_TYPE == 'edge':
+        options = webdriver.EdgeOptions()
+    else:
+        return None
+    if BROWSER_EXECUTABLE_PATH:
+        options.binary_location = BROWSER_EXECUTABLE_PATH
+    return options
+
+def _start_webdriver(options):
+    if BROWSER_TYPE in ['chrome', 'brave']:
+        return webdriver.Chrome(options=options)
+    return webdriver.Edge(options=options)
+
+def _debugger_reachable(address, timeout=0.5):
+    host, _sep, port = address.rpartition(":")
+    try:
+        with socket.create_connection((host or "127.0.0.1", int(port)), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+def attach_to_running_browser():
+    """
+    Attaches to the browser listening on BROWSER_DEBUGGER_ADDRESS. Returns None when no
+    address is configured, nothing is listening there or the attach fails.
+    """
+    if not BROWSER_DEBUGGER_ADDRESS or not _debugger_reachable(BROWSER_DEBUGGER_ADDRESS):
+        return None
+    options = _create_browser_options()
+    options.debugger_address = BROWSER_DEBUGGER_ADDRESS
+    try:
+        driver = _start_webdriver(options)
+    except Exception as e:
+        log.warning("browser_attach_failed", address=BROWSER_DEBUGGER_ADDRESS, e=e)
+        return None
+    log.info("browser_attached", address=BROWSER_DEBUGGER_ADDRESS)
+    return driver
+
 def setup_driver():
     """
     Sets up the Selenium WebDriver using the built-in Selenium Manager.
     Selenium Manager automatically detects the browser, downloads the correct driver,
     and configures it without any external libraries.
+    With BROWSER_DEBUGGER_ADDRESS set, an already running browser is reused instead.
     """
-    print(_("initializing_research_terminal"))
+    log.info("initializing_research_terminal")
+    load_browser_modules()
     
     # BROWSER_TYPE is now only used for setting options, not for selecting a manager
-    if BROWSER_TYPE == 'brave':
-        options = webdriver.ChromeOptions()
-        if BROWSER_EXECUTABLE_PATH:
-            options.binary_location = BROWSER_EXECUTABLE_PATH
-    elif BROWSER_TYPE == 'edge':
-        options = webdriver.EdgeOptions()
-        if BROWSER_EXECUTABLE_PATH:
-            options.binary_location = BROWSER_EXECUTABLE_PATH
-    elif BROWSER_TYPE == 'chrome':
-        options = webdriver.ChromeOptions()
-        if BROWSER_EXECUTABLE_PATH:
-            options.binary_location = BROWSER_EXECUTABLE_PATH
-    else:
-        print(_("unsupported_browser_error", browser=BROWSER_TYPE))
+    options = _create_browser_options()
+    if options is None:
+        log.error("unsupported_browser_error", browser=BROWSER_TYPE)
         return None
 
     # --- Profile and General Options ---
@@ -226,16 +783,22 @@ def setup_driver():
     options.add_argument("--disable-notifications")
     options.add_argument('--log-level=3')
     options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    if BROWSER_DEBUGGER_ADDRESS:
+        # Leave a launched browser running with an open debugging port so the next run can attach.
+        options.add_argument(f"--remote-debugging-port={BROWSER_DEBUGGER_ADDRESS.rpartition(':')[2]}")
+        options.add_experimental_option('detach', True)
     
     try:
-        print(_("initializing_browser_with_selenium_manager", browser=BROWSER_TYPE.capitalize()))
-        
-        # --- Simplified Driver Initialization ---
-        # We no longer create a 'Service' object. Selenium Manager handles it automatically.
-        if BROWSER_TYPE in ['chrome', 'brave']:
-            driver = webdriver.Chrome(options=options)
-        elif BROWSER_TYPE == 'edge':
-            driver = webdriver.Edge(options=options)
+        driver = attach_to_running_browser()
+        if not driver:
+            log.info("initializing_browser_with_selenium_manager", browser=BROWSER_TYPE.capitalize())
+            
+            # --- Simplified Driver Initialization ---
+            # We no longer create a 'Service' object. Selenium Manager handles it automatically.
+            driver = _start_webdriver(options)
+        # With a debugging address the browser outlives this run; close_driver() only stops the driver service.
+        driver.keep_browser_open = bool(BROWSER_DEBUGGER_ADDRESS)
+        driver.get = tracer.wrap("driver.get", driver.get)
             
         # --- Applying Stealth ---
         stealth(driver,
@@ -246,118 +809,441 @@ def setup_driver():
                 renderer="Intel Iris OpenGL Engine",
                 fix_hairline=True)
 
-        print(_("terminal_online"))
+        log.info("terminal_online")
         return driver
 
     except Exception as e:
-        print(_("terminal_critical_error", e=e))
+        log.error("terminal_critical_error", e=e)
         if BROWSER_EXECUTABLE_PATH and "cannot find" in str(e).lower():
-            print(_("browser_path_error", path=BROWSER_EXECUTABLE_PATH))
+            log.error("browser_path_error", path=BROWSER_EXECUTABLE_PATH)
         return None
 
+def close_driver(driver):
+    """Quits the browser, or only stops the driver service when the browser is kept for the next run."""
+    if getattr(driver, "keep_browser_open", False):
+        driver.service.stop()
+        log.info("browser_left_running", address=BROWSER_DEBUGGER_ADDRESS)
+    else:
+        driver.quit()
+
 def login_to_twitter(driver):
-    print(_("verifying_network_connection"))
-    driver.get("https://twitter.com/home")
+    log.info("verifying_network_connection")
+    driver.get(x_url("/home"))
     random_delay()
     try:
         WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-testid="tweetTextarea_0"]')))
-        print(_("connection_verified"))
+        log.info("connection_verified")
         return True
     except:
-        print(_("authorization_error"))
+        log.error("authorization_error")
         return False
-def get_own_context_from_memory(query_text, n_results=2):
+
+# --- DOM Extraction ---
+def harvest_post_metrics(driver, posts):
+    """
+    Reads the like and retweet counts of the agent's own posts from a single scroll down its
+    profile timeline. posts is a list of (tweet_id, timestamp) pairs, with timestamps as
+    stored in observations. Scrolling stops once every post is found, the timeline is past
+    the oldest one, or it stops growing. Returns {tweet_id: (likes, retweets)} for the posts
+    that were found; missing counts are 0 when the action bar was found, None otherwise.
+    """
+    wanted = {tweet_id for tweet_id, _timestamp in posts}
+    oldest = min(datetime.fromisoformat(timestamp).astimezone() for _tweet_id, timestamp in posts)
+    found, seen_ids = {}, set()
+    driver.get(x_url(f"/{BOT_HANDLE}"))
+    WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, TWEET_SELECTORS["article"])))
+    for _scroll in range(max(1, METRICS_HARVEST_MAX_SCROLLS)):
+        records = read_post_metrics(driver, scroll=True)
+        new_ids = {record['id'] for record in records if record.get('id')} - seen_ids
+        seen_ids |= new_ids
+        for record in records:
+            if record.get('id') in wanted and record['id'] not in found:
+                likes, retweets = engagement_from_record(record)
+                if likes is not None:
+                    found[record['id']] = (likes, retweets)
+        timestamps = [parse_tweet_timestamp(record['timestamp']) for record in records if record.get('timestamp')]
+        if len(found) == len(wanted) or not new_ids or (timestamps and timestamps[-1] < oldest):
+            break
+        random_delay(1, 2)
+    return found
+
+def read_likes_from_status_page(driver, tweet_id):
     """
-    Retrieves the agent's own past posts from vector memory to provide context.
+    Fallback for a post the timeline pass missed: opens its status page and reads the like
+    counter. X only links to /status/<id>/likes once a post has likes, so no link means 0.
     """
+    driver.get(x_url(f"/{BOT_HANDLE}/status/{tweet_id}")); random_delay(5, 5)
+    WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, TWEET_SELECTORS["article"])))
+    like_elements = driver.find_elements(By.XPATH, f"//a[contains(@href, '/status/{tweet_id}/likes')]//span[@data-testid='app-text-transition-container']")
+    if not like_elements:
+        return 0
+    return parse_engagement_count(like_elements[0].text) or 0
+
+def _format_own_context(found_docs):
+    if not found_docs:
+        return "" # Return empty string if no context
+    formatted_context = "\n".join([f"- {doc}" for doc in found_docs])
+    log.info("recalling_own_thoughts", context=formatted_context)
+    return f"To maintain thematic consistency, I recall my own previous statements on this topic:\n{formatted_context}\n"
+
+def _format_reflection_report(found_docs, market_context="", strategic_insights="No strategic insights found in memory."):
+    if found_docs:
+        strategic_insights = "\n".join([f"- {doc}" for doc in found_docs])
+        log.info("applying_insights_from_memory", insights=strategic_insights)
+    return f"1. CONTEXTUAL SUMMARY:\n{market_context or 'No specific market event.'}\n\n2. STRATEGIC INSIGHTS FROM PAST PERFORMANCE (Your Memory):\n{strategic_insights}"
+
+def _insight_query_text(subject):
+    return f"strategic insights about {subject} and market sentiment"
+
+def _docs_of_type(memory_data, row, memory_type, n_results):
+    """Picks the top n_results documents of one memory type from a row of a multi-query result."""
+    documents = (memory_data.get('documents') or [])
+    metadatas = (memory_data.get('metadatas') or [])
+    if row >= len(documents):
+        return []
+    row_metadatas = metadatas[row] if row < len(metadatas) and metadatas[row] else [{}] * len(documents[row])
+    return [doc for doc, meta in zip(documents[row], row_metadatas) if (meta or {}).get("type") == memory_type][:n_results]
+
+def _memory_key(text):
+    return " ".join(re.sub(r"[^\w\s]", "", text.lower()).split())
+
+def _truncate_to_tokens(text, max_tokens):
+    """Cuts text to roughly max_tokens at a word boundary. Returns "" if too little would be left."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    if max_tokens < 8:
+        return ""
+    cut = text[:max_tokens * 4].rsplit(" ", 1)[0].rstrip(" ,;:-")
+    return f"{cut}…" if cut else ""
+
+def fit_memories_to_budget(doc_groups, budget=PROMPT_MEMORY_TOKEN_BUDGET):
+    """
+    Dedupes recalled memory documents across groups and trims them to a shared token budget.
+    doc_groups is a list of ranked document lists; documents are taken round-robin by rank,
+    so every group keeps its best matches, and one that only partly fits is cut short.
+    Returns the trimmed groups in the same order.
+    """
+    kept, seen, remaining = [[] for _group in doc_groups], [], budget
+    for rank in range(max((len(group) for group in doc_groups), default=0)):
+        for group, kept_docs in zip(doc_groups, kept):
+            if rank >= len(group) or remaining <= 0:
+                continue
+            key = _memory_key(group[rank])
+            # Exact repeats and memories contained in an already kept one add nothing new.
+            if not key or any(key in other or other in key for other in seen):
+                continue
+            seen.append(key)
+            doc = _truncate_to_tokens(group[rank], remaining)
+            if doc:
+                kept_docs.append(doc)
+                remaining -= estimate_tokens(doc)
+    before, after = sum(len(group) for group in doc_groups), sum(len(docs) for docs in kept)
+    if before != after or budget - remaining > budget * 0.9:
+        log.debug("prompt_memory_compacted", before=before, after=after, tokens=budget - remaining, budget=budget)
+    return kept
+
+def recall_engagement_context(query_text, subject, market_context="", n_results=2):
+    """
+    Recalls the agent's own past statements about query_text and its strategic insights
+    about subject at once. Both query texts are embedded in one batched request and looked
+    up with a single vector memory query; a follow-up query is made only for a memory type
+    that the shared result window did not cover.
+    Returns a tuple of (own_context, reflection_report).
+    """
+    log.info("generating_reflection_context")
+    own_docs, insight_docs = [], []
     try:
-        response = client_openai.embeddings.create(input=[query_text], model="text-embedding-3-small")
-        # --- IMPORTANT: Filter for 'self_posted' type ---
+        own_embedding, insight_embedding = embed_texts([query_text, _insight_query_text(subject)])
+        window = n_results * RECALL_OVERFETCH
         memory_data = vector_memory.query(
-            query_embeddings=[response.data[0].embedding],
-            n_results=n_results,
-            where={"type": "self_posted"} 
+            query_embeddings=[own_embedding, insight_embedding],
+            n_results=window,
+            where={"type": {"$in": ["self_posted", "insight"]}}
         )
-        
-        found_docs = memory_data.get('documents', [[]])[0]
-        if found_docs:
-            formatted_context = "\n".join([f"- {doc}" for doc in found_docs])
-            print(f"🧠 [Self-Awareness] Recalling own past thoughts:\n{formatted_context}")
-            return f"To maintain thematic consistency, I recall my own previous statements on this topic:\n{formatted_context}\n"
+        own_docs = _docs_of_type(memory_data, 0, "self_posted", n_results)
+        insight_docs = _docs_of_type(memory_data, 1, "insight", n_results)
+        # A full window that still lacks one type means that type is crowded out, not missing.
+        for row, memory_type, embedding, docs in ((0, "self_posted", own_embedding, own_docs), (1, "insight", insight_embedding, insight_docs)):
+            if len(docs) < n_results and len((memory_data.get('documents') or [[], []])[row]) >= window:
+                log.debug("recall_window_underfilled", memory_type=memory_type)
+                extra = vector_memory.query(query_embeddings=[embedding], n_results=n_results, where={"type": memory_type})
+                docs[:] = extra.get('documents', [[]])[0]
     except Exception as e:
-        print(f"⚠️ Error recalling own context: {e}")
-    return "" # Return empty string if no context or error
+        log.error("memory_query_error", e=e)
+        return "", _format_reflection_report([], market_context, "Error retrieving insights from memory.")
+    own_docs, insight_docs = fit_memories_to_budget([own_docs, insight_docs])
+    return _format_own_context(own_docs), _format_reflection_report(insight_docs, market_context)
 
 # --- AI & Content Generation ---
 def get_autoreflaction_for_prompt(subject, current_goal, market_context=""):
-    print(_("generating_reflection_context"))
-    strategic_insights = "No strategic insights found in memory."
+    log.info("generating_reflection_context")
     try:
         # Create an embedding for the query to find relevant memories
-        query_text = f"strategic insights about {subject} and market sentiment"
-        response = client_openai.embeddings.create(input=[query_text], model="text-embedding-3-small")
+        query_embedding = embed_texts([_insight_query_text(subject)])[0]
         
         # Query the vector memory for the most relevant insights
         strategic_insights_data = vector_memory.query(
-            query_embeddings=[response.data[0].embedding], 
+            query_embeddings=[query_embedding], 
             n_results=2,  # Get the top 2 most relevant insights
             where={"type": "insight"}
         )
-        
-        # Format the insights if found
-        found_docs = strategic_insights_data.get('documents', [[]])[0]
-        if found_docs:
-            strategic_insights = "\n".join([f"- {doc}" for doc in found_docs])
-            # --- NEW LOGGING LINE ---
-            print(f"🧠 [Learning] Applying insights from memory:\n{strategic_insights}")
-            
+        found_docs, = fit_memories_to_budget([strategic_insights_data.get('documents', [[]])[0]])
     except Exception as e:
-        print(_("memory_query_error", e=e))
-        strategic_insights = "Error retrieving insights from memory."
+        log.error("memory_query_error", e=e)
+        return _format_reflection_report([], market_context, "Error retrieving insights from memory.")
 
-    return f"1. CONTEXTUAL SUMMARY:\n{market_context or 'No specific market event.'}\n\n2. STRATEGIC INSIGHTS FROM PAST PERFORMANCE (Your Memory):\n{strategic_insights}"
+    return _format_reflection_report(found_docs, market_context)
+
+def digest_subjects():
+    """Every subject a post can be about: the core topics, the research categories and Market Sentiment."""
+    return list(dict.fromkeys([*CORE_TOPICS, *RESEARCH_CATEGORIES, "Market Sentiment"]))
+
+def refresh_insight_digests():
+    """Rebuilds the per-subject insight digests with one batched embedding request and one vector memory query."""
+    subjects = digest_subjects()
+    try:
+        embeddings = embed_texts([_insight_query_text(subject) for subject in subjects])
+        memory_data = vector_memory.query(query_embeddings=embeddings, n_results=INSIGHT_DIGEST_SIZE, where={"type": "insight"})
+        documents = memory_data.get('documents') or []
+        insight_digests.replace({subject: documents[i] if i < len(documents) else [] for i, subject in enumerate(subjects)})
+        log.info("insight_digests_refreshed", subjects=len(subjects))
+    except Exception as e:
+        log.warning("insight_digests_error", e=e)
+
+def get_post_reflection_report(subject, market_context=""):
+    """
+    The reflection report for a post, taken from the insight digests. Subjects without a
+    digest (before the first reflection, or ad-hoc subjects) fall back to live recall.
+    """
+    found_docs = insight_digests.get(subject)
+    if found_docs is None:
+        return get_autoreflaction_for_prompt(subject, CURRENT_GOAL, market_context)
+    found_docs, = fit_memories_to_budget([found_docs])
+    return _format_reflection_report(found_docs, market_context)
+
+# --- GENERIC SCORING PROMPTS USING THE PERSONA PRIMER ---
+def format_candidates(candidates):
+    """One line per candidate tweet: its index and its text, flattened and capped at 280 characters."""
+    return "\n    ".join(f"[{c['index']}] {' '.join(c['text'].split())[:280]}" for c in candidates)
+
+def build_feed_scoring_prompt(candidates):
+    valid_indices = [c['index'] for c in candidates]
+    return f"""
+    {persona_primer} Analyze these fresh tweets from your 'following' feed. Your task is to identify the single most intellectually stimulating one to comment on, consistent with your character.
+
+    {format_candidates(candidates)}
+
+    Valid indices are: {valid_indices}.
+
+    Return a JSON object with 'best_index' and a brief 'reason' for your choice.
+    Example: {{"best_index": {random.choice(valid_indices) if valid_indices else 0}, "reason": "This post aligns with my core research areas and allows for a nuanced, analytical comment."}}
+    If none are truly worthy, return an empty JSON.
+    """
+
+def build_discovery_scoring_prompt(query, candidates):
+    valid_indices = [c['index'] for c in candidates]
+    return f""" {persona_primer} Analyze these tweets discovered during a research expedition on the topic of '{query}'. Your objective is to identify the single most intellectually stimulating thread to engage with.
+    {format_candidates(candidates)}
+    Valid indices are: {valid_indices}.Return a JSON object containing only the 'best_index'. """
+
+def ask_for_json_decision(scoring_prompt):
+    return json.loads(chat_completion("scoring", REFLECTIVE_MODEL, scoring_prompt, response_format={"type": "json_object"}))
+
+# --- Candidate Pre-ranking ---
+class InterestProfile:
+    """
+    The reference vectors candidate tweets are ranked against (see candidate_ranking.py): the
+    agent's most recent posts, its best liked insights and its research categories. Rebuilt
+    only when those memory types or the category weights have changed since the last build.
+    """
+    MEMORY_TYPES = ["self_posted", "insight"]
+
+    def __init__(self):
+        self._key = None
+        self._groups = []
+
+    @staticmethod
+    def _memory_vectors(memory_type):
+        """Embeddings and metadata of up to CANDIDATE_PROFILE_SIZE entries: insights by likes, posts by recency."""
+        data = vector_memory.get(where={"type": memory_type}, include=["embeddings", "metadatas"])
+        embeddings = data.get("embeddings")
+        if embeddings is None or len(embeddings) == 0:
+            return [], []
+        entries = list(zip(data["ids"], embeddings, data["metadatas"] or [{}] * len(data["ids"])))
+        if memory_type == "insight":
+            entries.sort(key=lambda e: (((e[2] or {}).get("likes") or 0), created_at(e[0], e[2]) or 0.0), reverse=True)
+        else:
+            entries.sort(key=lambda e: created_at(e[0], e[2]) or 0.0, reverse=True)
+        entries = entries[:CANDIDATE_PROFILE_SIZE]
+        return [e[1] for e in entries], [e[2] or {} for e in entries]
+
+    def groups(self):
+        """(reference_vectors, weights, group_weight) for posts, insights and research categories."""
+        key = (vector_memory.generation({"type": {"$in": self.MEMORY_TYPES}}), json.dumps(RESEARCH_CATEGORIES, sort_keys=True))
+        if key != self._key:
+            posts, _post_metadatas = self._memory_vectors("self_posted")
+            insights, insight_metadatas = self._memory_vectors("insight")
+            # Insights from well liked posts count fully, those from posts nobody liked count half.
+            insight_weights = [0.5 + 0.5 * min((m.get("likes") or 0) / max(MEMORY_INSIGHT_KEEP_LIKES, 1), 1.0) for m in insight_metadatas]
+            categories = list(RESEARCH_CATEGORIES)
+            top_weight = max(RESEARCH_CATEGORIES.values(), default=0) or 1.0
+            self._groups = [
+                (posts, None, CANDIDATE_PROFILE_WEIGHTS.get("posts", 1.0)),
+                (insights, insight_weights, CANDIDATE_PROFILE_WEIGHTS.get("insights", 1.0)),
+                (embed_texts(categories) if categories else [], [RESEARCH_CATEGORIES[c] / top_weight for c in categories], CANDIDATE_PROFILE_WEIGHTS.get("categories", 1.0)),
+            ]
+            self._key = key
+            log.debug("interest_profile_rebuilt", posts=len(posts), insights=len(insights), categories=len(categories))
+        return self._groups
+
+interest_profile = InterestProfile()
+
+def candidate_embeddings(candidates):
+    """Embeddings of the candidates: stored ones from the seen-tweet cache, the rest in one batched request."""
+    vectors = [seen_tweets.embedding(c["id"]) for c in candidates]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        for i, vector in zip(missing, embed_texts([candidates[i]["text"] or " " for i in missing])):
+            vectors[i] = vector
+    return vectors
+
+def choose_candidate(candidates, build_prompt):
+    """
+    Picks the candidate tweet to engage with. Candidates are embedded in one batch and ranked
+    locally against the interest profile. A clear winner is taken without asking the LLM;
+    otherwise only the shortlist goes to build_prompt's scoring prompt to break the tie. If
+    the ranking fails, all candidates go to the prompt. Every outcome goes to the seen-tweet
+    cache: a whole shortlist the LLM turned down is rejected; candidates below
+    CANDIDATE_MIN_SCORE or outside the shortlist and runners-up the LLM did not pick are
+    only passed over. The floor is not applied while the interest profile is still empty. The chosen one is not settled here,
+    since the reply to it can still fail. Returns (candidate or None, reason).
+    """
+    finalists, scores, vectors = candidates, {}, {}
+    try:
+        embeddings = candidate_embeddings(candidates)
+        groups = interest_profile.groups()
+        ranked_scores = interest_scores(embeddings, groups)
+        # An empty profile scores every candidate 0, which says nothing about relevance.
+        profile_empty = all(len(references) == 0 for references, _weights, _group_weight in groups)
+        min_score = CANDIDATE_MIN_SCORE if CANDIDATE_MIN_SCORE > 0 and not profile_empty else None
+        order, decided = shortlist(ranked_scores, CANDIDATE_SHORTLIST_SIZE, CANDIDATE_CLEAR_MARGIN, min_score)
+        scores = {c["id"]: float(score) for c, score in zip(candidates, ranked_scores)}
+        vectors = {c["id"]: vector for c, vector in zip(candidates, embeddings)}
+        if log.is_enabled(logging.DEBUG):
+            ranking = sorted(zip(ranked_scores, (c["index"] for c in candidates)), reverse=True)
+            log.debug("candidates_preranked", ranking=", ".join(f"[{index}] {score:.3f}" for score, index in ranking))
+        finalists = [candidates[i] for i in order]
+        finalist_ids = {c["id"] for c in finalists}
+        for c in candidates:
+            if c["id"] not in finalist_ids:
+                seen_tweets.record(c["id"], "passed_over", scores[c["id"]], vectors[c["id"]])
+        if not order:
+            return None, _("candidates_below_min_score", min_score=CANDIDATE_MIN_SCORE)
+        if decided:
+            chosen = finalists[0]
+            seen_tweets.record(chosen["id"], "chosen", scores[chosen["id"]], vectors[chosen["id"]])
+            return chosen, _("candidate_clear_winner", score=scores[chosen["id"]])
+    except Exception as e:
+        log.warning("candidate_ranking_error", e=e)
+    decision = ask_for_json_decision(build_prompt(finalists))
+    chosen = next((c for c in finalists if c["index"] == decision.get("best_index")), None)
+    for c in finalists:
+        # Runners-up only lost a close call; the shortlist is rejected only if the LLM took none of it.
+        outcome = "passed_over" if chosen else "rejected"
+        seen_tweets.record(c["id"], "chosen" if c is chosen else outcome, scores.get(c["id"]), vectors.get(c["id"]))
+    return chosen, decision.get("reason")
+
+# --- Length-guaranteed Generation ---
+length_outcomes = defaultdict(int)
+_length_outcomes_lock = threading.Lock()
+
+def _count_length_outcome(outcome):
+    with _length_outcomes_lock:
+        length_outcomes[outcome] += 1
+
+def generate_within_limit(purpose, prompt, limit=TWEET_MAX_LENGTH):
+    """
+    Generates a post or reply that fits X's weighted length limit (see tweet_length.py),
+    normally with a single model call: the request states the limit and is capped at
+    GENERATION_MAX_TOKENS, and an overlong answer is cut back to its last whole sentence that
+    fits. Only when the sentences that fit would leave less than half the limit (or a fragment
+    such as "Mr.") is the text sent to REFLECTIVE_MODEL to be shortened, and anything still too
+    long after that is cut at a word boundary.
+    length_outcomes counts how each text was brought within the limit: fit, trimmed or shortened.
+    """
+    length_prompt = f"{prompt}\n\nYour answer must stay under {limit} characters."
+    content = chat_completion(purpose, CREATION_MODEL, length_prompt, max_tokens=GENERATION_MAX_TOKENS).strip().strip('"')
+    length = weighted_length(content)
+    if length <= limit:
+        _count_length_outcome("fit")
+        return content
+    trimmed = trim_to_sentences(content, limit)
+    if trimmed:
+        _count_length_outcome("trimmed")
+        log.debug("generated_text_trimmed", purpose=purpose, length=length, trimmed_length=weighted_length(trimmed))
+        return trimmed
+    _count_length_outcome("shortened")
+    log.info("generated_text_shortened", purpose=purpose, length=length, limit=limit)
+    shortening_prompt = f"CRITICAL: The following text is too long. Ruthlessly shorten it to be WELL UNDER {limit} characters. Preserve the core cryptic meaning. TEXT: '{content}'"
+    shortened = chat_completion("shorten", REFLECTIVE_MODEL, shortening_prompt, max_tokens=GENERATION_MAX_TOKENS).strip().strip('"')
+    return trim_to_sentences(shortened, limit) or trim_to_words(shortened, limit)
 
 def generate_tweet_content(market_context="", subject_override=None):
     observed_subject = subject_override or random.choice(CORE_TOPICS)
-    print(_("initiating_generation_protocol", observed_subject=observed_subject))
-    reflection_report = get_autoreflaction_for_prompt(observed_subject, CURRENT_GOAL, market_context)
+    log.info("initiating_generation_protocol", observed_subject=observed_subject)
+    reflection_report = get_post_reflection_report(observed_subject, market_context)
     final_prompt = prompt_template.format(observed_subject=observed_subject, successful_examples=reflection_report)
     try:
-        response = client_openai.chat.completions.create(model=CREATION_MODEL, messages=[{"role": "user", "content": final_prompt}])
-        content = response.choices[0].message.content.strip().strip('"')
-        if len(content) > 280:
-            shortening_prompt = f"CRITICAL: The following text is too long. Ruthlessly shorten it to be WELL UNDER 280 characters. Preserve the core cryptic meaning. TEXT: '{content}'"
-            response = client_openai.chat.completions.create(model=REFLECTIVE_MODEL, messages=[{"role": "user", "content": shortening_prompt}])
-            content = response.choices[0].message.content.strip().strip('"')
-        print(_("generated_new_post", content=content))
+        content = generate_within_limit("post", final_prompt)
+        log.info("generated_new_post", content=content)
         return observed_subject, content
     except Exception as e:
-        print(_("data_synthesis_error", e=e))
+        log.error("data_synthesis_error", e=e)
         return observed_subject, None
 
 # --- Reusable Engagement Logic ---
+# Reply generation runs here while the main thread drives the browser.
+reply_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reply-generation")
+
+def prepare_reply(target_tweet, engagement_type):
+    """Recalls context and generates the reply text for a thread. Touches no browser state."""
+    # --- Recall own context and strategic insights in one batched lookup ---
+    own_context, reflection_report = recall_engagement_context(target_tweet['text'], f"Engage with {engagement_type}", target_tweet['text'])
+    # --- MODIFIED: Inject self-awareness into the prompt ---
+    reply_prompt = prompt_template.format(
+        observed_subject=f"a comment on a post: '{target_tweet['text']}'", 
+        successful_examples=f"{own_context}\n{reflection_report}" # Prepend own context
+    )
+    return generate_within_limit("reply", reply_prompt)
+
+def wait_for_background_result(future, poll_seconds=0.5):
+    """
+    Waits for a background task while watching agent_running. Returns None (and cancels the
+    task if it has not started yet) when the agent is shut down in the meantime.
+    """
+    while True:
+        if not agent_running:
+            future.cancel()
+            return None
+        try:
+            return future.result(timeout=poll_seconds)
+        except FutureTimeoutError:
+            continue
+
 def _engage_with_thread(driver, target_tweet, engagement_type):
     try:
-        log_debug(_("engaging_with_thread", target_tweet_id=target_tweet['id'], engagement_type=engagement_type))
-        print(_("navigating_to_tweet", url=target_tweet['url']))
+        log.debug("engaging_with_thread", target_tweet_id=target_tweet['id'], engagement_type=engagement_type)
+        # The reply only depends on the tweet text we already have, so write it while the page loads.
+        reply_future = reply_executor.submit(prepare_reply, target_tweet, engagement_type)
+        log.info("navigating_to_tweet", url=target_tweet['url'])
         driver.get(target_tweet['url'])
         random_delay(5, 8)
-        if not agent_running: return
-        # --- NEW: Recall own context before replying ---
-        own_context = get_own_context_from_memory(target_tweet['text'])
-        reflection_report = get_autoreflaction_for_prompt(f"Engage with {engagement_type}", CURRENT_GOAL, target_tweet['text'])
-        # --- MODIFIED: Inject self-awareness into the prompt ---
-        reply_prompt = prompt_template.format(
-            observed_subject=f"a comment on a post: '{target_tweet['text']}'", 
-            successful_examples=f"{own_context}\n{reflection_report}" # Prepend own context
-        )
-        response = client_openai.chat.completions.create(model=CREATION_MODEL, messages=[{"role": "user", "content": reply_prompt}])
-        reply_content = response.choices[0].message.content.strip().strip('"')
-        if len(reply_content) > 280:
-            shortening_prompt = f"CRITICAL: Shorten this reply to WELL UNDER 280 characters. TEXT: '{reply_content}'"
-            response = client_openai.chat.completions.create(model=REFLECTIVE_MODEL, messages=[{"role": "user", "content": shortening_prompt}])
-            reply_content = response.choices[0].message.content.strip().strip('"')
-        print(_("prepared_strategic_comment", reply_content=reply_content))
+        if not agent_running:
+            reply_future.cancel()
+            return
+        reply_content = wait_for_background_result(reply_future)
+        if reply_content is None: return
+        log.info("prepared_strategic_comment", reply_content=reply_content)
         reply_box = WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-testid="tweetTextarea_0"]')))
         type_via_clipboard(driver, reply_box, reply_content)
         random_delay()
@@ -365,20 +1251,20 @@ def _engage_with_thread(driver, target_tweet, engagement_type):
         post_button = WebDriverWait(driver, 15).until(EC.element_to_be_clickable((By.XPATH, post_button_xpath)))
         robust_click(driver, post_button)
         WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.XPATH, "//div[@data-testid='toast']")))
-        print(_("comment_sent_success", target_tweet_id=target_tweet['id']))
-        cursor.execute("INSERT INTO engagements VALUES (datetime('now'), ?, ?, ?, ?)", ('reply', target_tweet['id'], reply_content, 'success'))
-        conn.commit()
+        log.info("comment_sent_success", target_tweet_id=target_tweet['id'])
+        record_engagement('reply', target_tweet['id'], reply_content, 'success')
         log_action(engagement_type, target_tweet['id'], "SUCCESS")
     except Exception as e:
-        print(f"❌ Error while engaging with thread: {type(e).__name__} - {e}")
+        log.error("thread_engagement_error", error_type=type(e).__name__, e=e)
         log_action(engagement_type, target_tweet.get('id', 'unknown'), f"FAILURE: {type(e).__name__} - {e}")
 
 # --- Core Agent Action Functions ---
-def post_tweet(driver, subject, content):
+def post_tweet(driver, subject, content, composer_open=False):
     try:
-        print(_("publishing_new_observation"))
-        driver.get("https://twitter.com/home")
-        random_delay(3, 5)
+        log.info("publishing_new_observation")
+        if not composer_open:
+            driver.get(x_url("/home"))
+            random_delay(3, 5)
         tweet_box = WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-testid="tweetTextarea_0"]')))
         type_via_clipboard(driver, tweet_box, content)
         random_delay()
@@ -387,69 +1273,66 @@ def post_tweet(driver, subject, content):
         robust_click(driver, post_button)
         confirmation_toast = WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.XPATH, "//div[@data-testid='toast']//a[contains(@href, '/status/')]")))
         tweet_id = confirmation_toast.get_attribute('href').split('/')[-1]
-        print(_("observation_published", tweet_id=tweet_id))
+        log.info("observation_published", tweet_id=tweet_id)
         cursor.execute("INSERT OR IGNORE INTO observations (timestamp, tweet_id, subject, content, status) VALUES (?, ?, ?, ?, ?)", (datetime.now().isoformat(), tweet_id, subject, content, 'published'))
         conn.commit()
-        response = client_openai.embeddings.create(input=[content], model="text-embedding-3-small")
-        vector_memory.add(embeddings=[response.data[0].embedding], documents=[content], metadatas=[{"type": "self_posted", "subject": subject}], ids=[tweet_id])
+        vector_memory.add(embeddings=embed_texts([content]), documents=[content], metadatas=[{"type": "self_posted", "subject": subject, "created_at": time.time()}], ids=[tweet_id])
         log_action("post_tweet", subject, "SUCCESS")
         return True
     except Exception as e:
-        print(_("publication_error", e=e))
+        log.error("publication_error", e=e)
         log_action("post_tweet", subject, f"FAILURE: {e}")
         return False
 
 def scan_and_reply_to_mentions(driver):
-    print(_("action_scan_mentions"))
+    log.info("action_scan_mentions")
     log_action("scan_and_reply_to_mentions", "system", "STARTED")
     try:
-        driver.get("https://twitter.com/notifications/mentions")
+        driver.get(x_url("/notifications/mentions"))
         random_delay()
-        cursor.execute("SELECT target_tweet_id FROM engagements WHERE engagement_type='reply'")
-        already_replied_ids = {row[0] for row in cursor.fetchall()}
-        mentions = driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
+        mentions = extract_tweets(driver, limit=5)
         if not mentions:
-            log_debug(_("no_tweet_elements_on_mentions_page"))
+            log.debug("no_tweet_elements_on_mentions_page")
             return False
         new_mentions = []
         one_day_ago = datetime.now().astimezone() - timedelta(days=1)
-        for mention in mentions[:5]:
-            try:
-                time_element = mention.find_element(By.TAG_NAME, 'time')
-                if datetime.fromisoformat(time_element.get_attribute('datetime').replace('Z', '+00:00')) < one_day_ago:
-                    log_debug(_("skipping_old_mention"))
-                    continue
-                mention_id = mention.find_element(By.XPATH, ".//a[contains(@href, '/status/')]").get_attribute('href').split('/')[-1]
-                if mention_id not in already_replied_ids:
-                    new_mentions.append({"id": mention_id, "text": mention.find_element(By.CSS_SELECTOR, 'div[data-testid="tweetText"]').text, "element": mention})
-            except:
+        for mention in mentions:
+            if not (mention['id'] and mention['timestamp'] and mention['text'] is not None):
+                continue
+            if parse_tweet_timestamp(mention['timestamp']) < one_day_ago:
+                log.debug("skipping_old_mention")
                 continue
+            if seen_tweets.is_settled(mention['id']):
+                log.debug("skipping_seen_tweet", tweet_id=mention['id'])
+                continue
+            if not identity_index.has_replied(mention['id']):
+                new_mentions.append({"id": mention['id'], "text": mention['text']})
         if not new_mentions:
-            log_debug(_("no_new_unhandled_mentions"))
+            log.debug("no_new_unhandled_mentions")
             return False
         target_mention = new_mentions[0]
-        print(_("found_new_mention", target_mention_id=target_mention['id']))
+        log.info("found_new_mention", target_mention_id=target_mention['id'])
         if random.random() > REPLY_CHANCE:
-            log_debug(_("skipped_mention_reply_by_chance", target_mention_id=target_mention['id']))
+            log.debug("skipped_mention_reply_by_chance", target_mention_id=target_mention['id'])
             return True
-        _engage_with_thread(driver, {"id": target_mention['id'], "text": target_mention['text'], "url": f"https://twitter.com/i/web/status/{target_mention['id']}"}, 'mention_reply')
+        _engage_with_thread(driver, {"id": target_mention['id'], "text": target_mention['text'], "url": x_url(f"/i/web/status/{target_mention['id']}")}, 'mention_reply')
         return True
     except Exception as e:
-        print(_("mentions_analysis_error", e=e))
+        log.error("mentions_analysis_error", e=e)
         log_action("scan_and_reply_to_mentions", "system", f"FAILURE: {e}")
         return False
 
 # --- RESTORED AND IMPROVED FUNCTION ---
 def browse_following_feed_and_engage(driver):
-    print(_("action_browse_following_feed"))
+    log.info("action_browse_following_feed")
     log_action("browse_following_feed", "system", "STARTED")
     try:
-        driver.get("https://twitter.com/home")
+        driver.get(x_url("/home"))
         # Wait for a core element of the page to be visible, like the tweet composer
         WebDriverWait(driver, 20).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, 'div[data-testid="tweetTextarea_0"]'))
         )
-        print("Home page main components loaded.")
+        log.info("home_page_loaded")
         random_delay(2, 4) # Extra delay for dynamic elements to settle
 
         try:
@@ -459,233 +1342,234 @@ def browse_following_feed_and_engage(driver):
             # when other attributes like href or data-testid are unreliable.
             following_tab_xpath = "//a[.//span[text()='Following']]"
             
-            print("Attempting to find and click the 'Following' tab...")
+            log.info("switching_to_following_tab")
             following_tab = WebDriverWait(driver, 15).until(
                 EC.element_to_be_clickable((By.XPATH, following_tab_xpath))
             )
             
             robust_click(driver, following_tab)
-            print("Successfully switched to the 'Following' feed.")
+            log.info("switched_to_following_tab")
             random_delay(3, 5) # Wait for the new feed to load
             # --- END OF THE NEW, FINAL STRATEGY ---
         except Exception as e:
             # Taking a screenshot on failure for debugging purposes
             screenshot_path = f"debug_screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
             driver.save_screenshot(screenshot_path)
-            print(f"Could not switch to 'Following' tab. A screenshot has been saved to: {screenshot_path}")
-            log_debug(f"Error details: {e}")
+            log.warning("following_tab_switch_failed", screenshot_path=screenshot_path)
+            log.debug("error_details", e=e)
         
         # Instead of scrolling, we simply fetch a solid pool of tweets from the top of the page
-        tweets = WebDriverWait(driver, 15).until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'article[data-testid="tweet"]')))
-        
-        cursor.execute("SELECT target_tweet_id FROM engagements"); engaged_ids = {row[0] for row in cursor.fetchall()}
+        WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.CSS_SELECTOR, TWEET_SELECTORS["article"])))
+        tweets = extract_tweets(driver)
         
         fresh_targets = []
         two_hours_ago = datetime.now().astimezone() - timedelta(hours=5)
-        bot_username = YOUR_PROFILE_URL.split('/')[-1].lower()
+        bot_username = BOT_HANDLE.lower()
         
-        print(_("analyzing_posts_from_feed", len_tweets=len(tweets)))
-        for i, tweet in enumerate(tweets):
-            try:
-                tweet_id_element = tweet.find_element(By.XPATH, ".//a[contains(@href, '/status/')]")
-                tweet_url = tweet_id_element.get_attribute('href')
-                tweet_id = tweet_url.split('/')[-1]
-
-                # --- IMPROVED FILTERING LOGIC WITH FULL LOGGING ---
-                author_handle = tweet.find_element(By.XPATH, ".//div[@data-testid='User-Name']//span[contains(text(), '@')]").text.strip().lower()
-                if f"@{bot_username}" == author_handle:
-                    log_debug(_("skipping_own_tweet", tweet_id=tweet_id))
-                    continue
-                    
-                if tweet_id in engaged_ids:
-                    log_debug(_("skipping_already_engaged_tweet", tweet_id=tweet_id))
-                    continue
-                    
-                time_element = tweet.find_element(By.TAG_NAME, 'time')
-                tweet_timestamp = datetime.fromisoformat(time_element.get_attribute('datetime').replace('Z', '+00:00'))
-                if tweet_timestamp < two_hours_ago:
-                    log_debug(_("skipping_old_tweet", tweet_id=tweet_id))
-                    continue
+        log.info("analyzing_posts_from_feed", len_tweets=len(tweets))
+        for tweet in tweets:
+            tweet_id = tweet['id']
+            missing_fields = [field for field in ('id', 'author', 'timestamp', 'text') if tweet[field] is None]
+            if missing_fields:
+                log.debug("error_analyzing_tweet", e=f"missing {', '.join(missing_fields)}")
+                continue
 
-                text_content = tweet.find_element(By.CSS_SELECTOR, 'div[data-testid="tweetText"]').text
-                if len(text_content) < 40:
-                    log_debug(_("skipping_short_tweet", tweet_id=tweet_id))
-                    continue
+            # --- IMPROVED FILTERING LOGIC WITH FULL LOGGING ---
+            if f"@{bot_username}" == tweet['author']:
+                log.debug("skipping_own_tweet", tweet_id=tweet_id)
+                continue
                 
-                # If it passed all filters, it's a good candidate
-                log_debug(_("tweet_qualified_as_candidate", tweet_id=tweet_id))
-                fresh_targets.append({"id": tweet_id, "text": text_content, "url": tweet_url, "index": i})
+            if identity_index.has_engaged(tweet_id):
+                log.debug("skipping_already_engaged_tweet", tweet_id=tweet_id)
+                continue
 
-            except Exception as e:
-                log_debug(_("error_analyzing_tweet", e=e))
+            if seen_tweets.is_settled(tweet_id):
+                log.debug("skipping_seen_tweet", tweet_id=tweet_id)
+                continue
+                
+            if parse_tweet_timestamp(tweet['timestamp']) < two_hours_ago:
+                log.debug("skipping_old_tweet", tweet_id=tweet_id)
                 continue
+
+            if len(tweet['text']) < 40:
+                log.debug("skipping_short_tweet", tweet_id=tweet_id)
+                continue
+            
+            # If it passed all filters, it's a good candidate
+            log.debug("tweet_qualified_as_candidate", tweet_id=tweet_id)
+            fresh_targets.append({"id": tweet_id, "text": tweet['text'], "url": tweet['url'], "index": tweet['index']})
         
         if not fresh_targets:
-            print(_("no_fresh_posts_in_feed"))
+            log.info("no_fresh_posts_in_feed")
             return
 
-        print(_("identified_fresh_targets", len_fresh_targets=len(fresh_targets)))
-        valid_indices = [t['index'] for t in fresh_targets]
-        
-
-        # --- GENERIC PROMPT USING THE PERSONA PRIMER ---
-        scoring_prompt = f"""
-        {persona_primer} Analyze these fresh tweets from your 'following' feed. Your task is to identify the single most intellectually stimulating one to comment on, consistent with your character.
-
-        Valid indices are: {valid_indices}.
-
-        Return a JSON object with 'best_index' and a brief 'reason' for your choice.
-        Example: {{"best_index": {random.choice(valid_indices) if valid_indices else 0}, "reason": "This post aligns with my core research areas and allows for a nuanced, analytical comment."}}
-        If none are truly worthy, return an empty JSON.
-        """
-        
-        response = client_openai.chat.completions.create(model=REFLECTIVE_MODEL, response_format={"type": "json_object"}, messages=[{"role": "user", "content": scoring_prompt}])
-        decision = json.loads(response.choices[0].message.content)
-        best_index = decision.get("best_index")
+        log.info("identified_fresh_targets", len_fresh_targets=len(fresh_targets))
+        target_tweet, reason = choose_candidate(fresh_targets, build_feed_scoring_prompt)
 
         # --- IMPROVED AI DECISION LOGGING ---
-        if best_index is None or best_index not in valid_indices:
-            print(_("ai_did_not_select_target"))
-            log_debug(_("ai_decision_reason", reason=decision.get('reason', 'No justification provided.')))
-            return
-            
-        target_tweet = next((t for t in fresh_targets if t["index"] == best_index), None)
         if not target_tweet:
-            print(_("critical_error_finding_target", best_index=best_index))
+            log.info("ai_did_not_select_target")
+            log.debug("ai_decision_reason", reason=reason or 'No justification provided.')
             return
 
-        print(_("strategy_selected_fresh_target", target_tweet_id=target_tweet['id'], reason=decision.get('reason')))
+        log.info("strategy_selected_fresh_target", target_tweet_id=target_tweet['id'], reason=reason)
         _engage_with_thread(driver, target_tweet, "following_feed_reply")
 
     except Exception as e:
-        print(_("error_browsing_feed", e=e))
+        log.error("error_browsing_feed", e=e)
         log_action("browse_following_feed", "system", f"FAILURE: {e}")
 
 # --- NEXT-GEN: Proactive Growth & Learning Functions ---
 def conduct_market_research():
-    print(_("action_market_research"))
+    """
+    Returns (report, market_state): the human-readable report for the analyst prompt and the
+    structured values behind it, or an "unavailable" report and None if the data could not be read.
+    """
+    log.info("action_market_research")
     try:
-        cg_response = requests.get("https://api.coingecko.com/api/v3/simple/price?ids=bitcoin,solana&vs_currencies=usd&include_24hr_change=true").json()
+        snapshot = market_data.get_snapshot()
+        cg_response = snapshot['prices']
         btc_change = cg_response.get('bitcoin', {}).get('usd_24h_change', 0)
         sol_price = cg_response.get('solana', {}).get('usd', 0)
         sol_change = cg_response.get('solana', {}).get('usd_24h_change', 0)
-        fng_response = requests.get("https://api.alternative.me/fng/?limit=1").json()
+        fng_response = snapshot['fear_greed']
         fear_greed_value = int(fng_response.get('data', [{}])[0].get('value', 50))
         fear_greed_text = fng_response.get('data', [{}])[0].get('value_classification', 'Neutral')
-        global_response = requests.get("https://api.coingecko.com/api/v3/global").json()
+        global_response = snapshot['global']
         btc_dominance = global_response.get('data', {}).get('market_cap_percentage', {}).get('btc', 0)
-        print(_("market_data_summary", fear_greed_value=fear_greed_value, fear_greed_text=fear_greed_text, btc_dominance=btc_dominance, sol_price=sol_price, sol_change=sol_change))
-        return f"BTC Dominance: {btc_dominance:.2f}%, Fear & Greed: {fear_greed_value} ({fear_greed_text}), BTC 24h Change: {btc_change:.2f}%, SOL Price: ${sol_price:.2f}, SOL 24h Change: {sol_change:.2f}%"
+        log.info("market_data_summary", fear_greed_value=fear_greed_value, fear_greed_text=fear_greed_text, btc_dominance=btc_dominance, sol_price=sol_price, sol_change=sol_change)
+        market_state = {
+            "btc_dominance": float(btc_dominance), "fear_greed_value": fear_greed_value, "fear_greed_text": fear_greed_text,
+            "btc_change": float(btc_change), "sol_price": float(sol_price), "sol_change": float(sol_change),
+        }
+        report = f"BTC Dominance: {btc_dominance:.2f}%, Fear & Greed: {fear_greed_value} ({fear_greed_text}), BTC 24h Change: {btc_change:.2f}%, SOL Price: ${sol_price:.2f}, SOL 24h Change: {sol_change:.2f}%"
+        return report, market_state
     except Exception as e:
-        print(_("market_data_error", e=e))
-        return "Market data currently unavailable."
+        log.error("market_data_error", e=e)
+        return "Market data currently unavailable.", None
 
-def analyze_market_context_for_prompt(raw_market_data):
-    print(_("running_internal_market_analyst"))
+def market_state_signature(market_state):
+    """
+    Quantizes the market state from conduct_market_research() into a coarse signature: the
+    Fear & Greed band, BTC dominance rounded to a whole percent and the 24h changes bucketed
+    by MARKET_CHANGE_BUCKET_PERCENT. States that land on the same signature get the same
+    analyst summary.
+    """
+    change_bucket = lambda value: math.floor(value / MARKET_CHANGE_BUCKET_PERCENT)
+    return "|".join([
+        str(market_state["fear_greed_text"]).strip().lower(),
+        str(round(market_state["btc_dominance"])),
+        str(change_bucket(market_state["btc_change"])),
+        str(change_bucket(market_state["sol_change"])),
+    ])
+
+def analyze_market_context_for_prompt(raw_market_data, market_state=None):
+    """One-sentence analyst summary of the report; cached by market state signature when market_state is given."""
+    log.info("running_internal_market_analyst")
     if "unavailable" in raw_market_data:
         return "Market data was unavailable."
+    signature = market_state_signature(market_state) if market_state else None
+    cached_summary = market_summary_cache.get(signature) if signature else None
+    if cached_summary:
+        log.info("analyst_conclusion_cached", summary=cached_summary)
+        return cached_summary
     # --- GENERIC PROMPT USING THE PERSONA PRIMER ---
     primer = f""" {persona_primer} You are currently in the role of a market analyst. Based on the raw data provided, your task is to generate a one-sentence summary for your own internal analysis. This summary should interpret the key data points (like BTC.D, F&G, and relative asset performance) in a style that matches your established persona. """
     prompt = f"{primer}\nRaw Data:\n{raw_market_data}\n\nProvide your one-sentence clinical summary:"
     try:
-        response = client_openai.chat.completions.create(model=REFLECTIVE_MODEL, messages=[{"role": "user", "content": prompt}])
-        summary = response.choices[0].message.content.strip()
-        print(_("analyst_conclusion", summary=summary))
+        summary = chat_completion("market_analysis", REFLECTIVE_MODEL, prompt).strip()
+        log.info("analyst_conclusion", summary=summary)
+        if signature:
+            market_summary_cache.put(signature, summary)
         return summary
     except Exception as e:
-        print(_("internal_analyst_error", e=e))
+        log.error("internal_analyst_error", e=e)
         return "Failed to analyze market state."
 
 def monitor_core_subjects(driver, target_override=None):
-    print(_("action_monitor_core_subjects"))
+    log.info("action_monitor_core_subjects")
     log_action("monitor_core_subjects", "system", "STARTED")
 
     # --- NEW: Logic to handle the override ---
     if target_override:
         target_profile = target_override
-        print(f"🎯 [Debug] Overriding target to: {target_profile}")
+        log.info("monitor_target_overridden", target_profile=target_profile)
     # --- Original logic runs if no override is provided ---
     elif random.random() < 0.25:
         cursor.execute("SELECT screen_name FROM potential_partners WHERE status='discovered' ORDER BY RANDOM() LIMIT 1")
         partner = cursor.fetchone()
         if partner:
             target_profile = partner[0]
-            print(f"🤝 [Networking] Proactively checking potential partner: {target_profile}")
+            log.info("checking_potential_partner", target_profile=target_profile)
         else:
             target_profile = random.choice(CORE_TOPICS)
     else:
         target_profile = random.choice(CORE_TOPICS)
     try:
-        driver.get(f"https://twitter.com/{target_profile.strip('@')}") # Use .strip('@') for safety
+        driver.get(x_url(f"/{target_profile.strip('@')}")) # Use .strip('@') for safety
         random_delay(5, 10)
         
-        # Find initial tweets to determine the number of iterations
-        initial_tweets = driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
-        if not initial_tweets:
-            log_debug(_("no_tweets_on_profile", target_profile=target_profile))
+        # We sample up to 5 tweets, read in a single pass.
+        tweets = extract_tweets(driver, limit=5)
+        if not tweets:
+            log.debug("no_tweets_on_profile", target_profile=target_profile)
             return
 
-        # We will iterate a fixed number of times, re-finding the element each time
-        # to avoid the StaleElementReferenceException.
-        # We sample up to 5 tweets.
-        num_tweets_to_check = min(len(initial_tweets), 5)
-        
-        for i in range(num_tweets_to_check):
+        for target_tweet in tweets:
             if not agent_running: return
             try:
-                # Re-find all tweets in every iteration to get the fresh state
-                all_current_tweets = driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
-                
-                # If the page structure changed and we can't find the tweet, skip
-                if i >= len(all_current_tweets):
-                    log_debug(f"Could not re-find tweet at index {i}, DOM likely changed. Skipping.")
+                tweet_text = target_tweet['text']
+                if tweet_text is None:
+                    log.debug("skipping_post_no_text", target_profile=target_profile)
                     continue
-                
-                target_tweet = all_current_tweets[i]
-
-                tweet_text = target_tweet.find_element(By.CSS_SELECTOR, 'div[data-testid="tweetText"]').text
-                log_debug(_("scanning_post", tweet_text_preview=tweet_text[:40]))
+                # Tweets this action already went through are skipped here only; they stay reply targets.
+                if target_tweet['id'] and (seen_tweets.is_settled(target_tweet['id']) or seen_tweets.outcome(target_tweet['id']) == "monitored"):
+                    log.debug("skipping_seen_tweet", tweet_id=target_tweet['id'])
+                    continue
+                log.debug("scanning_post", tweet_text_preview=tweet_text[:40])
                 
                 # --- Logic for finding partners ---
-                mentioned_handles = re.findall(r'@(\w+)', tweet_text)
+                mentioned_handles = target_tweet['mentions']
                 if mentioned_handles:
                     for handle in mentioned_handles:
                         screen_name = f"@{handle}"
-                        if screen_name.lower() not in [t.lower() for t in CORE_TOPICS]:
-                            cursor.execute("SELECT * FROM potential_partners WHERE screen_name=?", (screen_name,))
-                            if not cursor.fetchone():
-                                print(_("discovered_new_potential_entity", screen_name=screen_name))
-                                cursor.execute("INSERT INTO potential_partners (screen_name, discovery_date, status) VALUES (?, ?, ?)", (screen_name, datetime.now().isoformat(), 'discovered'))
-                                conn.commit()
+                        if screen_name.lower() not in CORE_TOPICS_LOWER and not identity_index.is_known_partner(screen_name):
+                            log.info("discovered_new_potential_entity", screen_name=screen_name)
+                            record_partner(screen_name)
 
                 # --- Logic for liking ---
                 if random.random() <= LIKE_CHANCE:
                     # Check if the tweet is not already liked
-                    if not target_tweet.find_elements(By.XPATH, ".//button[@data-testid='unlike']"):
-                        like_buttons = target_tweet.find_elements(By.XPATH, ".//button[@data-testid='like']")
-                        if like_buttons:
-                            robust_click(driver, like_buttons[0])
-                            print(_("liked_post_on_profile", target_profile=target_profile))
+                    if not target_tweet['liked']:
+                        if target_tweet['like_button']:
+                            try:
+                                robust_click(driver, target_tweet['like_button'])
+                            except StaleElementReferenceException:
+                                # The timeline re-rendered since extraction; look the tweet up again by id.
+                                fresh_tweet = next((t for t in extract_tweets(driver) if t['id'] == target_tweet['id']), None)
+                                if not fresh_tweet or not fresh_tweet['like_button']:
+                                    continue
+                                robust_click(driver, fresh_tweet['like_button'])
+                            log.info("liked_post_on_profile", target_profile=target_profile)
                             log_action("monitor_core_subjects", target_profile, "SUCCESS_LIKED")
                             # Add a small delay after an action to let the page settle
                             random_delay(1, 2) 
                     else:
-                        log_debug("Tweet already liked, skipping like action.")
+                        log.debug("tweet_already_liked")
+                if target_tweet['id']:
+                    seen_tweets.record(target_tweet['id'], "monitored")
 
-            except NoSuchElementException:
-                log_debug(_("skipping_post_no_text", target_profile=target_profile))
-                continue
             except Exception as e:
                 # Catching other potential errors during loop
-                print(f"⚠️ Warning: An error occurred while processing a tweet on {target_profile}'s profile: {e}")
+                log.warning("profile_tweet_processing_error", target_profile=target_profile, e=e)
                 continue # Move to the next tweet
 
 
     except Exception as e:
-        print(_("error_monitoring_profile", target_profile=target_profile, e=e))
+        log.error("error_monitoring_profile", target_profile=target_profile, e=e)
 
 def curiosity_driven_discovery(driver):
-    print(_("action_curiosity_driven_discovery"))
+    log.info("action_curiosity_driven_discovery")
     log_action("curiosity_driven_discovery", "system", "STARTED")
     
     recent_categories = [log_target for log_name, log_target, _ in action_history if log_name == "CURIOSITY_DRIVEN_DISCOVERY"]
@@ -696,81 +1580,159 @@ def curiosity_driven_discovery(driver):
     for attempt in range(2):
         try:
             query = random.choices(list(available_categories.keys()), weights=list(available_categories.values()), k=1)[0]
-            log_debug(_("discovery_attempt", attempt=attempt + 1, query=query))
+            log.debug("discovery_attempt", attempt=attempt + 1, query=query)
             action_history.append(("CURIOSITY_DRIVEN_DISCOVERY", query, datetime.now()))
 
             for search_mode in ["", "&f=live"]:
                 if not agent_running: return
-                search_url = f"https://twitter.com/search?q={query} -from:{YOUR_PROFILE_URL.split('/')[-1]} since:{(datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')}&src=typed_query{search_mode}"
+                search_url = x_url(f"/search?q={query} -from:{BOT_HANDLE} since:{(datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')}&src=typed_query{search_mode}")
                 mode_name = 'Top' if not search_mode else 'Latest'
-                print(_("searching_for_query", mode=mode_name, query=query))
+                log.info("searching_for_query", mode=mode_name, query=query)
                 driver.get(search_url)
                 random_delay(5, 8)
-                tweets = driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
+                tweets = extract_tweets(driver, limit=10)
                 if not tweets:
-                    log_debug(_("no_search_results"))
+                    log.debug("no_search_results")
                     continue
                 
                 candidate_threads = []
-                for i, tweet in enumerate(tweets[:10]):
-                    try:
-                        tweet_text = tweet.find_element(By.CSS_SELECTOR, 'div[data-testid="tweetText"]').text
-                        tweet_id = tweet.find_element(By.XPATH, ".//a[contains(@href, '/status/')]").get_attribute('href').split('/')[-1]
-                        cursor.execute("SELECT * FROM engagements WHERE target_tweet_id=?", (tweet_id,))
-                        if not cursor.fetchone():
-                            candidate_threads.append({"id": tweet_id, "text": tweet_text, "url": tweet.find_element(By.XPATH, ".//a[contains(@href, '/status/')]").get_attribute('href'), "index": i})
-                    except:
+                for tweet in tweets:
+                    if not tweet['id'] or tweet['text'] is None:
                         continue
+                    if not identity_index.has_engaged(tweet['id']) and not seen_tweets.is_settled(tweet['id']):
+                        candidate_threads.append({"id": tweet['id'], "text": tweet['text'], "url": tweet['url'], "index": tweet['index']})
 
                 if not candidate_threads:
-                    log_debug("No fresh, unengaged candidates.")
+                    log.debug("no_fresh_unengaged_candidates")
                     continue
                 
-                log_debug(_("passing_candidates_to_ai", len_candidates=len(candidate_threads)))
-                valid_indices = [t['index'] for t in candidate_threads]
-                # --- GENERIC PROMPT USING THE PERSONA PRIMER ---
-                scoring_prompt = f""" {persona_primer} Analyze these tweets discovered during a research expedition on the topic of '{query}'. Your objective is to identify the single most intellectually stimulating thread to engage with.Valid indices are: {valid_indices}.Return a JSON object containing only the 'best_index'. """
-                response = client_openai.chat.completions.create(model=REFLECTIVE_MODEL, response_format={"type": "json_object"}, messages=[{"role": "user", "content": scoring_prompt}])
-                decision = json.loads(response.choices[0].message.content)
-                best_index = decision.get("best_index")
-
-                if best_index is None or best_index not in valid_indices:
-                    log_debug(_("ai_did_not_select_discovery_target"))
+                log.debug("passing_candidates_to_ai", len_candidates=len(candidate_threads))
+                hot_thread, _reason = choose_candidate(candidate_threads, lambda finalists: build_discovery_scoring_prompt(query, finalists))
+
+                if not hot_thread:
+                    log.debug("ai_did_not_select_discovery_target")
                     continue
 
-                hot_thread = next(t for t in candidate_threads if t["index"] == best_index)
-                print(_("discovery_found_promising_thread", hot_thread_id=hot_thread['id']))
+                log.info("discovery_found_promising_thread", hot_thread_id=hot_thread['id'])
                 _engage_with_thread(driver, hot_thread, "discovery_reply")
                 return
-            log_debug(_("no_discoveries_in_mode", mode=mode_name))
+            log.debug("no_discoveries_in_mode", mode=mode_name)
         except Exception as e:
-            print(_("discovery_expedition_error", attempt=attempt + 1, e=e))
-    print(_("expedition_ended_without_results"))
+            log.error("discovery_expedition_error", attempt=attempt + 1, e=e)
+    log.info("expedition_ended_without_results")
+
+def generate_post_insight(subject, likes):
+    analysis_prompt = f""" Analyze the performance of this tweet: - Subject: {subject} - Likes: {likes} Based on its success (or failure), generate a single, actionable strategic insight for future content. Focus on the TONE, STYLE, or ANGLE, not just the topic.Example of a good insight: "Cryptic, data-driven statements about market volatility generate high engagement." Example of a bad insight: "Tweets about Solana are good." Generate the insight: """
+    return chat_completion("insight", REFLECTIVE_MODEL, analysis_prompt).strip()
+
+def maintain_vector_memory():
+    """Applies the vector memory retention policy (see memory_maintenance.py)."""
+    try:
+        summary = maintain_collection(vector_memory, MEMORY_DEDUP_SIMILARITY, MEMORY_INSIGHT_MAX_AGE_DAYS, MEMORY_INSIGHT_KEEP_LIKES, MEMORY_MAX_PER_TYPE)
+        log.info("memory_maintenance_summary", **summary)
+    except Exception as e:
+        log.warning("memory_maintenance_error", e=e)
+
+def run_memory_maintenance(rebuild=False):
+    """
+    Offline maintenance for --maintain-memory and --rebuild-memory: applies the retention
+    policy, optionally rebuilds the index, and prints the collection's size and query latency
+    before and after.
+    """
+    if VECTOR_MEMORY_BACKEND == "numpy":
+        # The NumPy store rewrites its files on every delete, so it never needs a rebuild.
+        client, collection, path = None, open_numpy_store(), NUMPY_MEMORY_PATH
+    else:
+        (client, collection), path = open_chroma_collection(), VECTOR_MEMORY_PATH
+    memory_types = sorted(set(MEMORY_MAX_PER_TYPE) | {"self_posted", "insight"})
+    before = collection_report(collection, path, memory_types)
+    summary = maintain_collection(collection, MEMORY_DEDUP_SIMILARITY, MEMORY_INSIGHT_MAX_AGE_DAYS, MEMORY_INSIGHT_KEEP_LIKES, MEMORY_MAX_PER_TYPE)
+    log.info("memory_maintenance_summary", **summary)
+    if rebuild and client is not None:
+        log.info("memory_rebuild_started")
+        collection = rebuild_collection(client, VECTOR_MEMORY_COLLECTION)
+        reclaim_disk_space(VECTOR_MEMORY_PATH)
+    after = collection_report(collection, path, memory_types)
+
+    def fmt(value, scale=1.0, unit=""):
+        return "n/a" if value is None else f"{value / scale:.1f}{unit}"
+
+    rows = [("entries", before["total"], after["total"])]
+    rows += [(f"  {memory_type}", before["by_type"][memory_type], after["by_type"][memory_type]) for memory_type in memory_types]
+    rows += [
+        ("disk size", fmt(before["disk_bytes"], 1024 * 1024, " MB"), fmt(after["disk_bytes"], 1024 * 1024, " MB")),
+        ("query median", fmt(before["query_median_ms"], unit=" ms"), fmt(after["query_median_ms"], unit=" ms")),
+        ("query max", fmt(before["query_max_ms"], unit=" ms"), fmt(after["query_max_ms"], unit=" ms")),
+    ]
+    print(_("memory_report_header"))
+    print(f"{'':<16} {'before':>12} {'after':>12}")
+    for label, before_value, after_value in rows:
+        print(f"{label:<16} {before_value:>12} {after_value:>12}")
+
+def migrate_vector_memory():
+    """--migrate-memory: copies the Chroma collection into the NumPy store and checks that nothing was lost."""
+    from numpy_memory import migrate_collection
+    _client, source = open_chroma_collection()
+    target = open_numpy_store()
+    log.info("memory_migration_started", count=source.count(), path=NUMPY_MEMORY_PATH)
+    start = time.perf_counter()
+    migrated = migrate_collection(source, target)
+    log.info("memory_migration_done", count=migrated, seconds=time.perf_counter() - start)
+    if migrated < source.count():
+        log.warning("memory_migration_incomplete", missing=source.count() - migrated)
 
 def perform_self_reflection(driver):
-    print(_("action_self_reflection"))
+    log.info("action_self_reflection")
     log_action("perform_self_reflection", "system", "STARTED")
     try:
-        cursor.execute("SELECT tweet_id, subject, likes FROM observations WHERE status IN ('published', 'reviewed') ORDER BY timestamp DESC LIMIT 10")
+        cursor.execute("SELECT tweet_id, subject, likes, status, timestamp FROM observations WHERE status IN ('published', 'reviewed') ORDER BY timestamp DESC LIMIT 10")
         recent_posts = cursor.fetchall()
         if not recent_posts:
-            log_debug(_("no_posts_to_analyze"))
+            log.debug("no_posts_to_analyze")
             return
-        print(_("analyzing_performance_of_posts", len_posts=len(recent_posts)))
-        insights = []
-        for tweet_id, subject, likes in recent_posts:
+        log.info("analyzing_performance_of_posts", len_posts=len(recent_posts))
+        # --- Step 1: Collect performance data in one pass over the profile timeline ---
+        # Without a browser (offline runs) the stored counts are used as they are.
+        harvested = {}
+        if driver is not None:
+            try:
+                harvested = harvest_post_metrics(driver, [(tweet_id, timestamp) for tweet_id, _subject, _likes, _status, timestamp in recent_posts])
+            except Exception as e:
+                log.warning("metrics_harvest_failed", e=e)
+        performance, updates = [], []
+        for tweet_id, subject, likes, status, _timestamp in recent_posts:
             try:
                 if not agent_running: return
-                if likes is None:
-                    driver.get(f"{YOUR_PROFILE_URL}/status/{tweet_id}"); time.sleep(5)
-                    like_element = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, f"//a[contains(@href, '/status/{tweet_id}/likes')]//span[@data-testid='app-text-transition-container']")))
-                    likes = int(like_element.text.replace(',', '')) if like_element.text else 0
-                    cursor.execute("UPDATE observations SET likes=?, status=? WHERE tweet_id=?", (likes, 'reviewed', tweet_id)); conn.commit()
-                analysis_prompt = f""" Analyze the performance of this tweet: - Subject: {subject} - Likes: {likes} Based on its success (or failure), generate a single, actionable strategic insight for future content. Focus on the TONE, STYLE, or ANGLE, not just the topic.Example of a good insight: "Cryptic, data-driven statements about market volatility generate high engagement." Example of a bad insight: "Tweets about Solana are good." Generate the insight: """
-                response = client_openai.chat.completions.create(model=REFLECTIVE_MODEL, messages=[{"role": "user", "content": analysis_prompt}])
-                insight = response.choices[0].message.content.strip()
-                insights.append(insight)
-                print(_("post_analysis_insight", tweet_id=tweet_id, likes=likes, insight=insight))
+                if tweet_id in harvested:
+                    likes, retweets = harvested[tweet_id]
+                    updates.append((likes, retweets, tweet_id))
+                elif driver is not None and (status == 'published' or likes is None):
+                    # Not on the timeline and never measured: fall back to the post's own page.
+                    likes = read_likes_from_status_page(driver, tweet_id)
+                    updates.append((likes, None, tweet_id))
+                elif likes is None:
+                    # Offline and never measured: there is nothing to reflect on yet.
+                    continue
+                performance.append((tweet_id, subject, likes))
+            except Exception as e:
+                log.warning("failed_to_analyze_post", tweet_id=tweet_id, e=e)
+        for row in updates:
+            db_writer.execute("UPDATE observations SET likes=?, retweets=COALESCE(?, retweets), status='reviewed' WHERE tweet_id=?", row)
+        log.info("post_metrics_collected", harvested=len(harvested), fallback=len(updates) - len(harvested), total=len(recent_posts))
+
+        # --- Step 2: Generate all insights concurrently ---
+        if not agent_running: return
+        insights = []
+        with ThreadPoolExecutor(max_workers=max(1, REFLECTION_MAX_WORKERS)) as pool:
+            futures = [pool.submit(generate_post_insight, subject, likes) for _tweet_id, subject, likes in performance]
+            for (tweet_id, subject, likes), future in zip(performance, futures):
+                try:
+                    insight = future.result()
+                except Exception as e:
+                    log.warning("failed_to_analyze_post", tweet_id=tweet_id, e=e)
+                    continue
+                insights.append((insight, subject, likes))
+                log.info("post_analysis_insight", tweet_id=tweet_id, likes=likes, insight=insight)
                 # --- NEW: Dynamic Interest Adaptation ---
                 if likes > 5: # If a post is reasonably successful
                     for category, weight in RESEARCH_CATEGORIES.items():
@@ -778,8 +1740,6 @@ def perform_self_reflection(driver):
                         if category.lower() in subject.lower() or subject.lower() in category.lower():
                             # Increase the weight of that category (the more likes, the bigger the boost)
                             RESEARCH_CATEGORIES[category] = weight * (1.0 + (likes / 100.0))
-            except Exception as e:
-                print(_("failed_to_analyze_post", tweet_id=tweet_id, e=e))
         
         total_weight = sum(RESEARCH_CATEGORIES.values())
         if total_weight > 0:
@@ -787,36 +1747,41 @@ def perform_self_reflection(driver):
                 RESEARCH_CATEGORIES[category] /= total_weight
         
         weights_json = json.dumps({k: round(v, 3) for k, v in RESEARCH_CATEGORIES.items()}, indent=2)
-        print(_("updated_category_weights", weights_json=weights_json))
+        log.info("updated_category_weights", weights_json=weights_json)
         # Normalize the weights so they sum up to 1 (or close to it)
         total_weight = sum(RESEARCH_CATEGORIES.values())
         if total_weight > 0:
             for category in RESEARCH_CATEGORIES:
                 RESEARCH_CATEGORIES[category] /= total_weight
         weights_json = json.dumps({k: round(v, 3) for k, v in RESEARCH_CATEGORIES.items()}, indent=2)
-        print(_("updated_category_weights", weights_json=weights_json))
+        log.info("updated_category_weights", weights_json=weights_json)
         
         if insights:
-            print(_("saving_new_insights_to_memory", len_insights=len(insights)))
-            response = client_openai.embeddings.create(input=insights, model="text-embedding-3-small")
-            vector_memory.add(embeddings=[d.embedding for d in response.data], documents=insights, metadatas=[{"type": "insight"}]*len(insights), ids=[f"insight_{int(datetime.now().timestamp())}_{i}" for i in range(len(insights))])
+            log.info("saving_new_insights_to_memory", len_insights=len(insights))
+            documents = [insight for insight, _subject, _likes in insights]
+            # likes and created_at let memory maintenance rank, merge and expire insights.
+            now = time.time()
+            metadatas = [{"type": "insight", "subject": subject, "likes": likes, "created_at": now} for _insight, subject, likes in insights]
+            vector_memory.add(embeddings=embed_texts(documents), documents=documents, metadatas=metadatas, ids=[f"insight_{int(now)}_{i}" for i in range(len(insights))])
+            maintain_vector_memory()
+        refresh_insight_digests()
         log_action("perform_self_reflection", "system", "SUCCESS")
     except Exception as e:
-        print(_("critical_error_self_reflection", e=e))
+        log.error("critical_error_self_reflection", e=e)
         log_action("perform_self_reflection", "system", f"FAILURE: {e}")
     finally:
-        print(_("resetting_self_reflection_timer"))
+        log.info("resetting_self_reflection_timer")
         update_last_seen(LAST_REFLECTION_FILE)
 
 # --- The Strategic Brain ---
 def evaluate_strategy(driver):
     global CURRENT_GOAL
-    print(_("strategy_evaluating_state"))
+    log.info("strategy_evaluating_state")
     
     # --- Start of New Logic: Action Cooldown ---
     # Get the names of the last 3 actions performed
     last_three_actions = [a[0] for a in action_history[-3:]]
-    log_debug(_("last_actions", actions=", ".join(last_three_actions) if last_three_actions else "None"))
+    log.debug("last_actions", actions=", ".join(last_three_actions) if last_three_actions else "None")
 
     # Base weights for actions
     actions = {"BROWSE_FOLLOWING_FEED": 0.5, "CURIOSITY_DRIVEN_DISCOVERY": 0.3, "MONITOR_CORE_SUBJECTS": 0.2}
@@ -826,24 +1791,25 @@ def evaluate_strategy(driver):
         if action_name in actions:
             actions[action_name] *= 0.25  # Drastically reduce the chance of repeating recent actions
     
-    log_debug(_("dynamic_weights", weights=json.dumps({k: round(v, 2) for k, v in actions.items()})))
+    if log.is_enabled(logging.DEBUG):
+        log.debug("dynamic_weights", weights=json.dumps({k: round(v, 2) for k, v in actions.items()}))
     # --- End of New Logic ---
 
     if check_if_time_passed(LAST_REFLECTION_FILE, SELF_REFLECTION_HOURS):
         cursor.execute("SELECT 1 FROM observations WHERE status IN ('published', 'reviewed') LIMIT 1")
         if cursor.fetchone():
             CURRENT_GOAL = "SELF_REFLECTION"
-            print(_("strategy_goal_self_reflection", goal=CURRENT_GOAL))
+            log.info("strategy_goal_self_reflection", goal=CURRENT_GOAL)
             return
 
     if check_if_time_passed(LAST_MENTIONS_CHECK_FILE, 0.16):
         update_last_seen(LAST_MENTIONS_CHECK_FILE)
         if scan_and_reply_to_mentions(driver):
             CURRENT_GOAL = "NURTURE_ENGAGEMENT"
-            print(_("strategy_goal_nurture_engagement", goal=CURRENT_GOAL))
+            log.info("strategy_goal_nurture_engagement", goal=CURRENT_GOAL)
             return
         else:
-            log_debug(_("mention_scan_completed"))
+            log.debug("mention_scan_completed")
 
     cursor.execute("SELECT timestamp FROM observations ORDER BY timestamp DESC LIMIT 1")
     last_post_time_str = cursor.fetchone()
@@ -851,101 +1817,288 @@ def evaluate_strategy(driver):
         # Check if the last action wasn't already posting to avoid post loops
         if "EXPAND_REACH" not in last_three_actions:
             CURRENT_GOAL = "EXPAND_REACH"
-            print(_("strategy_goal_expand_reach", goal=CURRENT_GOAL))
+            log.info("strategy_goal_expand_reach", goal=CURRENT_GOAL)
             return
 
     # Choose the next action based on the new, dynamic weights
     CURRENT_GOAL = random.choices(list(actions.keys()), weights=list(actions.values()), k=1)[0]
-    print(_("strategy_goal_weighted_random", goal=CURRENT_GOAL))
+    log.info("strategy_goal_weighted_random", goal=CURRENT_GOAL)
 
-# --- Main Agent Loop ---
-def run_agent():
-    global agent_running, CURRENT_GOAL, action_history, _
+def run_with_cprofile(func, output_path):
+    """Runs func under cProfile, saves the stats to output_path and prints the top entries."""
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    try:
+        with tracer.span("action"):
+            profiler.runcall(func)
+    finally:
+        profiler.dump_stats(output_path)
+        log.info("cprofile_saved", path=output_path)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+# --- Scheduler ---
+class AgentScheduler:
+    """
+    asyncio core of the main loop. The browser and the shared SQLite connection belong to one
+    dedicated "selenium" thread, and every blocking step that touches them goes through
+    run_browser(). Network-only steps go through run_io() and run on the loop's default
+    executor, so they overlap with browser work. stop_event is set by the exit command,
+    Ctrl+C/SIGTERM or a fatal error, and wakes every wait at once.
+    """
+    def __init__(self):
+        self.browser_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="selenium")
+        self.loop = None
+        self.stop_event = None
+
+    def request_shutdown(self):
+        """Stops the agent. Safe to call from any thread."""
+        global agent_running
+        agent_running = False
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+
+    @property
+    def stopping(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    async def run_browser(self, func, *args):
+        return await self.until_stopped(self.loop.run_in_executor(self.browser_executor, func, *args))
+
+    async def run_io(self, func, *args):
+        return await self.until_stopped(self.loop.run_in_executor(None, func, *args))
+
+    async def until_stopped(self, awaitable):
+        """
+        Awaits awaitable, or returns None as soon as shutdown is requested. A step cut short
+        this way keeps running in its thread until it next checks agent_running.
+        """
+        task = asyncio.ensure_future(awaitable)
+        stopper = asyncio.ensure_future(self.stop_event.wait())
+        done, _pending = await asyncio.wait({task, stopper}, return_when=asyncio.FIRST_COMPLETED)
+        stopper.cancel()
+        if task in done:
+            return task.result()
+        return None
+
+    async def sleep(self, seconds):
+        """Sleeps for seconds, or less if shutdown is requested in the meantime."""
+        try:
+            await asyncio.wait_for(self.stop_event.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+scheduler = AgentScheduler()
+
+# Actions for goals that only need the browser; EXPAND_REACH has its own pipeline.
+GOAL_ACTIONS = {
+    "SELF_REFLECTION": perform_self_reflection,
+    "NURTURE_ENGAGEMENT": None, # The mention replies were already sent while evaluating the strategy
+    "CURIOSITY_DRIVEN_DISCOVERY": curiosity_driven_discovery,
+    "BROWSE_FOLLOWING_FEED": browse_following_feed_and_engage,
+    "MONITOR_CORE_SUBJECTS": monitor_core_subjects,
+}
+
+def traced_action(func, *args):
+    with tracer.span("action"):
+        return func(*args)
+
+def open_composer(driver):
+    """Loads the home timeline with the post composer, ahead of post_tweet. Returns True on success."""
+    try:
+        driver.get(x_url("/home"))
+        random_delay(3, 5)
+        return True
+    except Exception as e:
+        log.warning("composer_preload_failed", e=e)
+        return False
+
+def write_new_post():
+    """Market research, analysis and post generation. Network only, so it can run next to browser work."""
+    raw_market_data, market_state = conduct_market_research()
+    market_summary = analyze_market_context_for_prompt(raw_market_data, market_state)
+    subject = "Market Sentiment" if "Extreme" in (market_summary or "") else random.choice(CORE_TOPICS)
+    return generate_tweet_content(market_summary, subject_override=subject)
+
+async def expand_reach(driver):
+    """Writes the new post while the browser opens the composer, then publishes it."""
+    with tracer.span("action"):
+        written, composer_open = await asyncio.gather(scheduler.run_io(write_new_post), scheduler.run_browser(open_composer, driver))
+        subject, content = written or (None, None)
+        if content and not scheduler.stopping:
+            await scheduler.run_browser(post_tweet, driver, subject, content, bool(composer_open))
+
+async def run_cycle(driver):
+    global action_history
+    update_last_seen(LAST_SEEN_FILE)
+    tracer.set_action("EVALUATE_STRATEGY")
+    await scheduler.run_browser(traced_action, evaluate_strategy, driver)
+    if scheduler.stopping:
+        return
+    tracer.set_action(CURRENT_GOAL)
+    action_target = CURRENT_GOAL
+    action_history.append((CURRENT_GOAL, action_target, datetime.now()))
+    if len(action_history) > 20:
+        action_history.pop(0)
+    if CURRENT_GOAL == "EXPAND_REACH":
+        await expand_reach(driver)
+    elif GOAL_ACTIONS.get(CURRENT_GOAL):
+        await scheduler.run_browser(traced_action, GOAL_ACTIONS[CURRENT_GOAL], driver)
+
+def run_forced_action(driver):
+    """--force-action: runs one action from the action map on the browser thread."""
+    log.info("forced_action_header", action=args.force_action)
+    action_map = {
+        'post': lambda d, t: post_tweet(d, *generate_tweet_content(analyze_market_context_for_prompt(*conduct_market_research()))),
+        'mentions': lambda d, t: scan_and_reply_to_mentions(d),
+        'browse': lambda d, t: browse_following_feed_and_engage(d),
+        'monitor': lambda d, t: monitor_core_subjects(d, target_override=t), # Pass target here
+        'discover': lambda d, t: curiosity_driven_discovery(d),
+        'reflect': lambda d, t: perform_self_reflection(d)
+    }
+    # Get the function to run from our map
+    action_to_run = action_map.get(args.force_action)
+    if action_to_run:
+        # Execute the chosen function, passing the driver and the optional target
+        tracer.set_action(args.force_action.upper())
+        if args.cprofile:
+            run_with_cprofile(lambda: action_to_run(driver, args.target), args.cprofile)
+        else:
+            traced_action(action_to_run, driver, args.target)
+    else:
+        log.error("unknown_forced_action", action=args.force_action)
+    log.info("forced_action_complete")
+
+def start_browser_session():
+    """Runs on the browser thread: opens the shared database there, starts the browser and logs in."""
+    identity_index.resolve()
+    insight_digests.resolve()
+    seen_tweets.resolve()
+    driver = setup_driver()
+    if driver and not login_to_twitter(driver):
+        close_driver(driver)
+        return None
+    return driver
+
+def close_agent_state():
+    """
+    Runs on the browser thread, which owns the shared SQLite connection. Being queued there,
+    it only starts once the browser step still running at shutdown has finished.
+    """
+    db_writer.flush()
+    print_token_usage_report()
+    conn.close()
+
+async def agent_main():
+    scheduler.loop = asyncio.get_running_loop()
+    scheduler.stop_event = asyncio.Event()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            scheduler.loop.add_signal_handler(signal_number, lambda: (log.info("ctrl_c_detected"), scheduler.request_shutdown()))
+        except (NotImplementedError, RuntimeError):
+            pass # Windows: Ctrl+C arrives as KeyboardInterrupt instead
     driver = None
-    shutdown_thread = threading.Thread(target=shutdown_listener, daemon=True)
-    shutdown_thread.start()
     try:
-        print(_("agent_protocol_header"))
-        print(_("exit_prompt"))
-        driver = setup_driver()
-        if not driver or not login_to_twitter(driver):
-            agent_running = False
+        log.info("agent_protocol_header")
+        log.info("exit_prompt")
+        # The slow backends start up in the background while the browser launches.
+        vector_memory.warm_up()
+        client_openai.warm_up()
+        driver = await scheduler.run_browser(start_browser_session)
+        if not driver:
             return
-
-        # --- NEW: Handle --force-action flag ---
         if args.force_action:
-            print(f"\n--- ⚠️  DEBUG MODE: Forcing single action: '{args.force_action}' ⚠️ ---\n")
-            
-            action_map = {
-                'post': lambda d, t: post_tweet(d, *generate_tweet_content(analyze_market_context_for_prompt(conduct_market_research()))),
-                'mentions': lambda d, t: scan_and_reply_to_mentions(d),
-                'browse': lambda d, t: browse_following_feed_and_engage(d),
-                'monitor': lambda d, t: monitor_core_subjects(d, target_override=t), # Pass target here
-                'discover': lambda d, t: curiosity_driven_discovery(d),
-                'reflect': lambda d, t: perform_self_reflection(d)
-            }
-
-            # Get the function to run from our map
-            action_to_run = action_map.get(args.force_action)
-
-            if action_to_run:
-                # Execute the chosen function, passing the driver and the optional target
-                action_to_run(driver, args.target) 
-            else:
-                print(f"Error: Unknown action '{args.force_action}'.")
-
-            print("\n--- ✅ DEBUG ACTION COMPLETE. SHUTTING DOWN. ✅ ---\n")
-            return # Exit after the forced action is done
-        # --- END of --force-action handler ---
-
-        # This is the original main loop, which runs only if no flag is provided
-        while agent_running:
-            if not agent_running: break
-            update_last_seen(LAST_SEEN_FILE)
-            evaluate_strategy(driver)
-            action_target = CURRENT_GOAL
-            action_history.append((CURRENT_GOAL, action_target, datetime.now()))
-            if len(action_history) > 20:
-                action_history.pop(0)
-            if CURRENT_GOAL == "EXPAND_REACH":
-                raw_market_data = conduct_market_research()
-                market_summary = analyze_market_context_for_prompt(raw_market_data)
-                subject = "Market Sentiment" if "Extreme" in (market_summary or "") else random.choice(CORE_TOPICS)
-                subject, content = generate_tweet_content(market_summary, subject_override=subject)
-                if content:
-                    post_tweet(driver, subject, content)
-            elif CURRENT_GOAL == "SELF_REFLECTION":
-                perform_self_reflection(driver)
-            elif CURRENT_GOAL == "NURTURE_ENGAGEMENT":
-                pass
-            elif CURRENT_GOAL == "CURIOSITY_DRIVEN_DISCOVERY":
-                curiosity_driven_discovery(driver)
-            elif CURRENT_GOAL == "BROWSE_FOLLOWING_FEED":
-                browse_following_feed_and_engage(driver)
-            elif CURRENT_GOAL == "MONITOR_CORE_SUBJECTS":
-                monitor_core_subjects(driver)
-            
-            if agent_running:
+            await scheduler.run_browser(run_forced_action, driver)
+            return
+        while not scheduler.stopping:
+            await run_cycle(driver)
+            if not scheduler.stopping:
                 sleep_duration = random.randint(MIN_SLEEP_DURATION, MAX_SLEEP_DURATION)
-                print(_("cycle_complete_next_action", sleep_duration=sleep_duration))
-                for i in range(sleep_duration):
-                    if not agent_running:
-                        break
-                    time.sleep(1)
-    except KeyboardInterrupt:
-        agent_running = False
-        print(_("ctrl_c_detected"))
+                log.info("cycle_complete_next_action", sleep_duration=sleep_duration)
+                await scheduler.sleep(sleep_duration)
     except Exception as e:
-        agent_running = False
-        print(_("main_loop_system_error", e=e))
+        log.error("main_loop_system_error", e=e)
     finally:
+        scheduler.request_shutdown()
         if driver:
+            # Quitting the browser also makes an action that is still running fail fast.
             try:
-                driver.quit()
-            except:
+                close_driver(driver)
+            except Exception:
                 pass
-        conn.close()
-        print(_("agent_shutdown_complete"))
+
+# --- Main Agent Loop ---
+def run_agent():
+    shutdown_thread = threading.Thread(target=shutdown_listener, daemon=True)
+    shutdown_thread.start()
+    log_sink = None
+    if LOG_FILE:
+        log_sink = start_file_sink(logger, LOG_FILE, LOG_FILE_LEVEL, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS, context=lambda: {"action": tracer.action})
+        log.debug("log_file_started", path=LOG_FILE, level=logging.getLevelName(LOG_FILE_LEVEL))
+    try:
+        asyncio.run(agent_main())
+    except KeyboardInterrupt:
+        scheduler.request_shutdown()
+        log.info("ctrl_c_detected")
+    finally:
+        reply_executor.shutdown(wait=False, cancel_futures=True)
+        market_data.close()
+        market_summary_cache.close()
+        try:
+            scheduler.browser_executor.submit(close_agent_state).result(timeout=SHUTDOWN_GRACE_SECONDS)
+        except Exception as e:
+            log.warning("shutdown_step_failed", e=e)
+        scheduler.browser_executor.shutdown(wait=False, cancel_futures=True)
+        # Closed only now, so a browser step that finished during the grace period still gets
+        # its engagement and action log rows written.
+        db_writer.close()
+        if embedding_cache.ready:
+            log.info("embedding_cache_stats", **embedding_cache.stats())
+        if vector_memory.ready:
+            log.info("recall_cache_stats", **vector_memory.stats())
+        if seen_tweets.ready:
+            log.info("seen_tweet_cache_stats", **seen_tweets.stats())
+        if length_outcomes:
+            log.info("length_pipeline_stats", fit=length_outcomes["fit"], trimmed=length_outcomes["trimmed"], shortened=length_outcomes["shortened"])
+        embedding_cache.close()
+        if tracer.enabled:
+            tracer.flush()
+            tracer.report()
+        log.info("agent_shutdown_complete")
+        if log_sink:
+            log_sink.close()
+
+startup_timings["import x_agent"] = time.perf_counter() - _import_started
+
+def run_startup_profile():
+    """Creates every backend once and prints how long the module import and each init took."""
+    load_browser_modules()
+    backends = [conn, cursor, db_writer, identity_index, insight_digests, embedding_cache, client_openai, vector_memory, market_summary_cache, market_data]
+    try:
+        for backend in backends:
+            backend.resolve()
+    finally:
+        for backend in (db_writer, market_data, market_summary_cache, conn, embedding_cache):
+            backend.close()
+    print(_("startup_profile_header"))
+    for step, seconds in startup_timings.items():
+        print(f"{step:<32} {seconds * 1000:>9.1f} ms")
+    print(_("startup_profile_total", seconds=sum(startup_timings.values())))
+
+def main():
+    global args
+    args = parser.parse_args()
+    tracer.enabled = args.profile
+    if args.startup_profile:
+        run_startup_profile()
+    elif args.token_report:
+        print_token_usage_report()
+    elif args.maintain_memory or args.rebuild_memory:
+        run_memory_maintenance(rebuild=args.rebuild_memory)
+    elif args.migrate_memory:
+        migrate_vector_memory()
+    else:
+        run_agent()
 
 if __name__ == "__main__":
-    (run_agent())
\ No newline at end of file
+    main()
\ No newline at end of file